@@ -137,6 +137,22 @@ def set_cloud_checked_flag(value=True):
     with open(CONFIG_FILE, 'w') as f:
         config.write(f)
 
+def get_document_store_settings():
+    """
+    [DocumentStore] section of config.ini:
+    backend = db | fs   (payload in 'documento_blobs' or under Documentacion_Sistema/_store)
+    compress = true | false   (zlib)
+    """
+    config = configparser.ConfigParser()
+    if CONFIG_FILE.exists():
+        config.read(CONFIG_FILE)
+    section = config["DocumentStore"] if "DocumentStore" in config else {}
+    backend = str(section.get("backend", "db")).strip().lower()
+    compress = str(section.get("compress", "true")).strip().lower() in ("1", "true", "yes", "si")
+    return {"backend": backend if backend in ("db", "fs") else "db", "compress": compress}
+
+DOCUMENT_STORE_DIR = DOCS_DIR / "_store"
+
 # --- Dynamic DB Config ---
 DB_PATH_STR = load_last_db_path()
 
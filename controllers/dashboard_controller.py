@@ -9,10 +9,10 @@ class DashboardController:
         self.service = DashboardService()
         self.currency_service = CurrencyService() # NEW
 
-    def get_executive_summary(self, currency="ARS", reference_date=None):
-        """Returns DashboardDTO object. Currency: ARS or USD"""
+    def get_executive_summary(self, currency="ARS", reference_date=None, force=False):
+        """Returns DashboardDTO object. Currency: ARS or USD. force skips the cache."""
         try:
-            return self.service.get_dashboard_data(target_currency=currency, reference_date=reference_date)
+            return self.service.get_dashboard_data(target_currency=currency, reference_date=reference_date, force=force)
         except Exception as e:
             app_logger.error(f"Error en Dashboard: {e}")
             return None
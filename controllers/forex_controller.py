@@ -8,6 +8,7 @@ from models.entities import Cotizacion, Moneda
 from utils.logger import app_logger
 from services.audit_service import AuditService
 from services.forex_service import ForexService
+from services.indicator_service import IndicatorService
 from utils.import_helper import load_data_file
 from utils.format_helper import parse_fuzzy_date, parse_localized_float
 from datetime import date, datetime
@@ -21,7 +22,9 @@ class ForexController:
         from services.bna_service import BnaService
         db = SessionLocal()
         try:
-            success, count = BnaService.sync_rates(session=db)
+            # Manual request: skip the last-sync watermark
+            success, count = BnaService.sync_rates(force=True, session=db)
+            db.commit()
             if success:
                 if count > 0:
                      return True, f"Sincronización Exitosa: {count} cotizaciones actualizadas."
@@ -30,6 +33,7 @@ class ForexController:
             else:
                  return False, "Error de conexión o fallo en la API."
         except Exception as e:
+            db.rollback()
             app_logger.error(f"Sync error: {e}")
             return False, str(e)
         finally:
@@ -114,15 +118,16 @@ class ForexController:
         except: pass
         return ','
 
-    def process_import(self, file_path, mapping_dict):
+    def process_import(self, file_path, mapping_dict, progress_callback=None):
         """
         Imports CSV data via Service.
+        progress_callback(done_rows, total_rows) is called from the calling thread after each chunk.
         """
         try:
             df = load_data_file(file_path)
             # Delegate to Service
             svc = ForexService()
-            success, errors = svc.import_from_dataframe(df, mapping_dict)
+            success, errors = svc.import_from_dataframe(df, mapping_dict, progress_callback=progress_callback)
             
             return True, f"Imported {success} rows. Errors: {len(errors)}"
 
@@ -241,137 +246,101 @@ class ForexController:
         finally:
             db.close()
 
+    _chart_memo = {}          # {(currency, year, month, limit): DataFrame or None}
+    _chart_memo_version = None # IndicatorService.version the memo was built against
+
     def get_chart_data(self, currency_str=Moneda.USD.value, year=None, month=None, limit=None):
         """
         Returns DataFrame with technical indicators (MACD).
         Filters by Year/Month if provided, otherwise uses limit.
+        Indicators come from the persisted, incrementally extended series
+        (IndicatorService); results are memoized until new rates land.
         """
-        db = SessionLocal()
         try:
             moneda = Moneda[currency_str]
-            query = db.query(Cotizacion).filter(Cotizacion.moneda == moneda)
-            
-            if year:
-                from datetime import date
-                from calendar import monthrange
+            key = (moneda.value, year, month, limit)
+            cls = ForexController
+
+            series = IndicatorService.get_series(moneda.value)
+            if cls._chart_memo_version != IndicatorService.version:
+                cls._chart_memo = {}
+                cls._chart_memo_version = IndicatorService.version
+            if key not in cls._chart_memo:
+                cls._chart_memo[key] = self._build_chart_frame(series, year, month, limit)
+
+            df = cls._chart_memo[key]
+            return df.copy() if df is not None else None # Callers add columns (e.g. 'type')
+
+        except Exception as e:
+            app_logger.error(f"Chart data error: {e}")
+            return None
+
+    def _build_chart_frame(self, series, year=None, month=None, limit=None):
+        """Window of the indicator series + 7-day linear projection."""
+        df = series
+        if year:
+            from calendar import monthrange
+
+            # Filter range
+            start_month = month if month else 1
+            end_month = month if month else 12
+
+            start_date = pd.Timestamp(int(year), start_month, 1)
+            last_day = monthrange(int(year), end_month)[1]
+            end_date = pd.Timestamp(int(year), end_month, last_day)
+
+            df = df[(df['fecha'] >= start_date) & (df['fecha'] <= end_date)]
+        elif limit:
+            # Take last N
+            df = df.tail(limit)
+
+        if len(df) < 2: return None # Need at least 2 for lines
+        df = df.reset_index(drop=True)
+
+        # --- AI PROJECTION (Linear Trend) ---
+        # Project 7 days into future based on last 20 days trend
+        try:
+            import numpy as np
+            from datetime import timedelta
+            LOOKBACK = 15
+            PROJECT_DAYS = 7
+            
+            if len(df) > LOOKBACK:
+                # Get last N days
+                recent = df.tail(LOOKBACK).copy()
                 
-                # Filter range
-                start_month = month if month else 1
-                end_month = month if month else 12
+                # Create X (days from start) and Y (price)
+                # We use ordinal date for regression
+                recent['date_ord'] = recent['fecha'].map(lambda d: d.toordinal())
+                x = recent['date_ord'].values
+                y = recent['venta'].values
                 
-                start_date = date(int(year), start_month, 1)
-                last_day = monthrange(int(year), end_month)[1]
-                end_date = date(int(year), end_month, last_day)
+                # Linear Regression (Polyfit deg 1)
+                slope, intercept = np.polyfit(x, y, 1)
                 
-                query = query.filter(Cotizacion.fecha >= start_date, Cotizacion.fecha <= end_date)
-            
-            # Sort for plotting (Time ascending)
-            # If no filter and limit, take last N
-            if not year and limit:
-                 # Subquery optimization or just get all and slice? 
-                 # Get desc limit then reverse
-                 records = query.order_by(Cotizacion.fecha.desc()).limit(limit).all()
-                 records.reverse() 
-            else:
-                 records = query.order_by(Cotizacion.fecha.asc()).all()
-            
-            if len(records) < 2: return None # Need at least 2 for lines
-            
-            data = [{"fecha": r.fecha, "venta": float(r.venta)} for r in records]
-            
-            # Convert to DF
-            df = pd.DataFrame(data)
-            df['fecha'] = pd.to_datetime(df['fecha'])
-            
-            # --- TRADING VIEW INDICATORS ---
-            
-            # 1. Pseudo-OHLC (Simulate Candles)
-            # Open = Previous Close
-            df['prev_close'] = df['venta'].shift(1)
-            # Fill first with current (flat candle)
-            df['prev_close'] = df['prev_close'].fillna(df['venta'])
-            
-            df['Open'] = df['prev_close']
-            df['Close'] = df['venta']
-            df['High'] = df[['Open', 'Close']].max(axis=1)
-            df['Low'] = df[['Open', 'Close']].min(axis=1)
-            
-            # Color: Green if Close >= Open, else Red
-            df['color'] = df.apply(lambda x: '#2ECC71' if x['Close'] >= x['Open'] else '#E74C3C', axis=1)
-
-            # 2. Moving Averages (Ribbon)
-            df['EMA_12'] = df['venta'].ewm(span=12, adjust=False).mean()
-            df['EMA_26'] = df['venta'].ewm(span=26, adjust=False).mean()
-            # SMA 20 (Standard Bollinger/Trend base)
-            df['SMA_20'] = df['venta'].rolling(window=20).mean()
-            
-            # 3. MACD
-            df['MACD'] = df['EMA_12'] - df['EMA_26']
-            df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-            df['Hist'] = df['MACD'] - df['Signal']
-            
-            # 4. Signals (Crossovers)
-            df['prev_MACD'] = df['MACD'].shift(1)
-            df['prev_Signal'] = df['Signal'].shift(1)
-            
-            def get_signal(row):
-                if pd.isna(row['prev_MACD']): return None
-                if row['prev_MACD'] < row['prev_Signal'] and row['MACD'] > row['Signal']: return "BUY"
-                if row['prev_MACD'] > row['prev_Signal'] and row['MACD'] < row['Signal']: return "SELL"
-                return None
-
-            df['Trade_Signal'] = df.apply(get_signal, axis=1)
-            
-            # --- 5. AI PROJECTION (Linear Trend) ---
-            # Project 7 days into future based on last 20 days trend
-            try:
-                import numpy as np
-                from datetime import timedelta
-                LOOKBACK = 15
-                PROJECT_DAYS = 7
+                # Generate Future Data
+                last_date = df['fecha'].iloc[-1]
+                future_rows = []
                 
-                if len(df) > LOOKBACK:
-                    # Get last N days
-                    recent = df.tail(LOOKBACK).copy()
-                    
-                    # Create X (days from start) and Y (price)
-                    # We use ordinal date for regression
-                    recent['date_ord'] = recent['fecha'].map(lambda d: d.toordinal())
-                    x = recent['date_ord'].values
-                    y = recent['venta'].values
-                    
-                    # Linear Regression (Polyfit deg 1)
-                    slope, intercept = np.polyfit(x, y, 1)
+                for i in range(1, PROJECT_DAYS + 1):
+                    next_date = last_date + timedelta(days=i)
+                    pred_price = slope * next_date.toordinal() + intercept
                     
-                    # Generate Future Data
-                    last_date = df['fecha'].iloc[-1]
-                    future_rows = []
+                    # Add some "noise" or dampening? No, straight line is clear "projection"
+                    future_rows.append({
+                        'fecha': next_date,
+                        'venta': pred_price,
+                        'type': 'projection'
+                    })
                     
-                    for i in range(1, PROJECT_DAYS + 1):
-                        next_date = last_date + timedelta(days=i)
-                        pred_price = slope * next_date.toordinal() + intercept
-                        
-                        # Add some "noise" or dampening? No, straight line is clear "projection"
-                        future_rows.append({
-                            'fecha': next_date,
-                            'venta': pred_price,
-                            'type': 'projection'
-                        })
-                        
-                    df_future = pd.DataFrame(future_rows)
-                    # Combine. We won't have indicators for future, nor candles (unless we simulate)
-                    # We just want a line.
-                    return pd.concat([df, df_future], ignore_index=True)
-            except Exception as e:
-                print(f"Projection Error: {e}")
-            
-            return df
-            
+                df_future = pd.DataFrame(future_rows)
+                # Combine. We won't have indicators for future, nor candles (unless we simulate)
+                # We just want a line.
+                return pd.concat([df, df_future], ignore_index=True)
         except Exception as e:
-            app_logger.error(f"Chart data error: {e}")
-            return None
-        finally:
-            db.close()
+            print(f"Projection Error: {e}")
+        
+        return df
 
     def get_strategic_analysis(self, currency_str=Moneda.USD.value):
         """Returns structured advice based on technicals"""
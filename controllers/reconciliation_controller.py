@@ -5,12 +5,21 @@ from datetime import datetime
 from database import SessionLocal
 from models.entities import Vencimiento, Pago, Cotizacion, Moneda
 from controllers.forex_controller import ForexController
-from utils.import_helper import load_data_file
-from utils.format_helper import parse_fuzzy_date, parse_localized_float
+from utils.import_helper import load_data_file, open_source, find_header_row
+from utils.format_helper import parse_fuzzy_date, parse_fuzzy_date_series, parse_localized_float_series
 from sqlalchemy import func
 from services.data_import_service import DataImportService
 from services.reconciliation_service import ReconciliationService
 
+# Header words of bank statements (header row detection + column mapping)
+HEADER_KEYWORDS = {
+    'fecha': ['FECHA', 'DATE', 'DIA'],
+    'descripcion': ['DESCRIPCION', 'CONCEPTO', 'DETALLE', 'MOVIMIENTO', 'REFERENCIA'],
+    'importe': ['IMPORTE', 'MONTO', 'SALDO', 'VALOR'],
+    'debito': ['DEBITO', 'DÉBITO', 'EGRESO', 'PAGOS'], # Extra specific
+    'credito': ['CREDITO', 'CRÉDITO', 'INGRESO', 'DEPOSITO']
+}
+
 class ReconciliationController:
     def __init__(self):
         self.forex_ctrl = ForexController()
@@ -23,11 +32,11 @@ class ReconciliationController:
     def delete_cotizacion(self, fecha, moneda):
         return self.forex_ctrl.delete_cotizacion(fecha, moneda)
 
-    def analyze(self, source_type, file_path, mapping=None):
+    def analyze(self, source_type, file_path, mapping=None, optimal=False):
         if source_type == "Forex":
             return self.analyze_forex(file_path, mapping)
         elif source_type == "Banco":
-            return self.analyze_bank(file_path, mapping)
+            return self.analyze_bank(file_path, mapping, optimal=optimal)
         elif source_type == "Proveedores":
             return self.analyze_supplier(file_path, mapping)
         else:
@@ -44,46 +53,21 @@ class ReconciliationController:
         """
         Scans first 20 rows to find Header Row.
         Returns: (DataFrame correctly loaded, ColumnMap dict)
+        Both come from one read of the file (utils.import_helper.open_source).
         """
         print(f"DEBUG: Smart Detecting Structure for {file_path}")
         try:
-            # 1. Load raw (no header)
-            raw_df = pd.read_excel(file_path, header=None, nrows=20) if file_path.endswith('.xlsx') else pd.read_csv(file_path, header=None, nrows=20, encoding='utf-8')
-            
-            # 2. Score Rows
-            best_row_idx = -1
-            best_score = 0
-            
-            keywords = {
-                'fecha': ['FECHA', 'DATE', 'DIA'],
-                'descripcion': ['DESCRIPCION', 'CONCEPTO', 'DETALLE', 'MOVIMIENTO', 'REFERENCIA'],
-                'importe': ['IMPORTE', 'MONTO', 'SALDO', 'VALOR'],
-                'debito': ['DEBITO', 'DÉBITO', 'EGRESO', 'PAGOS'], # Extra specific
-                'credito': ['CREDITO', 'CRÉDITO', 'INGRESO', 'DEPOSITO']
-            }
-            
-            for idx, row in raw_df.iterrows():
-                score = 0
-                row_str = " ".join([str(x).upper() for x in row.values])
-                
-                # Simple presence check
-                if any(k in row_str for k in keywords['fecha']): score += 3
-                if any(k in row_str for k in keywords['descripcion']): score += 3
-                if any(k in row_str for k in keywords['importe']): score += 3
-                if any(k in row_str for k in keywords['debito']): score += 3
-                if any(k in row_str for k in keywords['credito']): score += 3
-                
-                if score > best_score:
-                    best_score = score
-                    best_row_idx = idx
+            source = open_source(file_path)
             
-            print(f"DEBUG: Best Header Row detected at Index: {best_row_idx} (Score: {best_score})")
+            # 1. Score the first rows (no header)
+            best_row_idx = find_header_row(source.head_rows(20), HEADER_KEYWORDS.values())
+            print(f"DEBUG: Best Header Row detected at Index: {best_row_idx} ({source.format}, delimiter {source.delimiter!r})")
             
-            # 3. Reload with correct header
-            final_header_row = best_row_idx if best_row_idx >= 0 else 0
-            df = load_data_file(file_path, header_row=final_header_row)
+            # 2. Parse with that header (same buffer)
+            df = source.frame(header_row=best_row_idx)
             
-            # 4. Map Columns
+            # 3. Map Columns
+            keywords = HEADER_KEYWORDS
             mapping = {}
             for col in df.columns:
                 c_upper = str(col).upper().strip()
@@ -121,11 +105,13 @@ class ReconciliationController:
         try: return float(s)
         except: return 0.0
 
-    def analyze_bank(self, file_path, mapping=None):
+    def analyze_bank(self, file_path, mapping=None, optimal=False):
         """
         Smart Bank Reconciliation:
         Phase 1: Iterate CSV against DB (Exact & Fuzzy).
         Phase 2: Detect 'No en Banco' (Unmatched DB records).
+        optimal: assign payments per amount block minimizing date distance (PaymentMatcher.assign)
+        instead of greedily in file order.
         """
         db = SessionLocal()
         db_pagos = None 
@@ -159,130 +145,112 @@ class ReconciliationController:
                  return False, f"Columnas faltantes en el archivo: {missing}. (Detectadas: {list(df.columns)})"
 
 
-            # --- 2. PRELOAD SYSTEM CONTEXT ---
-            # Get Min/Max Date from CSV to query DB range
-            try:
-                # Quick scan for date range
-                dates = []
-                for x in df[column_map['fecha']]:
-                    try: 
-                        if hasattr(x, 'date'): dates.append(x.date())
-                        else: dates.append(pd.to_datetime(x, dayfirst=True).date())
-                    except: pass
-                if dates:
-                    min_date = min(dates)
-                    max_date = max(dates)
-                    print(f"DEBUG: CSV Date Range: {min_date} to {max_date}")
-                else:
-                    return False, "No se detectaron fechas válidas."
-            except: 
-                return False, "Error rango fechas."
-
+            # --- 2. PARSE STATEMENT ROWS (column-wise) ---
+            def column(key):
+                col = column_map.get(key)
+                return df[col] if col and col in df.columns else None
+
+            raw_dates = column('fecha')
+            dates = parse_fuzzy_date_series(raw_dates) if raw_dates is not None else pd.Series(pd.NaT, index=df.index)
+            
+            # Norm Amount
+            amounts = pd.Series(0.0, index=df.index)
+            c_deb, c_cred = column_map.get('debito'), column_map.get('credito')
+            
+            # Handle Independent Columns
+            if c_deb or c_cred:
+                if column('debito') is not None:
+                    v_deb = parse_localized_float_series(column('debito'))
+                    amounts -= v_deb.where(v_deb > 0, 0.0) # Payment = Negative
+                if column('credito') is not None:
+                    v_cred = parse_localized_float_series(column('credito'))
+                    amounts += v_cred.where(v_cred > 0, 0.0) # Deposit = Positive
+            # Fallback to single 'Importe' column if neither specific col is mapped
+            elif column('importe') is not None:
+                raw_imp = column('importe')
+                amounts = parse_localized_float_series(raw_imp)
+                negative = raw_imp.map(lambda v: isinstance(v, str) and '-' in v)
+                amounts = amounts.mask(negative, -amounts.abs())
+
+            descs = column('descripcion').astype(str).str.slice(0, 50) if column('descripcion') is not None else pd.Series("", index=df.index)
+            refs = column('referencia') if column('referencia') is not None else pd.Series("", index=df.index)
+
+            bank_rows = [
+                (date_val, final_amount, desc, ref)
+                for ok, date_val, final_amount, desc, ref in zip(
+                    dates.notna().tolist(), dates.dt.date.tolist(), amounts.tolist(), descs.tolist(), refs.tolist()
+                ) if ok
+            ]
+
+            if not bank_rows:
+                return False, "No se detectaron fechas válidas."
+            min_date = min(r[0] for r in bank_rows)
+            max_date = max(r[0] for r in bank_rows)
+            print(f"DEBUG: CSV Date Range: {min_date} to {max_date}")
+
+            # --- 3. PRELOAD SYSTEM CONTEXT ---
             # Fetch System Pagos in Range (-365 Days buffer for checks/clearing)
             # This covers payments made in previous months/years (e.g. widely different dates)
             from datetime import timedelta
+            from models.entities import Obligacion, ProveedorServicio
+            from services.reconciliation_service import PaymentMatcher, match_status
             search_start = min_date - timedelta(days=365)
             search_end = max_date + timedelta(days=365)
             
-            db_pagos = db.query(Pago).filter(
-                Pago.fecha_pago >= search_start,
-                Pago.fecha_pago <= search_end
-            ).all()
+            # One query with the display data (no per-payment lazy loads of vencimiento -> obligacion -> proveedor)
+            db_pagos = db.query(
+                Pago.id, Pago.fecha_pago, Vencimiento.id, Vencimiento.monto_original, ProveedorServicio.nombre_entidad
+            ).select_from(Pago)\
+                .outerjoin(Vencimiento, Pago.vencimiento_id == Vencimiento.id)\
+                .outerjoin(Obligacion, Vencimiento.obligacion_id == Obligacion.id)\
+                .outerjoin(ProveedorServicio, Obligacion.servicio_id == ProveedorServicio.id)\
+                .filter(Pago.fecha_pago >= search_start, Pago.fecha_pago <= search_end)\
+                .order_by(Pago.id).all()
             print(f"DEBUG: System Payments Found: {len(db_pagos)} (Range: {search_start} to {search_end})")
             
-            # Create a mutable list/pool for matching
-            # Store ID to track usage
-            system_pool = []
-            for p in db_pagos:
-                val = p.vencimiento.monto_original if p.vencimiento else 0.0
-                system_pool.append({
-                    'id': p.id,
-                    'obj': p,
-                    'fecha': p.fecha_pago,
-                    'monto': float(val), # Assuming positive for payments
-                    'matched': False
-                })
+            # Unmatched payments indexed by amount (cents) + date (see PaymentMatcher)
+            system_pool = PaymentMatcher(
+                [{
+                    'id': pago_id,
+                    'fecha': fecha,
+                    'monto': float(monto or 0.0) if venc_id else 0.0, # Assuming positive for payments
+                    'vencimiento_id': venc_id,
+                    'proveedor': proveedor,
+                } for pago_id, fecha, venc_id, monto, proveedor in db_pagos],
+                amount=lambda x: x['monto'], date=lambda x: x['fecha']
+            )
+
+            assigned = system_pool.assign([(amount, fecha) for fecha, amount, _, _ in bank_rows]) if optimal else None
 
-            # --- 3. FORWARD PASS (CSV -> DB) ---
-            for index, row in df.iterrows():
+            # --- 4. FORWARD PASS (CSV -> DB) ---
+            for pos, (date_val, final_amount, desc, ref) in enumerate(bank_rows):
                 try:
-                    # Norm Date
-                    raw_date = row.get(column_map.get('fecha'))
-                    date_val = parse_fuzzy_date(raw_date)
-                    
-                    if not date_val: continue
-                    
-                    # Norm Amount
-                    final_amount = 0.0
-                    c_deb = column_map.get('debito')
-                    c_cred = column_map.get('credito')
-                    
-                    # Handle Independent Columns
-                    if c_deb:
-                        v_deb = parse_localized_float(row.get(c_deb))
-                        if v_deb > 0: final_amount -= v_deb # Payment = Negative
-                        
-                    if c_cred:
-                        v_cred = parse_localized_float(row.get(c_cred))
-                        if v_cred > 0: final_amount += v_cred # Deposit = Positive
-                        
-                    # Fallback to single 'Importe' column if neither specific col matched or value is still 0 (and importer exists)
-                    if final_amount == 0.0 and (not c_deb and not c_cred):
-                        final_amount = parse_localized_float(row.get(column_map.get('importe')))
-                        if isinstance(row.get(column_map.get('importe')), str) and '-' in str(row.get(column_map.get('importe'))):
-                            final_amount = -abs(final_amount)
-
-                    desc = str(row.get(column_map.get('descripcion'), ""))[:50]
-                    
                     # MATCHING LOGIC
                     # Target Amount: Bank outflow (-100) matches System Payment (100) usually.
                     # Or Bank inflow (100) matches System Collection (100).
                     # Let's assume absolute comparison for Matching for now to simpler things.
-                    target_amt = abs(final_amount)
-                    
+                    # SMART MATCH V2: Amount Priority (within 0.05) + Date Proximity (nearest, before or after)
                     match_found = None
                     status = "NO_EN_SISTEMA"
                     
-                    # SMART MATCH V2: Amount Priority + Date Proximity
-                    # 1. Filter ALL by Amount (Exact within tolerance)
-                    candidates = [x for x in system_pool if not x['matched'] and abs(x['monto'] - target_amt) < 0.05]
-                    
-                    if candidates:
-                        # 2. Find Closest Date
-                        # We use abs(days) to find the nearest one, whether slightly before or after.
-                        best_match = min(candidates, key=lambda x: abs((x['fecha'] - date_val).days))
-                        
-                        match_found = best_match
-                        
-                        days_diff = abs((match_found['fecha'] - date_val).days)
-                        if days_diff == 0: status = "MATCH"
-                        elif days_diff <= 5: status = "DIFERENCIA_FECHA" # Small slip
-                        else: status = "MATCH_LEJANO" # Large slip but amount matches exactly
+                    found = assigned[pos] if optimal else system_pool.take(final_amount, date_val)
+                    if found:
+                        match_found, days_diff = found
+                        status = match_status(days_diff)
                     
                     db_val = 0.0
                     display_desc = desc
-                    display_date = date_val
                     
                     if match_found:
-                         match_found['matched'] = True
                          db_val = match_found['monto']
                          # Sign correction for display
                          if final_amount < 0: db_val = -db_val
                          
                          # OVERWRITE WITH SYSTEM DATA (User Request)
-                         if match_found['obj'].vencimiento:
-                             v = match_found['obj'].vencimiento
-                             # Construct description manually since property might be missing
-                             v_desc = "Vencimiento"
-                             if v.obligacion and v.obligacion.proveedor:
-                                  v_desc = v.obligacion.proveedor.nombre_entidad
-                             
+                         if match_found['vencimiento_id']:
+                             v_desc = match_found['proveedor'] or "Vencimiento"
                              display_desc = f"✅ {v_desc}"
-                             # display_date = match_found['fecha'] # User asked to "Include as real date...". 
-                             # Usually Reconciliation keeps Bank Date as reference for the bank statement row, 
-                             # but shows System Data alongside. Changing the PRIMARY date column might confuse the "Bank Timeline".
-                             # I will keep Bank Date in 'fecha' column but put System Date in description or separate column if Grid supports it.
-                             # For now, let's append date to desc to be safe:
+                             # Bank Date stays the row key ('fecha'); System Date goes in the description
                              display_desc += f" ({match_found['fecha'].strftime('%d/%m')})"
 
                     report.append({
@@ -292,7 +260,7 @@ class ReconciliationController:
                         "valor_db": db_val,
                         "status": status,
                         "moneda": "ARS",
-                        "ref": row.get(column_map.get('referencia'), "") if column_map.get('referencia') else ""
+                        "ref": ref
                     })
 
                 except Exception as e:
@@ -300,7 +268,7 @@ class ReconciliationController:
                     import traceback
                     traceback.print_exc()
 
-            # --- 4. BACKWARD PASS REMOVED (User Request) ---
+            # --- 5. BACKWARD PASS REMOVED (User Request) ---
             # Strictly list Bank File content only.
             
             print(f"DEBUG: Report size: {len(report)}")
@@ -316,6 +284,7 @@ class ReconciliationController:
         """
         Supplier Reconciliation:
         Matches CSV lines (Date, Amount) against System 'Vencimientos' (Debts).
+        One query for the file's date range, then an in-memory (fecha, monto in cents) index.
         """
         db = SessionLocal()
         try:
@@ -327,36 +296,46 @@ class ReconciliationController:
             col_amount = next((c for c in df.columns if 'total' in c.lower() or 'impor' in c.lower() or 'monto' in c.lower()), df.columns[1])
             col_ref = next((c for c in df.columns if 'fact' in c.lower() or 'ref' in c.lower()), None) # Invoice ID
 
-            for index, row in df.iterrows():
-                try:
-                    raw_date = row[col_date]
-                    date_val = parse_fuzzy_date(raw_date)
-                    if not date_val: continue
-                    
-                    amt_val = parse_localized_float(row[col_amount])
-                    
-                    # Search Vencimientos (Accounts Payable)
-                    # Match Date and Amount
-                    q = db.query(Vencimiento).filter(
-                        Vencimiento.fecha_vencimiento == date_val,
-                        Vencimiento.monto_original == amt_val
-                    )
-                    existing = q.first()
-                    
-                    status = "MATCH" if existing else "NEW"
-                    db_val = existing.monto_original if existing else 0.0
-                    
-                    desc = f"Factura {row[col_ref]}" if col_ref else "Obligacion Detectada"
-
-                    report.append({
-                        "fecha": date_val,
-                        "concepto": desc,
-                        "valor_csv": amt_val,
-                        "valor_db": db_val,
-                        "status": status,
-                        "moneda": "ARS"
-                    })
-                except: pass
+            # 1. Parse lines (column-wise)
+            dates = parse_fuzzy_date_series(df[col_date])
+            amounts = parse_localized_float_series(df[col_amount])
+            descs = ("Factura " + df[col_ref].astype(str)) if col_ref else pd.Series("Obligacion Detectada", index=df.index)
+
+            lines = [
+                (date_val, amt_val, desc)
+                for ok, date_val, amt_val, desc in zip(dates.notna().tolist(), dates.dt.date.tolist(), amounts.tolist(), descs.tolist()) if ok
+            ]
+
+            if not lines:
+                return True, report
+
+            # 2. Active vencimientos (Accounts Payable) in the file's date range, indexed by (fecha, cents)
+            # Cents instead of float equality: 1500.1 from the file == 1500.10 stored
+            fechas = [day for day, _, _ in lines]
+            existing = {}
+            for fecha, monto in db.query(Vencimiento.fecha_vencimiento, Vencimiento.monto_original).filter(
+                Vencimiento.fecha_vencimiento >= min(fechas),
+                Vencimiento.fecha_vencimiento <= max(fechas),
+                Vencimiento.is_deleted == 0
+            ).order_by(Vencimiento.id):
+                existing.setdefault((fecha, int(round((monto or 0.0) * 100))), monto) # First by id, like .first()
+
+            # 3. Match Date and Amount in memory
+            for date_val, amt_val, desc in lines:
+                key = (date_val, int(round(amt_val * 100)))
+                match = key in existing
+                
+                status = "MATCH" if match else "NEW"
+                db_val = existing[key] if match else 0.0
+                
+                report.append({
+                    "fecha": date_val,
+                    "concepto": desc,
+                    "valor_csv": amt_val,
+                    "valor_db": db_val,
+                    "status": status,
+                    "moneda": "ARS"
+                })
                 
             return True, report
         except Exception as e:
@@ -371,7 +350,6 @@ class ReconciliationController:
         db = SessionLocal()
         try:
             from models.entities import EstadoVencimiento, Obligacion, ProveedorServicio
-            from sqlalchemy import or_, and_
             
             # Base Query: All non-deleted (Paid or Pending)
             query = db.query(Vencimiento).join(Vencimiento.obligacion).join(Obligacion.proveedor).filter(
@@ -428,13 +406,12 @@ class ReconciliationController:
                           is_date = True
                      
                      if not is_date:
-                         term = f"%{search_term}%"
-                         query = query.filter(
-                            or_(
-                                ProveedorServicio.nombre_entidad.ilike(term),
-                                Obligacion.numero_cliente_referencia.ilike(term)
-                            )
-                         )
+                         # Shared search index (proveedor, inmueble, nro. de cliente; word prefixes, no accents)
+                         from services.search_service import SearchService
+                         matches = SearchService.match_ids(db, search_term)
+                         if matches is None:
+                              return []
+                         query = query.filter(Vencimiento.obligacion_id.in_(matches))
                 
                 # Order by date desc
                 results = query.order_by(Vencimiento.fecha_vencimiento.desc()).limit(50).all()
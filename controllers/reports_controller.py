@@ -4,20 +4,31 @@ from utils.import_helper import format_currency
 import os
 import pandas as pd
 from datetime import datetime
+from dtos.vencimiento import VencimientoRow
 
 class ReportsController:
     def __init__(self):
         self.service = ReportService()
 
+    @staticmethod
+    def _names(v):
+        """(inmueble, proveedor) labels for a VencimientoRow (grid) or a Vencimiento entity."""
+        if isinstance(v, VencimientoRow):
+            return v.inmueble_alias or "-", v.proveedor_nombre or "-"
+        inm = v.obligacion.inmueble.alias if v.obligacion and v.obligacion.inmueble else "-"
+        prov = v.obligacion.proveedor.nombre_entidad if v.obligacion and v.obligacion.proveedor else "-"
+        return inm, prov
+
     def export_excel(self, vencimientos, filename="export_vencimientos.xlsx"):
         try:
             # Transform objects to dict list
             data = []
             for v in vencimientos:
+                inm, prov = self._names(v)
                 data.append({
                     "Fecha": v.fecha_vencimiento,
-                    "Inmueble": v.obligacion.inmueble.alias if v.obligacion and v.obligacion.inmueble else "-",
-                    "Servicio": v.obligacion.proveedor.nombre_entidad if v.obligacion and v.obligacion.proveedor else "-",
+                    "Inmueble": inm,
+                    "Servicio": prov,
                     "Monto": v.monto_original,
                     "Estado": v.estado
                 })
@@ -43,8 +54,7 @@ class ReportsController:
             
             for v in vencimientos:
                 date_str = v.fecha_vencimiento.strftime("%d/%m/%Y") if hasattr(v.fecha_vencimiento, 'strftime') else str(v.fecha_vencimiento)
-                inm = v.obligacion.inmueble.alias if (v.obligacion and v.obligacion.inmueble) else "-"
-                prov = v.obligacion.proveedor.nombre_entidad if (v.obligacion and v.obligacion.proveedor) else (v.obligacion.servicio_nombre_fake or "?")
+                inm, prov = self._names(v)
                 monto = format_currency(v.monto_original)
                 estado = v.estado
                 
@@ -2,7 +2,7 @@ from typing import List, Optional
 from models.entities import Vencimiento, EstadoVencimiento
 from services.vencimiento_service import VencimientoService
 from services.period_service import PeriodService
-from dtos.vencimiento import VencimientoCreateDTO, VencimientoUpdateDTO
+from dtos.vencimiento import VencimientoCreateDTO, VencimientoUpdateDTO, VencimientoRow
 from utils.logger import app_logger
 import os
 import platform
@@ -31,7 +31,13 @@ class VencimientosController:
     def get_upcoming_alerts(self, days=7) -> List[Vencimiento]:
         return self.service.get_upcoming(days=days)
 
-    def get_all_vencimientos(self, inmueble_id=None, estado=None, period_id=None, page=1, limit=50) -> tuple[List[Vencimiento], int]:
+    def get_all_vencimientos(self, inmueble_id=None, estado=None, period_id=None, page=1, limit=50,
+                             after=None, before=None) -> tuple[List[Vencimiento], int]:
+        """
+        One grid page + filtered total.
+        after / before: (fecha_vencimiento, id) of the last / first row on screen (keyset paging);
+        without them 'page' is used as an OFFSET.
+        """
         # Maps "Todos" to None for service layer
         f_inm = None if inmueble_id == FILTER_ALL_OPTION else inmueble_id
         f_est = None if estado == FILTER_ALL_OPTION else estado
@@ -41,8 +47,27 @@ class VencimientosController:
         # Best way: Update Service/Repository to default filter is_deleted=0.
         # Let's do it in Repository. For now, just pass args.
         
-        offset = (page - 1) * limit
-        return self.service.get_all(inmueble_id=f_inm, estado=f_est, period_id=period_id, limit=limit, offset=offset)
+        offset = None if (after or before) else (page - 1) * limit
+        return self.service.get_all(inmueble_id=f_inm, estado=f_est, period_id=period_id, limit=limit, offset=offset,
+                                    after=after, before=before)
+
+    def get_grid_rows(self, inmueble_id=None, estado=None, period_id=None, page=1, limit=50,
+                      after=None, before=None, proveedor_id=None, sort_col="fecha_vencimiento",
+                      sort_desc=True, search=None) -> tuple[List[VencimientoRow], int]:
+        """
+        One grid page as flat VencimientoRow objects (grid read model), filtered and sorted in SQL.
+        sort_col: VencimientoRow field; after / before: (value of sort_col, id) of the last / first row on screen.
+        search: free text (see SearchService).
+        """
+        f_inm = None if inmueble_id == FILTER_ALL_OPTION else inmueble_id
+        f_prov = None if proveedor_id == FILTER_ALL_OPTION else proveedor_id
+        f_est = None if estado == FILTER_ALL_OPTION else estado
+        if isinstance(f_est, str):
+            f_est = EstadoVencimiento(f_est) # UI passes the enum value
+        offset = None if (after or before) else (page - 1) * limit
+        return self.service.get_grid_rows(inmueble_id=f_inm, estado=f_est, period_id=period_id, limit=limit,
+                                          offset=offset, after=after, before=before, proveedor_id=f_prov,
+                                          sort_col=sort_col, sort_desc=sort_desc, search=(search or "").strip() or None)
 
     def get_vencimiento_details(self, vencimiento_id: int) -> Optional[Vencimiento]:
         """Get full vencimiento with relations (for editing)."""
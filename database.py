@@ -75,6 +75,11 @@ def init_db_engine(db_url=None):
     # expire_on_commit=False is CRITICAL for GUI applications
     _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine, expire_on_commit=False)
 
+    # Session hooks that keep derived data (resumen_mensual, obligacion stats, search index) in step with every write
+    import services.rollup_service # noqa: F401
+    import services.obligacion_stats # noqa: F401
+    import services.search_service # noqa: F401
+
 def run_migrations():
     """Runs simple migrations on existing database."""
     global _engine
@@ -134,18 +139,50 @@ def run_migrations():
                     conn.rollback()
                     print(f"MIGRATION FAILED (pagos.documento_id): {e}")
             
-            # 2. Check Integrity (Unique Obligations)
+            # Check 4b: content_hash in DOCUMENTOS (content-addressed store)
+            try:
+                conn.execute(text("SELECT content_hash FROM documentos LIMIT 1"))
+            except Exception:
+                conn.rollback()
+                print("MIGRATION: Adding 'content_hash' to 'documentos'...")
+                try:
+                    conn.execute(text("ALTER TABLE documentos ADD COLUMN content_hash VARCHAR(64)"))
+                    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_documentos_content_hash ON documentos(content_hash)"))
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"MIGRATION FAILED (documentos.content_hash): {e}")
+            
+            # Check 5: Derived / cache / store tables (not part of the legacy schema)
             try:
-                # SQLite doesn't support ADD CONSTRAINT easily. We use unique index.
-                conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uk_obligacion_inmueble_servicio ON obligaciones(inmueble_id, servicio_id)"))
-                
-                # Phase 2: Performance Indexes for FKs
-                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_obligacion_inmueble ON obligaciones(inmueble_id)"))
-                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_obligacion_servicio ON obligaciones(servicio_id)"))
-                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_pago_vencimiento ON pagos(vencimiento_id)"))
-                conn.execute(text("CREATE INDEX IF NOT EXISTS idx_regla_obligacion ON reglas_ajuste(obligacion_id)"))
+                from models.entities import CotizacionDiaria, SyncWatermark, IndicadorTecnico, ResumenMensual, DocumentoBlob
+                for model in (CotizacionDiaria, SyncWatermark, IndicadorTecnico, ResumenMensual, DocumentoBlob):
+                    model.__table__.create(bind=conn, checkfirst=True)
+                conn.commit()
 
+                from services.rollup_service import ResumenMensualService
+                if ResumenMensualService.ensure_populated(conn):
+                    conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"MIGRATION FAILED (derived tables): {e}")
+
+            # Check 6: Full-text search index (FTS5 / tsvector, see services/search_service.py)
+            try:
+                from services.search_service import SearchService
+                if SearchService.ensure_index(conn):
+                    print("MIGRATION: Search index built.")
                 conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"MIGRATION FAILED (search index): {e}")
+
+            # 2. Integrity + performance indexes (declared catalogue, see models/indexes.py)
+            try:
+                from models.indexes import apply_index_catalog
+                created = apply_index_catalog(conn)
+                if created:
+                    print(f"MIGRATION: {created} indexes created.")
             except Exception as e:
                 print(f"MIGRATION INDEX INFO: {e}")
 
@@ -169,6 +206,7 @@ def create_new_db_file(path):
     # We must ensure models are imported somewhere in the app before this runs.
     # Usually main_window imports controllers which import models.
     from models.entities import Inmueble, Obligacion, Vencimiento, Pago, IndiceEconomico
+    import models.indexes # Declared indexes are part of the schema
     
     Base.metadata.create_all(bind=temp_engine)
     temp_engine.dispose()
@@ -34,11 +34,22 @@ class VencimientoUpdateDTO:
     documento_id: Optional[int] = None
     comprobante_pago_id: Optional[int] = None
 
-
-
-
-
-
-
-
-
+@dataclass(slots=True)
+class VencimientoRow:
+    """
+    Read model for the vencimientos grid: flat columns only, no ORM state.
+    Sort/filter by plain field names (e.g. 'inmueble_alias'); use the id to fetch
+    the full entity (VencimientosController.get_vencimiento_details) when editing.
+    """
+    id: int
+    obligacion_id: int
+    periodo: str
+    fecha_vencimiento: date
+    monto_original: float
+    estado: EstadoVencimiento
+    inmueble_alias: Optional[str] = None
+    proveedor_nombre: Optional[str] = None
+    ruta_archivo_pdf: Optional[str] = None
+    documento_id: Optional[int] = None
+    ruta_comprobante_pago: Optional[str] = None
+    comprobante_pago_id: Optional[int] = None
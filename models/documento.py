@@ -1,6 +1,6 @@
 
 from sqlalchemy import Column, Integer, String, LargeBinary, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from .entities import Base
 
@@ -9,10 +9,11 @@ class Documento(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String(255), nullable=False)
-    file_data = Column(LargeBinary, nullable=False) # Stores the actual bytes
+    file_data = deferred(Column(LargeBinary, nullable=False)) # Stores the actual bytes (loaded on access)
     upload_date = Column(DateTime, default=datetime.now)
     mime_type = Column(String(100), nullable=True) # e.g., 'application/pdf', 'image/jpeg'
     file_size = Column(Integer, nullable=True) # Size in bytes
+    content_hash = Column(String(64), nullable=True, index=True) # DocumentStore key (NULL = inline bytes)
 
     # Relationship back to Vencimiento/Pago will be defined in those models or here if needed.
     # But usually, Vencimiento has foreign key 'documento_id'.
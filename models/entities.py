@@ -1,6 +1,6 @@
 
 from sqlalchemy import create_engine, Column, Integer, String, Float, Date, Boolean, ForeignKey, Enum, Text, DateTime, event, LargeBinary, CheckConstraint
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.orm import relationship, declarative_base, deferred
 from enum import Enum as PyEnum
 from datetime import date, datetime
 
@@ -88,7 +88,8 @@ class Moneda(PyEnum):
 class Vencimiento(Base):
     __tablename__ = 'vencimientos'
     __table_args__ = (
-        CheckConstraint(r"periodo ~ '^\d{4}-\d{2}$'", name='chk_vencimiento_periodo_fmt'),
+        # Regex CHECK is Postgres-only; SQLite files are created without it.
+        CheckConstraint(r"periodo ~ '^\d{4}-\d{2}$'", name='chk_vencimiento_periodo_fmt').ddl_if(dialect='postgresql'),
     )
     id = Column(Integer, primary_key=True, autoincrement=True)
     
@@ -189,7 +190,7 @@ class Credencial(Base):
 class IndiceEconomico(Base):
     __tablename__ = 'indices_economicos'
     __table_args__ = (
-        CheckConstraint(r"periodo ~ '^\d{4}-\d{2}$'", name='chk_indice_periodo_fmt'),
+        CheckConstraint(r"periodo ~ '^\d{4}-\d{2}$'", name='chk_indice_periodo_fmt').ddl_if(dialect='postgresql'),
     )
     id = Column(Integer, primary_key=True, autoincrement=True)
     # tipo = Column(String(50)) # "IPC", "UVA" # Removed not in DB
@@ -204,11 +205,59 @@ class Cotizacion(Base):
     compra = Column(Float)
     venta = Column(Float)
 
+class CotizacionDiaria(Base):
+    """
+    Derived table: effective selling rate for EVERY calendar day
+    (weekends/holidays carry the last quote forward). Rebuilt from 'cotizaciones'.
+    """
+    __tablename__ = 'cotizaciones_diarias'
+    fecha = Column(Date, primary_key=True)
+    moneda = Column(String(3), primary_key=True) # Moneda value, e.g. "USD"
+    venta = Column(Float)
+    fecha_origen = Column(Date) # Date of the quote this rate was carried from
+
+class IndicadorTecnico(Base):
+    """
+    Derived table: technical indicators per quote date (EMA 12/26, SMA 20, MACD, Signal).
+    Extended incrementally from 'cotizaciones' (EMAs only need the previous row).
+    """
+    __tablename__ = 'indicadores_tecnicos'
+    fecha = Column(Date, primary_key=True)
+    moneda = Column(String(3), primary_key=True) # Moneda value, e.g. "USD"
+    venta = Column(Float)
+    ema_12 = Column(Float)
+    ema_26 = Column(Float)
+    sma_20 = Column(Float) # NULL for the first 19 quotes
+    macd = Column(Float)
+    signal = Column(Float)
+
+class ResumenMensual(Base):
+    """
+    Rollup of active vencimientos: SUM(monto_original) and COUNT per
+    periodo / moneda / estado / inmueble / proveedor (categoria via proveedores).
+    Maintained incrementally by services.rollup_service; '' / 0 stand for missing values.
+    """
+    __tablename__ = 'resumen_mensual'
+    periodo = Column(String(7), primary_key=True)
+    moneda = Column(String(3), primary_key=True)
+    estado = Column(String(20), primary_key=True)
+    inmueble_id = Column(Integer, primary_key=True)
+    proveedor_id = Column(Integer, primary_key=True)
+    total = Column(Float, default=0.0)
+    cantidad = Column(Integer, default=0)
+
+class SyncWatermark(Base):
+    """Last successful sync per external source (e.g. 'BNA_USD')."""
+    __tablename__ = 'sync_watermarks'
+    fuente = Column(String(50), primary_key=True)
+    ultima_fecha = Column(Date) # Newest data date received from the source
+    ultimo_sync = Column(DateTime) # When the sync ran
+
 
 class PeriodoContable(Base):
     __tablename__ = 'periodos_contables'
     __table_args__ = (
-        CheckConstraint(r"periodo_id ~ '^\d{4}-\d{2}$'", name='chk_periodo_contable_fmt'),
+        CheckConstraint(r"periodo_id ~ '^\d{4}-\d{2}$'", name='chk_periodo_contable_fmt').ddl_if(dialect='postgresql'),
     )
     # Use simple integer ID for better FK referencing if needed, or composite.
     # But string "MM-YYYY" is currently the main identifier across app.
@@ -264,7 +313,29 @@ class Documento(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String(255), nullable=False)
-    file_data = Column(LargeBinary, nullable=False) # Stores the actual bytes
+    # Stores the actual bytes. Deferred: listings load metadata only; the payload is
+    # read on access (or with undefer()) by the download paths.
+    file_data = deferred(Column(LargeBinary, nullable=False))
     upload_date = Column(DateTime, default=datetime.now)
     mime_type = Column(String(100), nullable=True) # e.g., 'application/pdf', 'image/jpeg'
     file_size = Column(Integer, nullable=True) # Size in bytes
+
+    # Content-addressed store (DocumentStore): payload lives in 'documento_blobs' / on disk,
+    # file_data stays empty. NULL = legacy row with the bytes inline.
+    content_hash = Column(String(64), nullable=True, index=True)
+
+class DocumentoBlob(Base):
+    """
+    One row per distinct document content (SHA-256 of the original bytes).
+    ref_count = documentos rows pointing at it; the payload is dropped when it reaches 0.
+    """
+    __tablename__ = 'documento_blobs'
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)            # Original bytes
+    stored_size = Column(Integer, nullable=False)     # After compression
+    compression = Column(String(10), default="")      # '' | 'zlib'
+    backend = Column(String(10), default="db")        # 'db' (data column) | 'fs' (DOCS_DIR/_store)
+    data = deferred(Column(LargeBinary, nullable=True))
+    ref_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.now)
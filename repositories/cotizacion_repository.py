@@ -0,0 +1,70 @@
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from models.entities import Cotizacion, Moneda
+from repositories.base_repository import BaseRepository
+
+class CotizacionRepository(BaseRepository[Cotizacion]):
+    # Rows per INSERT statement. 4 bound params per row keeps us far below
+    # SQLite's host-parameter limit (999 on old builds).
+    UPSERT_CHUNK = 200
+
+    def get_latest_date(self, moneda: Moneda) -> Optional[date]:
+        return self.session.query(func.max(Cotizacion.fecha)).filter(Cotizacion.moneda == moneda).scalar()
+
+    def bulk_upsert(self, rows: List[dict], update_compra: bool = True) -> int:
+        """
+        INSERT ... ON CONFLICT (fecha, moneda) DO UPDATE for Postgres and SQLite.
+        rows: dicts with fecha, moneda, venta and optionally compra.
+        Existing rows are only touched when a value actually changes.
+        Returns the number of inserted + changed rows.
+        """
+        if not rows:
+            return 0
+
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            insert_fn = postgresql.insert
+        elif dialect == "sqlite":
+            insert_fn = sqlite.insert
+        else:
+            return self._upsert_fallback(rows, update_compra)
+
+        table = Cotizacion.__table__
+        total = 0
+        for start in range(0, len(rows), self.UPSERT_CHUNK):
+            chunk = rows[start:start + self.UPSERT_CHUNK]
+            if update_compra:
+                chunk = [{"compra": None, **r} for r in chunk] # Same keys on every row for multi-VALUES
+            stmt = insert_fn(table).values(chunk)
+
+            new_values = {"venta": stmt.excluded.venta}
+            changed = table.c.venta.is_distinct_from(stmt.excluded.venta)
+            if update_compra:
+                new_values["compra"] = stmt.excluded.compra
+                changed = changed | table.c.compra.is_distinct_from(stmt.excluded.compra)
+
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.fecha, table.c.moneda],
+                set_=new_values,
+                where=changed
+            )
+            result = self.session.execute(stmt)
+            total += max(result.rowcount or 0, 0)
+        return total
+
+    def _upsert_fallback(self, rows: List[dict], update_compra: bool) -> int:
+        """Row-by-row merge for dialects without ON CONFLICT."""
+        count = 0
+        for r in rows:
+            existing = self.session.get(Cotizacion, (r["fecha"], r["moneda"]))
+            if existing is None:
+                self.session.add(Cotizacion(**r))
+                count += 1
+            elif existing.venta != r["venta"] or (update_compra and existing.compra != r.get("compra")):
+                existing.venta = r["venta"]
+                if update_compra:
+                    existing.compra = r.get("compra")
+                count += 1
+        return count
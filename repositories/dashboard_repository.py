@@ -0,0 +1,93 @@
+from datetime import date
+from typing import List
+from sqlalchemy import func, and_, case, extract, select
+from models.entities import Vencimiento, EstadoVencimiento, Obligacion, ProveedorServicio, Inmueble, Pago, ResumenMensual
+from repositories.base_repository import BaseRepository
+
+
+class DashboardRepository(BaseRepository[Vencimiento]):
+    """
+    Grouped passes over 'vencimientos' for the dashboard.
+    Each KPI / chart is a conditional aggregate (SUM(CASE ...)) inside one
+    GROUP BY, so a dashboard load costs a handful of round-trips instead of one per widget.
+    """
+
+    @staticmethod
+    def _exigible_amount():
+        # MAX(original, actualizado) to capture surcharges (GREATEST is not portable to SQLite)
+        return case(
+            (Vencimiento.monto_actualizado > Vencimiento.monto_original, Vencimiento.monto_actualizado),
+            else_=Vencimiento.monto_original
+        )
+
+    def kpi_pass(self, effective_date: date, prevision_until: date, limit_48h: date, streak_month: int) -> List[tuple]:
+        """
+        One row per (moneda, inmueble_id):
+        (moneda, inmueble_id, deuda, n_deuda, prevision, n_48h, n_streak, total_inmuebles)
+        """
+        amount = self._exigible_amount()
+        is_pending = Vencimiento.estado == EstadoVencimiento.PENDIENTE
+
+        exigible = (Vencimiento.estado == EstadoVencimiento.VENCIDO) | \
+            and_(is_pending, Vencimiento.fecha_vencimiento <= effective_date)
+        prevision = and_(is_pending, Vencimiento.fecha_vencimiento > effective_date, Vencimiento.fecha_vencimiento <= prevision_until)
+        next_48h = and_(is_pending, Vencimiento.fecha_vencimiento > effective_date, Vencimiento.fecha_vencimiento <= limit_48h)
+        streak = and_(
+            Vencimiento.estado == EstadoVencimiento.PAGADO,
+            extract('month', Vencimiento.fecha_vencimiento) == streak_month
+        )
+        total_inmuebles = select(func.count(Inmueble.id)).scalar_subquery()
+
+        return self.session.query(
+            Vencimiento.moneda,
+            Obligacion.inmueble_id,
+            func.sum(case((exigible, amount))),
+            func.count(case((exigible, 1))),
+            func.sum(case((prevision, amount))),
+            func.count(case((next_48h, 1))),
+            func.count(case((streak, 1))),
+            total_inmuebles
+        ).select_from(Vencimiento).join(Obligacion).filter(
+            Vencimiento.is_deleted == 0
+        ).group_by(Vencimiento.moneda, Obligacion.inmueble_id).all()
+
+    def chart_pass(self, start: date, end: date) -> List[tuple]:
+        """
+        One row per (year, month, inmueble alias, categoria, moneda) in [start, end]:
+        (y, m, alias, categoria, moneda, amount)
+        Amount: paid amount for PAGADO, MAX(original, actualizado) otherwise.
+        """
+        actual_amount = case(
+            (Vencimiento.estado == EstadoVencimiento.PAGADO, func.coalesce(Pago.monto, Vencimiento.monto_original)),
+            else_=self._exigible_amount()
+        )
+        y = extract('year', Vencimiento.fecha_vencimiento).label('y')
+        m = extract('month', Vencimiento.fecha_vencimiento).label('m')
+
+        return self.session.query(
+            y, m, Inmueble.alias, ProveedorServicio.categoria, Vencimiento.moneda, func.sum(actual_amount)
+        ).select_from(Vencimiento).outerjoin(Pago).join(Obligacion).join(Inmueble).join(ProveedorServicio).filter(
+            Vencimiento.fecha_vencimiento >= start,
+            Vencimiento.fecha_vencimiento <= end,
+            Vencimiento.is_deleted == 0
+        ).group_by(y, m, Inmueble.alias, ProveedorServicio.categoria, Vencimiento.moneda).all()
+
+    def period_pass(self, periods: List[str]) -> List[tuple]:
+        """(periodo, categoria, SUM(monto_original)) for the given periods, from the monthly rollup."""
+        return self.session.query(
+            ResumenMensual.periodo, ProveedorServicio.categoria, func.sum(ResumenMensual.total)
+        ).select_from(ResumenMensual).join(ProveedorServicio, ResumenMensual.proveedor_id == ProveedorServicio.id).filter(
+            ResumenMensual.periodo.in_(periods)
+        ).group_by(ResumenMensual.periodo, ProveedorServicio.categoria).all()
+
+    def upcoming_pending(self, start: date, end: date, limit: int = 5) -> List[tuple]:
+        """(fecha, monto_original, moneda, inmueble alias, proveedor) of the next PENDIENTE items."""
+        return self.session.query(
+            Vencimiento.fecha_vencimiento, Vencimiento.monto_original, Vencimiento.moneda,
+            Inmueble.alias, ProveedorServicio.nombre_entidad
+        ).select_from(Vencimiento).join(Obligacion).join(Inmueble).join(ProveedorServicio).filter(
+            Vencimiento.estado == EstadoVencimiento.PENDIENTE,
+            Vencimiento.fecha_vencimiento >= start,
+            Vencimiento.fecha_vencimiento <= end,
+            Vencimiento.is_deleted == 0
+        ).order_by(Vencimiento.fecha_vencimiento, Vencimiento.id).limit(limit).all()
@@ -1,44 +1,133 @@
 from typing import List, Optional
-from sqlalchemy.orm import joinedload
-from models.entities import Vencimiento, Obligacion
+from sqlalchemy import func, tuple_, select, literal
+from sqlalchemy.orm import joinedload, selectinload
+from models.entities import Vencimiento, Obligacion, Inmueble, ProveedorServicio
 from repositories.base_repository import BaseRepository
+from services.search_service import SearchService
+from dtos.vencimiento import VencimientoRow
 from config import FILTER_ALL_OPTION
 
 class VencimientoRepository(BaseRepository[Vencimiento]):
-    def get_details_all(self, inmueble_id=None, estado=None, period_id=None, limit=None, offset=None) -> tuple[List[Vencimiento], int]:
-        """Get vencimientos with joined relationships. Returns (items, total_count)."""
+    # Grid order; (fecha_vencimiento, id) is unique, so it doubles as the page cursor
+    ORDER_DESC = (Vencimiento.fecha_vencimiento.desc(), Vencimiento.id.desc())
 
-        query = self.session.query(Vencimiento).options(
-            joinedload(Vencimiento.obligacion).joinedload(Obligacion.inmueble),
-            joinedload(Vencimiento.obligacion).joinedload(Obligacion.proveedor),
-            joinedload(Vencimiento.pagos),
-            joinedload(Vencimiento.documento),
-            joinedload(Vencimiento.comprobante_pago)
-        )
+    # Columns of VencimientoRow, in field order
+    ROW_COLUMNS = (
+        Vencimiento.id, Vencimiento.obligacion_id, Vencimiento.periodo, Vencimiento.fecha_vencimiento,
+        Vencimiento.monto_original, Vencimiento.estado, Inmueble.alias, ProveedorServicio.nombre_entidad,
+        Vencimiento.ruta_archivo_pdf, Vencimiento.documento_id,
+        Vencimiento.ruta_comprobante_pago, Vencimiento.comprobante_pago_id
+    )
+
+    # Grid sort fields (VencimientoRow names) -> SQL column; id is always the tie-break
+    SORT_COLUMNS = {
+        "fecha_vencimiento": Vencimiento.fecha_vencimiento,
+        "monto_original": Vencimiento.monto_original,
+        "estado": Vencimiento.estado,
+        "inmueble_alias": Inmueble.alias,
+        "proveedor_nombre": ProveedorServicio.nombre_entidad,
+    }
 
+    def _filtered(self, query, inmueble_id=None, estado=None, period_id=None, proveedor_id=None, search=None):
         if period_id:
              query = query.filter(Vencimiento.periodo == period_id)
         
+        # Catalog filters resolve to obligacion ids (idx_obligacion_inmueble / idx_obligacion_servicio),
+        # then hit vencimientos(periodo, obligacion_id) without joining the catalogs
         if inmueble_id and inmueble_id != FILTER_ALL_OPTION:
-             query = query.join(Obligacion).filter(Obligacion.inmueble_id == inmueble_id)
+             query = query.filter(Vencimiento.obligacion_id.in_(
+                 select(Obligacion.id).where(Obligacion.inmueble_id == inmueble_id)))
+
+        if proveedor_id and proveedor_id != FILTER_ALL_OPTION:
+             query = query.filter(Vencimiento.obligacion_id.in_(
+                 select(Obligacion.id).where(Obligacion.servicio_id == proveedor_id)))
+
+        # Free text: obligaciones whose search document matches (search_index, see SearchService)
+        matches = SearchService.match_ids(self.session, search) if search else None
+        if matches is not None:
+             query = query.filter(Vencimiento.obligacion_id.in_(matches))
             
         if estado and estado != FILTER_ALL_OPTION:
             query = query.filter(Vencimiento.estado == estado)
 
         # Default Filter: Hide Deleted
-        query = query.filter(Vencimiento.is_deleted == 0)
-            
-        total_count = query.count()
-        
-        # Apply Sorting default (Date DESC)
-        query = query.order_by(Vencimiento.fecha_vencimiento.desc())
+        return query.filter(Vencimiento.is_deleted == 0)
+
+    def count_details(self, inmueble_id=None, estado=None, period_id=None, proveedor_id=None, search=None) -> int:
+        """COUNT(id) with the grid filters only (no eager-load joins)."""
+        return self._filtered(
+            self.session.query(func.count(Vencimiento.id)), inmueble_id, estado, period_id, proveedor_id, search
+        ).scalar() or 0
+
+    def get_details_all(self, inmueble_id=None, estado=None, period_id=None, limit=None, offset=None,
+                        after: tuple = None, before: tuple = None, with_count: bool = True) -> tuple[List[Vencimiento], int]:
+        """
+        Get vencimientos with their relationships, ordered by (fecha_vencimiento DESC, id DESC).
+        Returns (items, total_count); total_count is None when with_count=False.
+
+        Keyset pagination: after=(fecha, id) of the last row shown returns the next page,
+        before=(fecha, id) of the first row shown returns the previous one. offset is kept
+        for callers that still page by number.
+        """
+        # pagos is a collection: selectinload keeps LIMIT on vencimientos rows (one extra IN query)
+        query = self._filtered(self.session.query(Vencimiento), inmueble_id, estado, period_id).options(
+            joinedload(Vencimiento.obligacion).joinedload(Obligacion.inmueble),
+            joinedload(Vencimiento.obligacion).joinedload(Obligacion.proveedor),
+            selectinload(Vencimiento.pagos),
+            joinedload(Vencimiento.documento),
+            joinedload(Vencimiento.comprobante_pago)
+        )
+
+        total_count = self.count_details(inmueble_id, estado, period_id) if with_count else None
+        return self._page(query, limit, offset, after, before), total_count
+
+    def get_grid_rows(self, inmueble_id=None, estado=None, period_id=None, limit=None, offset=None,
+                      after: tuple = None, before: tuple = None, proveedor_id=None,
+                      sort_col: str = "fecha_vencimiento", sort_desc: bool = True, search: str = None) -> List[VencimientoRow]:
+        """
+        Grid page projected to VencimientoRow: one SELECT of the grid columns
+        (inmueble/proveedor names joined in), no identity map, no pagos/documentos.
+
+        sort_col is a VencimientoRow field (see SORT_COLUMNS); the keyset cursor is then
+        (value of sort_col, id) of the first/last row on screen. search: free text
+        (word prefixes, accent-insensitive) over proveedor, inmueble and nro. de cliente.
+        """
+        query = self.session.query(*self.ROW_COLUMNS).select_from(Vencimiento)\
+            .outerjoin(Obligacion, Vencimiento.obligacion_id == Obligacion.id)\
+            .outerjoin(Inmueble, Obligacion.inmueble_id == Inmueble.id)\
+            .outerjoin(ProveedorServicio, Obligacion.servicio_id == ProveedorServicio.id)
+        query = self._filtered(query, inmueble_id, estado, period_id, proveedor_id, search)
+        rows = self._page(query, limit, offset, after, before, self.SORT_COLUMNS[sort_col], sort_desc)
+        return [VencimientoRow(*r) for r in rows]
+
+    def _page(self, query, limit=None, offset=None, after: tuple = None, before: tuple = None,
+              sort_column=Vencimiento.fecha_vencimiento, sort_desc: bool = True) -> list:
+        """Applies ORDER BY (sort_column, id) and the keyset (after/before) or OFFSET window."""
+        key = tuple_(sort_column, Vencimiento.id)
+
+        def cursor(values):
+            # Typed binds, so enum / date cursor values are converted like column values
+            return tuple_(*(literal(v, c.type) for v, c in zip(values, (sort_column, Vencimiento.id))))
+
+        forward = (sort_column.desc(), Vencimiento.id.desc()) if sort_desc else (sort_column.asc(), Vencimiento.id.asc())
+        backward = (sort_column.asc(), Vencimiento.id.asc()) if sort_desc else (sort_column.desc(), Vencimiento.id.desc())
+        if after is not None:
+            query = query.filter(key < cursor(after) if sort_desc else key > cursor(after)).order_by(*forward)
+        elif before is not None:
+            # Walk backwards from the cursor, then restore the grid order
+            query = query.filter(key > cursor(before) if sort_desc else key < cursor(before)).order_by(*backward)
+        else:
+            query = query.order_by(*forward)
         
         if limit is not None:
             query = query.limit(limit)
-        if offset is not None:
+        if offset is not None and after is None and before is None:
             query = query.offset(offset)
-            
-        return query.all(), total_count
+
+        items = query.all()
+        if before is not None:
+            items.reverse()
+        return items
     
     def get_with_relations(self, id: int) -> Optional[Vencimiento]:
         return self.session.query(Vencimiento).options(
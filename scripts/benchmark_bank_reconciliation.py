@@ -0,0 +1,111 @@
+import sys
+import os
+import csv
+import time
+import random
+import tempfile
+from datetime import date, timedelta
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.benchmark_helpers import setup_sqlite_db, seed_catalogs, seed_paid_vencimientos
+from database import SessionLocal
+from models.entities import Pago
+from services.reconciliation_service import PaymentMatcher
+from controllers.reconciliation_controller import ReconciliationController
+
+N_PAGOS = 50000
+N_LINES = 20000
+MATCHED_SHARE = 0.75 # Statement lines that correspond to a system payment
+LEGACY_SAMPLE = 1000 # Lines run through the old linear scan (20k x 50k would take minutes)
+
+
+def legacy_match(bank, pool):
+    """Previous analyze_bank loop: scan the whole pool per line, nearest date among same-amount candidates."""
+    pool = [dict(x, matched=False) for x in pool]
+    out = []
+    for amount, fecha in bank:
+        target = abs(amount)
+        candidates = [x for x in pool if not x['matched'] and abs(x['monto'] - target) < 0.05]
+        if candidates:
+            best = min(candidates, key=lambda x: abs((x['fecha'] - fecha).days))
+            best['matched'] = True
+            out.append((best['id'], abs((best['fecha'] - fecha).days)))
+        else:
+            out.append(None)
+    return out
+
+
+def indexed_match(bank, pool):
+    matcher = PaymentMatcher(pool, amount=lambda x: x['monto'], date=lambda x: x['fecha'])
+    out = []
+    for amount, fecha in bank:
+        found = matcher.take(amount, fecha)
+        out.append((found[0]['id'], found[1]) if found else None)
+    return out
+
+
+def write_statement(pagos, path):
+    """Bank CSV (es-AR number format): most lines are system payments with a few days of clearing slip."""
+    lines = []
+    for i in range(N_LINES):
+        if random.random() < MATCHED_SHARE:
+            pago = random.choice(pagos)
+            fecha = pago['fecha'] + timedelta(days=random.choice([0, 0, 0, 1, 2, 3, 7, 15]))
+            monto = -pago['monto']
+        else:
+            fecha = date(2025, 1, 1) + timedelta(days=random.randint(0, 364))
+            monto = -round(random.uniform(10, 999), 2)
+        texto = f"{abs(monto):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        lines.append([fecha.strftime("%d/%m/%Y"), f"Debito automatico {i}", ("-" if monto < 0 else "") + texto])
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Fecha", "Concepto", "Importe"])
+        writer.writerows(lines)
+    return [(float(l[2].replace(".", "").replace(",", ".")), date(*map(int, reversed(l[0].split("/"))))) for l in lines]
+
+
+def main():
+    random.seed(21)
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        obligaciones = seed_catalogs(session)
+        seed_paid_vencimientos(session, obligaciones, N_PAGOS, date(2024, 1, 1), date(2025, 12, 31))
+        pagos = [
+            {'id': p.id, 'fecha': p.fecha_pago, 'monto': p.vencimiento.monto_original}
+            for p in session.query(Pago).order_by(Pago.id)
+        ]
+    finally:
+        session.close()
+
+    statement = os.path.join(tempfile.mkdtemp(prefix="bench_"), "extracto.csv")
+    bank = write_statement(pagos, statement)
+    print(f"Seeded {N_PAGOS} pagos ({path}), statement of {N_LINES} lines\n")
+
+    sample = bank[:LEGACY_SAMPLE]
+    t0 = time.perf_counter()
+    old = legacy_match(sample, pagos)
+    legacy_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    new = indexed_match(sample, pagos)
+    indexed_ms = (time.perf_counter() - t0) * 1000
+    print(f"Matching {LEGACY_SAMPLE} lines: linear scan {legacy_ms:8.1f} ms "
+          f"(~{legacy_ms * N_LINES / LEGACY_SAMPLE / 1000:.0f} s for {N_LINES}) | indexed {indexed_ms:6.1f} ms | same matches: {old == new}")
+
+    t0 = time.perf_counter()
+    indexed_match(bank, pagos)
+    print(f"Matching {N_LINES} lines (indexed):  {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+    t0 = time.perf_counter()
+    ok, report = ReconciliationController().analyze_bank(
+        statement, {'fecha': 'Fecha', 'descripcion': 'Concepto', 'importe': 'Importe'}
+    )
+    elapsed = time.perf_counter() - t0
+    matched = sum(1 for r in report if r['status'] != "NO_EN_SISTEMA") if ok else 0
+    print(f"analyze_bank end to end:        {elapsed * 1000:8.1f} ms ({matched} of {len(report) if ok else 0} lines matched)")
+
+
+if __name__ == "__main__":
+    main()
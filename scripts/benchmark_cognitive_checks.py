@@ -0,0 +1,89 @@
+import sys
+import os
+import time
+import random
+from datetime import date
+from statistics import mean
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, func
+import database
+from scripts.benchmark_helpers import setup_sqlite_db, seed_catalogs, seed_mixed_vencimientos
+from database import SessionLocal
+from models.entities import Vencimiento, EstadoVencimiento
+from services.cognitive_service import CognitiveService
+
+N_INMUEBLES, N_PROVEEDORES = 20, 25   # 500 obligaciones
+N_VENCIMIENTOS = 60000
+KEYSTROKES = 200                      # Editor checks (anomaly + duplicate) per run
+
+
+def legacy_checks(session, oid, amount, periodo):
+    """Previous implementation: one query each for anomaly and duplicate (id tie-break added to compare)."""
+    history = session.query(Vencimiento).filter(
+        Vencimiento.obligacion_id == oid,
+        Vencimiento.estado == EstadoVencimiento.PAGADO,
+        Vencimiento.is_deleted == 0
+    ).order_by(Vencimiento.fecha_vencimiento.desc(), Vencimiento.id.desc()).limit(6).all()
+    anomaly = None
+    if len(history) >= 3:
+        avg = mean([float(h.monto_original) for h in history])
+        anomaly = amount > avg * 1.4 or amount < avg * 0.6
+    count = session.query(func.count(Vencimiento.id)).filter(
+        Vencimiento.obligacion_id == oid,
+        Vencimiento.periodo == periodo,
+        Vencimiento.is_deleted == 0
+    ).scalar()
+    return anomaly, count > 0
+
+
+def current_checks(session, oid, amount, periodo):
+    is_anomaly, msg = CognitiveService.detect_anomaly(oid, amount, session=session)
+    anomaly = None if msg == "Insuficiente data histórica" else is_anomaly
+    return anomaly, CognitiveService.check_duplicate(oid, periodo, session=session)
+
+
+def timed(label, fn, probes):
+    statements = [0]
+    def count(*args):
+        statements[0] += 1
+    event.listen(database._engine, "before_cursor_execute", count)
+    session = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        results = [fn(session, *probe) for probe in probes]
+        elapsed = time.perf_counter() - t0
+    finally:
+        session.close()
+        event.remove(database._engine, "before_cursor_execute", count)
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  | {statements[0]:5d} statements for {len(probes)} checks")
+    return results
+
+
+def main():
+    random.seed(17)
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        obligaciones = seed_catalogs(session, N_INMUEBLES, N_PROVEEDORES)
+        seed_mixed_vencimientos(session, obligaciones, N_VENCIMIENTOS, date(2021, 1, 1), date(2025, 12, 31))
+    finally:
+        session.close()
+    print(f"Seeded {len(obligaciones)} obligaciones, {N_VENCIMIENTOS} vencimientos in {path}\n")
+
+    probes = [
+        (random.choice(obligaciones), round(random.uniform(1000, 250000), 2), f"{random.randint(2020, 2026)}-{random.randint(1, 12):02d}")
+        for _ in range(KEYSTROKES)
+    ]
+    legacy = timed("Per-check queries (legacy)", legacy_checks, probes)
+    # First call loads the stats; then anomaly checks are memory lookups, duplicates one EXISTS each
+    timed("ObligacionStats (cold)", current_checks, probes[:1])
+    current = timed("ObligacionStats (warm)", current_checks, probes)
+
+    print(f"\nResults identical: {'OK' if legacy == current else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
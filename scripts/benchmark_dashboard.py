@@ -0,0 +1,69 @@
+import sys
+import os
+import time
+import random
+import re
+from collections import Counter
+from datetime import date
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from scripts.benchmark_helpers import setup_sqlite_db, seed_cotizaciones, seed_catalogs, seed_mixed_vencimientos
+import database
+from database import SessionLocal
+from services.dashboard_service import DashboardService
+
+N_VENCIMIENTOS = 20000
+LATENCY_MS = 40  # Simulated round-trip (Neon: 30-80 ms per statement)
+
+
+class RoundTripCounter:
+    """Counts statements per table and optionally sleeps per statement to emulate a remote DB."""
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000.0
+        self.statements = Counter()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        match = re.search(r"FROM\s+(\w+)", statement)
+        self.statements[match.group(1) if match else statement.split()[0]] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+def run(label, latency_ms, cached=False):
+    if not cached:
+        DashboardService.clear_cache() # time the grouped passes, not the LRU
+    counter = RoundTripCounter(latency_ms)
+    event.listen(database._engine, "before_cursor_execute", counter)
+    try:
+        t0 = time.perf_counter()
+        DashboardService().get_dashboard_data(target_currency="USD")
+        elapsed = time.perf_counter() - t0
+    finally:
+        event.remove(database._engine, "before_cursor_execute", counter)
+    total = sum(counter.statements.values())
+    print(f"{label:<26} {elapsed * 1000:9.1f} ms  | {total} statements {dict(counter.statements)}")
+
+
+def main():
+    random.seed(7)
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        seed_cotizaciones(session, date(2022, 1, 1), date.today())
+        obligaciones = seed_catalogs(session)
+        seed_mixed_vencimientos(session, obligaciones, N_VENCIMIENTOS, date(2023, 1, 1), date(date.today().year, 12, 31))
+    finally:
+        session.close()
+    print(f"Seeded {N_VENCIMIENTOS} vencimientos in {path}\n")
+
+    run("Warm-up (rate caches)", 0)
+    run("Local SQLite", 0)
+    run(f"+{LATENCY_MS} ms per round-trip", LATENCY_MS)
+    run(f"Cache hit (+{LATENCY_MS} ms)", LATENCY_MS, cached=True)
+
+
+if __name__ == "__main__":
+    main()
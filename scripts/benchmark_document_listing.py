@@ -0,0 +1,83 @@
+import sys
+import os
+import random
+from datetime import date
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import joinedload, undefer
+from scripts.benchmark_helpers import setup_sqlite_db, seed_catalogs, measure
+from database import SessionLocal
+from models.entities import Vencimiento, Obligacion, Documento, Moneda, EstadoVencimiento
+from controllers.vencimientos_controller import VencimientosController
+
+PAGE_SIZE = 50
+ATTACHMENT_BYTES = 2 * 1024 * 1024   # 2 MB scan per vencimiento (+ one payment receipt)
+PERIODO = "2025-06"
+
+
+def seed_page_with_attachments(session, obligacion_ids):
+    """PAGE_SIZE vencimientos in one period, each with an invoice and a receipt BLOB."""
+    for i in range(PAGE_SIZE):
+        invoice = Documento(filename=f"factura_{i}.pdf", file_data=os.urandom(ATTACHMENT_BYTES),
+                            file_size=ATTACHMENT_BYTES, mime_type="application/pdf")
+        receipt = Documento(filename=f"pago_{i}.pdf", file_data=os.urandom(ATTACHMENT_BYTES),
+                            file_size=ATTACHMENT_BYTES, mime_type="application/pdf")
+        session.add_all([invoice, receipt])
+        session.flush()
+        session.add(Vencimiento(
+            obligacion_id=obligacion_ids[i % len(obligacion_ids)], periodo=PERIODO,
+            fecha_vencimiento=date(2025, 6, 1 + i % 28), monto_original=1000.0 + i, monto_actualizado=1000.0 + i,
+            moneda=Moneda.ARS, estado=EstadoVencimiento.PAGADO, is_deleted=0,
+            documento_id=invoice.id, comprobante_pago_id=receipt.id
+        ))
+        session.commit()
+
+
+def legacy_page():
+    """Previous listing: document relationships joined with their payload."""
+    session = SessionLocal()
+    try:
+        items = session.query(Vencimiento).options(
+            joinedload(Vencimiento.obligacion).joinedload(Obligacion.inmueble),
+            joinedload(Vencimiento.obligacion).joinedload(Obligacion.proveedor),
+            joinedload(Vencimiento.pagos),
+            joinedload(Vencimiento.documento).options(undefer(Documento.file_data)),
+            joinedload(Vencimiento.comprobante_pago).options(undefer(Documento.file_data))
+        ).filter(Vencimiento.periodo == PERIODO, Vencimiento.is_deleted == 0)\
+            .order_by(Vencimiento.fecha_vencimiento.desc()).limit(PAGE_SIZE).all()
+        for v in items:
+            session.expunge(v)
+        return items
+    finally:
+        session.close()
+
+
+def current_page():
+    items, _ = VencimientosController().get_all_vencimientos(period_id=PERIODO, limit=PAGE_SIZE)
+    return items
+
+
+def main():
+    random.seed(5)
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        obligaciones = seed_catalogs(session, 5, 5)
+        seed_page_with_attachments(session, obligaciones)
+    finally:
+        session.close()
+    print(f"Seeded {PAGE_SIZE} vencimientos x 2 attachments of {ATTACHMENT_BYTES // 2**20} MB in {path}\n")
+
+    legacy = measure("Listing with BLOBs (legacy)", legacy_page, memory=True)
+    del legacy
+    current = measure("Listing, metadata only", current_page, memory=True)
+
+    # Bytes are still available on demand through the download path
+    data, name, _ = VencimientosController().service.get_document(current[0].documento_id)
+    print(f"\nget_document({current[0].documento_id}) -> {name}: {len(data) // 2**20} MB")
+
+
+if __name__ == "__main__":
+    main()
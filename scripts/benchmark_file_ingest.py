@@ -0,0 +1,82 @@
+import sys
+import os
+import csv
+import time
+import random
+import tempfile
+from datetime import date, timedelta
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from utils.import_helper import open_source, release_source, load_data_file
+from controllers.reconciliation_controller import ReconciliationController
+
+N_LINES = 200000
+
+
+def legacy_load(file_path, header_row=0):
+    """Previous load_data_file (CSV): python engine with delimiter auto-detection."""
+    return pd.read_csv(file_path, sep=None, engine='python', header=header_row, encoding='utf-8', dtype=str).fillna("")
+
+
+def legacy_session(file_path):
+    """Previous wizard + analyze flow: preview, header sniff (20 rows), full load for detection, full load for import."""
+    legacy_load(file_path).head(5)                                         # preview_csv
+    try:
+        pd.read_csv(file_path, header=None, nrows=20, encoding='utf-8')    # _detect_structure, step 1
+        legacy_load(file_path, header_row=0)                               # _detect_structure, step 3
+    except Exception:
+        legacy_load(file_path)                                             # ';' + decimal commas: fallback load
+    return legacy_load(file_path)                                          # import / analyze
+
+
+def new_session(file_path):
+    load_data_file(file_path).head(5)
+    ReconciliationController()._detect_structure(file_path)
+    return load_data_file(file_path)
+
+
+def write_statement(path):
+    """Bank CSV (es-AR format, ';' separated)."""
+    start = date(2024, 1, 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["Fecha", "Concepto", "Importe", "Saldo"])
+        for i in range(N_LINES):
+            monto = random.uniform(-250000, 250000)
+            texto = f"{monto:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            writer.writerow([(start + timedelta(days=i % 700)).strftime("%d/%m/%Y"), f"Movimiento {i}", texto, "0,00"])
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    random.seed(24)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_"), "extracto.csv")
+    write_statement(path)
+    print(f"Statement of {N_LINES} lines ({os.path.getsize(path) / 1e6:.1f} MB)\n")
+
+    old, old_ms = timed(legacy_load, path)
+    release_source(path)
+    new, new_ms = timed(load_data_file, path)
+    print(f"Single load:   python engine {old_ms:8.1f} ms | sniffed + C engine {new_ms:8.1f} ms | same frame: {old.equals(new)}")
+
+    release_source(path)
+    _, old_ms = timed(legacy_session, path)
+    release_source(path)
+    _, new_ms = timed(new_session, path)
+    print(f"Wizard session (preview + detect + import): before {old_ms:8.1f} ms | now {new_ms:8.1f} ms")
+
+    _, again_ms = timed(new_session, path)
+    print(f"Same session again (cached):                          {again_ms:8.1f} ms")
+    print(f"Format {open_source(path).format!r}, delimiter {open_source(path).delimiter!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import sys
+import os
+import time
+import random
+import tempfile
+import pandas as pd
+from datetime import date, timedelta
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.benchmark_helpers import setup_sqlite_db
+from database import SessionLocal
+from models.entities import Cotizacion, Moneda
+from services.forex_service import ForexService
+from utils.format_helper import parse_fuzzy_date, parse_localized_float
+
+YEARS = 10
+START = date(2016, 1, 1)
+MAPPING = {"fecha": "Fecha", "compra": "Compra", "venta": "Venta", "moneda_fixed": "USD"}
+
+
+def build_history():
+    """Daily quotes in the spreadsheet layout users import (dd/mm/yyyy, 1.234,56)."""
+    rows = []
+    rate = 14.0
+    for i in range(YEARS * 365):
+        d = START + timedelta(days=i)
+        rate *= 1 + random.uniform(-0.002, 0.004)
+        rows.append({
+            "Fecha": d.strftime("%d/%m/%Y"),
+            "Compra": f"{rate * 0.96:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+            "Venta": f"{rate:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+        })
+    return pd.DataFrame(rows)
+
+
+def legacy_import(df, mapping_dict):
+    """Pre-bulk behaviour: iterrows + one SELECT per row + ORM add/update."""
+    session = SessionLocal()
+    count = 0
+    try:
+        for _, row in df.iterrows():
+            date_val = parse_fuzzy_date(row[mapping_dict["fecha"]])
+            if not date_val: continue
+            venta = parse_localized_float(row[mapping_dict["venta"]])
+            existing = session.query(Cotizacion).filter_by(fecha=date_val, moneda=Moneda.USD).first()
+            if existing:
+                existing.venta = venta
+            else:
+                session.add(Cotizacion(fecha=date_val, moneda=Moneda.USD, venta=venta))
+            count += 1
+        session.commit()
+    finally:
+        session.close()
+    return count
+
+
+def clear_cotizaciones():
+    session = SessionLocal()
+    try:
+        session.query(Cotizacion).delete()
+        session.commit()
+    finally:
+        session.close()
+
+
+def timed(label, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<34} {elapsed * 1000:9.1f} ms  | {result}")
+    return elapsed
+
+
+def main():
+    path = setup_sqlite_db()
+    df = build_history()
+    print(f"{len(df)} daily quotes ({YEARS} years) -> {path}\n")
+
+    svc = ForexService()
+    before = timed("Row-by-row (legacy), empty table", lambda: legacy_import(df, MAPPING))
+    before_re = timed("Row-by-row (legacy), re-import", lambda: legacy_import(df, MAPPING))
+    clear_cotizaciones()
+    after = timed("Chunked bulk upsert, empty table", lambda: svc.import_from_dataframe(df, MAPPING)[0])
+    after_re = timed("Chunked bulk upsert, re-import", lambda: svc.import_from_dataframe(df, MAPPING)[0])
+
+    # BNA CSV path (streamed with read_csv chunks)
+    fd, csv_path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    bna = df.assign(Moneda="USD")[["Fecha", "Moneda", "Compra", "Venta"]]
+    bna.to_csv(csv_path, sep=";", header=False, index=False)
+    clear_cotizaciones()
+    bna_time = timed("BNA CSV stream, empty table", lambda: svc.import_bna_csv(csv_path))
+    os.remove(csv_path)
+
+    print(f"\nSpeed-up: {before / after:.1f}x (empty), {before_re / after_re:.1f}x (re-import)")
+    print(f"Target < 1 s: {'OK' if max(after, after_re, bna_time) < 1.0 else 'MISSED'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import random
+from datetime import date
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.benchmark_helpers import setup_sqlite_db, seed_catalogs, seed_mixed_vencimientos, measure
+from database import SessionLocal, run_migrations
+from controllers.vencimientos_controller import VencimientosController
+
+N_VENCIMIENTOS = 60000      # All in one (large) period
+PERIODO = "2025-06"
+PAGE_SIZE = 50
+INMUEBLE_ID = 7
+ESTADO = "VENCIDO"
+
+
+def legacy_filtered_page(controller):
+    """Client-side equivalent that is correct across pages: load the whole period, filter and sort in Python."""
+    rows, _ = controller.get_grid_rows(period_id=PERIODO, limit=N_VENCIMIENTOS)
+    alias = f"Inmueble {INMUEBLE_ID - 1}"
+    rows = [r for r in rows if r.inmueble_alias == alias and r.estado.value == ESTADO]
+    rows.sort(key=lambda r: (r.monto_original, r.id), reverse=True)
+    return rows[:PAGE_SIZE], len(rows)
+
+
+def server_page(controller, after=None):
+    return controller.get_grid_rows(period_id=PERIODO, limit=PAGE_SIZE, after=after, inmueble_id=INMUEBLE_ID,
+                                    estado=ESTADO, sort_col="monto_original", sort_desc=True)
+
+
+def main():
+    random.seed(18)
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        obligaciones = seed_catalogs(session, 20, 25)
+        seed_mixed_vencimientos(session, obligaciones, N_VENCIMIENTOS, date(2025, 6, 1), date(2025, 6, 30))
+    finally:
+        session.close()
+    run_migrations() # Grid indexes
+    print(f"Seeded {N_VENCIMIENTOS} vencimientos in {PERIODO} ({path})\n")
+
+    controller = VencimientosController()
+    legacy, legacy_total = measure("Whole period + Python filter/sort", lambda: legacy_filtered_page(controller))
+    measure("SQL filter/sort page 1 (cold count)", lambda: server_page(controller))
+    rows, total = measure("SQL filter/sort page 1 (cached count)", lambda: server_page(controller))
+    nxt, _ = measure("SQL filter/sort page 2 (keyset)", lambda: server_page(controller, (rows[-1].monto_original, rows[-1].id)))
+
+    print(f"\nSame page and total: {[r.id for r in legacy] == [r.id for r in rows] and legacy_total == total} "
+          f"({total} matches, page 2 has {len(nxt)} rows)")
+
+
+if __name__ == "__main__":
+    main()
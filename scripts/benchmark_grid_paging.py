@@ -0,0 +1,73 @@
+import sys
+import os
+import random
+from datetime import date
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import joinedload
+from scripts.benchmark_helpers import setup_sqlite_db, seed_catalogs, seed_mixed_vencimientos, measure
+from database import SessionLocal
+from models.entities import Vencimiento, Obligacion
+from controllers.vencimientos_controller import VencimientosController
+
+N_VENCIMIENTOS = 100000
+PAGE_SIZE = 50
+PAGES = (1, 100, 1000, 1900)          # Page numbers to fetch (unfiltered grid)
+
+
+def legacy_page(session, page):
+    """Previous implementation: joinedload of every relation, count() over the joined query, OFFSET."""
+    query = session.query(Vencimiento).options(
+        joinedload(Vencimiento.obligacion).joinedload(Obligacion.inmueble),
+        joinedload(Vencimiento.obligacion).joinedload(Obligacion.proveedor),
+        joinedload(Vencimiento.pagos),
+        joinedload(Vencimiento.documento),
+        joinedload(Vencimiento.comprobante_pago)
+    ).filter(Vencimiento.is_deleted == 0)
+    total = query.count()
+    items = query.order_by(Vencimiento.fecha_vencimiento.desc(), Vencimiento.id.desc())\
+        .limit(PAGE_SIZE).offset((page - 1) * PAGE_SIZE).all()
+    return [v.id for v in items], total
+
+
+def main():
+    random.seed(23)
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        obligaciones = seed_catalogs(session, 20, 25)
+        seed_mixed_vencimientos(session, obligaciones, N_VENCIMIENTOS, date(2018, 1, 1), date(2025, 12, 31))
+    finally:
+        session.close()
+    print(f"Seeded {N_VENCIMIENTOS} vencimientos in {path}\n")
+
+    # Keyset walk: collect the cursor of each wanted page
+    controller = VencimientosController()
+    cursors, cursor = {}, None
+    for page in range(1, max(PAGES) + 1):
+        if page in PAGES:
+            cursors[page] = cursor
+        items, _ = controller.get_all_vencimientos(limit=PAGE_SIZE, after=cursor)
+        cursor = (items[-1].fecha_vencimiento, items[-1].id)
+
+    ok = True
+    for page in PAGES:
+        session = SessionLocal()
+        try:
+            legacy_ids, legacy_total = measure(f"Page {page:<5} OFFSET (legacy)", lambda: legacy_page(session, page))
+        finally:
+            session.close()
+        items, total = measure(
+            f"Page {page:<5} keyset + cached count",
+            lambda: controller.get_all_vencimientos(limit=PAGE_SIZE, after=cursors[page])
+        )
+        ok &= legacy_ids == [v.id for v in items] and legacy_total == total
+        print()
+
+    print(f"Pages identical: {'OK' if ok else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
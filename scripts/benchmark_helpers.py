@@ -0,0 +1,162 @@
+import sys
+import os
+import time
+import random
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+import database
+from database import init_db_engine, engine, SessionLocal
+from models.entities import (
+    Base, Inmueble, ProveedorServicio, Obligacion, Vencimiento, Pago,
+    Cotizacion, Moneda, EstadoVencimiento
+)
+
+CATEGORIAS = ["SERVICIO", "IMPUESTO", "EXPENSA", "OTRO"]
+
+
+def setup_sqlite_db():
+    """Points the app engine at a fresh temporary SQLite file with the full schema."""
+    fd, path = tempfile.mkstemp(prefix="bench_", suffix=".sqlite")
+    os.close(fd)
+    init_db_engine(f"sqlite:///{path.replace(os.sep, '/')}")
+    Base.metadata.create_all(bind=engine)
+    return path
+
+
+def measure(label, fn, memory=False):
+    """
+    Runs fn() once and prints its wall time and the SQL statements it issued.
+    memory=True also reports peak and retained allocations (the result stays
+    referenced, like a loaded grid page). Returns fn()'s result.
+    """
+    statements = [0]
+    def count(*args):
+        statements[0] += 1
+    event.listen(database._engine, "before_cursor_execute", count)
+    if memory:
+        tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        if memory:
+            retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        if memory:
+            tracemalloc.stop()
+        event.remove(database._engine, "before_cursor_execute", count)
+
+    line = f"{label:<40} {elapsed * 1000:9.1f} ms  | {statements[0]:4d} statements"
+    if memory:
+        line += f" | peak {peak / 2**20:7.2f} MB, retained {retained / 2**20:7.2f} MB"
+        if hasattr(result, "__len__"):
+            line += f" ({len(result)} rows, {retained / max(len(result), 1):.0f} B/row)"
+    print(line)
+    return result
+
+
+def seed_cotizaciones(session, start: date, end: date, moneda=Moneda.USD, base_rate=350.0):
+    """Business-day quotes between start and end (weekends left as gaps)."""
+    rows = []
+    rate = base_rate
+    d = start
+    while d <= end:
+        if d.weekday() < 5:
+            rate *= 1 + random.uniform(-0.002, 0.004)
+            rows.append({"fecha": d, "moneda": moneda, "compra": rate * 0.96, "venta": rate})
+        d += timedelta(days=1)
+    session.bulk_insert_mappings(Cotizacion, rows)
+    session.commit()
+    return len(rows)
+
+
+def seed_catalogs(session, n_inmuebles=20, n_proveedores=25):
+    """Creates inmuebles x proveedores obligaciones. Returns obligacion ids."""
+    inmuebles = [Inmueble(alias=f"Inmueble {i}", direccion=f"Calle {i}") for i in range(n_inmuebles)]
+    proveedores = [
+        ProveedorServicio(nombre_entidad=f"Proveedor {i}", categoria=CATEGORIAS[i % len(CATEGORIAS)])
+        for i in range(n_proveedores)
+    ]
+    session.add_all(inmuebles + proveedores)
+    session.flush()
+    obligaciones = [
+        Obligacion(inmueble_id=inm.id, servicio_id=prov.id)
+        for inm in inmuebles for prov in proveedores
+    ]
+    session.add_all(obligaciones)
+    session.commit()
+    return [o.id for o in obligaciones]
+
+
+def seed_paid_vencimientos(session, obligacion_ids, count, start: date, end: date, usd_share=0.1):
+    """Creates `count` PAGADO vencimientos, each with one Pago inside [start, end]."""
+    span = (end - start).days
+    vencs = []
+    for i in range(count):
+        fecha = start + timedelta(days=random.randint(0, span))
+        monto = round(random.uniform(1000, 250000), 2)
+        vencs.append(Vencimiento(
+            obligacion_id=obligacion_ids[i % len(obligacion_ids)],
+            periodo=fecha.strftime("%Y-%m"),
+            fecha_vencimiento=fecha,
+            monto_original=monto,
+            monto_actualizado=monto,
+            moneda=Moneda.USD if random.random() < usd_share else Moneda.ARS,
+            estado=EstadoVencimiento.PAGADO,
+            is_deleted=0,
+        ))
+    session.add_all(vencs)
+    session.flush()
+    session.bulk_insert_mappings(Pago, [
+        {"vencimiento_id": v.id, "fecha_pago": v.fecha_vencimiento, "monto": v.monto_original, "medio_pago": "Transferencia"}
+        for v in vencs
+    ])
+    session.commit()
+    return len(vencs)
+
+
+def seed_mixed_vencimientos(session, obligacion_ids, count, start: date, end: date, usd_share=0.1, deleted_share=0.02):
+    """
+    Vencimientos with realistic state mix: past ones mostly PAGADO (Pago sometimes
+    below the original = savings), some VENCIDO / PENDIENTE with surcharges, a few soft-deleted.
+    """
+    today = date.today()
+    span = (end - start).days
+    vencs = []
+    for i in range(count):
+        fecha = start + timedelta(days=random.randint(0, span))
+        monto = round(random.uniform(1000, 250000), 2)
+        if fecha < today:
+            estado = random.choices(
+                [EstadoVencimiento.PAGADO, EstadoVencimiento.VENCIDO, EstadoVencimiento.PENDIENTE], [0.85, 0.1, 0.05]
+            )[0]
+        else:
+            estado = EstadoVencimiento.PENDIENTE
+        actualizado = round(monto * random.uniform(1.0, 1.15), 2) if estado != EstadoVencimiento.PAGADO and random.random() < 0.3 else monto
+        vencs.append(Vencimiento(
+            obligacion_id=obligacion_ids[i % len(obligacion_ids)],
+            periodo=fecha.strftime("%Y-%m"),
+            fecha_vencimiento=fecha,
+            monto_original=monto,
+            monto_actualizado=actualizado,
+            moneda=Moneda.USD if random.random() < usd_share else Moneda.ARS,
+            estado=estado,
+            is_deleted=1 if random.random() < deleted_share else 0,
+        ))
+    session.add_all(vencs)
+    session.flush()
+    session.bulk_insert_mappings(Pago, [
+        {
+            "vencimiento_id": v.id, "fecha_pago": v.fecha_vencimiento,
+            "monto": round(v.monto_original * random.choice([1.0, 1.0, 1.0, 0.9]), 2), "medio_pago": "Transferencia"
+        }
+        for v in vencs if v.estado == EstadoVencimiento.PAGADO
+    ])
+    session.commit()
+    return len(vencs)
@@ -0,0 +1,76 @@
+import sys
+import os
+import csv
+import time
+import random
+import tempfile
+from datetime import date, timedelta
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.format_helper import parse_fuzzy_date, parse_localized_float, parse_fuzzy_date_series, parse_localized_float_series
+from utils.import_helper import load_data_file
+from services.data_import_service import DataImportService
+
+N_LINES = 200000
+MAPPING = {'fecha': 'Fecha', 'descripcion': 'Concepto', 'debito': 'Debito', 'credito': 'Credito'}
+
+
+def legacy_normalize(df, mapping_config):
+    """Previous DataImportService loop: scalar parsers per cell inside iterrows()."""
+    transactions = []
+    for index, row in df.iterrows():
+        date_val = parse_fuzzy_date(row.get(mapping_config.get('fecha')))
+        if not date_val: continue
+        final_amount = 0.0
+        v_deb = parse_localized_float(row.get(mapping_config.get('debito')))
+        v_cred = parse_localized_float(row.get(mapping_config.get('credito')))
+        if v_deb > 0: final_amount = -abs(v_deb)
+        elif v_cred > 0: final_amount = abs(v_cred)
+        transactions.append({"date": date_val, "description": str(row.get(mapping_config.get('descripcion'), "")),
+                             "amount": final_amount, "raw_row_index": index})
+    return transactions
+
+
+def write_statement(path):
+    """Bank CSV (es-AR format) with separate debit / credit columns."""
+    start = date(2024, 1, 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["Fecha", "Concepto", "Debito", "Credito"])
+        for i in range(N_LINES):
+            texto = f"{random.uniform(10, 250000):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            debit = random.random() < 0.7
+            writer.writerow([(start + timedelta(days=i % 700)).strftime("%d/%m/%Y"), f"Movimiento {i}",
+                             texto if debit else "", "" if debit else texto])
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    random.seed(25)
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_"), "extracto.csv")
+    write_statement(path)
+    df = load_data_file(path)
+    print(f"Statement of {N_LINES} lines\n")
+
+    scalar, scalar_ms = timed(lambda: df['Debito'].map(parse_localized_float))
+    vector, vector_ms = timed(parse_localized_float_series, df['Debito'])
+    print(f"Amounts: per cell {scalar_ms:8.1f} ms | column {vector_ms:7.1f} ms | same values: {(scalar == vector).all()}")
+
+    scalar, scalar_ms = timed(lambda: df['Fecha'].map(parse_fuzzy_date))
+    vector, vector_ms = timed(parse_fuzzy_date_series, df['Fecha'])
+    print(f"Dates:   per cell {scalar_ms:8.1f} ms | column {vector_ms:7.1f} ms | same values: {(scalar == vector.dt.date).all()}")
+
+    old, old_ms = timed(legacy_normalize, df, MAPPING)
+    (ok, new, _), new_ms = timed(DataImportService().load_and_normalize, path, MAPPING) # frame comes from the ingest cache
+    print(f"load_and_normalize: iterrows {old_ms:8.1f} ms | column-wise {new_ms:7.1f} ms | same transactions: {ok and old == new}")
+
+
+if __name__ == "__main__":
+    main()
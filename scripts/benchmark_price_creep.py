@@ -0,0 +1,99 @@
+import sys
+import os
+import time
+import random
+from datetime import date
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+import database
+from scripts.benchmark_helpers import setup_sqlite_db, seed_catalogs
+from database import SessionLocal
+from models.entities import Vencimiento, Moneda, EstadoVencimiento
+from services.cognitive_service import CognitiveService
+
+N_INMUEBLES, N_PROVEEDORES = 20, 25   # 500 obligaciones
+YEARS = 5
+CREEP_SHARE = 0.2                     # Obligations whose last 3 bills keep rising
+
+
+def seed_monthly_history(session, obligacion_ids):
+    """One vencimiento per obligation per month; the tail of some series creeps up."""
+    first_year = date.today().year - YEARS
+    rows = []
+    for oid in obligacion_ids:
+        base = random.uniform(5000, 80000)
+        creeping = random.random() < CREEP_SHARE
+        months = YEARS * 12
+        for i in range(months):
+            y, m = first_year + i // 12, i % 12 + 1
+            amount = base * random.uniform(0.9, 1.1)
+            if creeping and i >= months - 3:
+                amount = base * (1.05 ** (i - months + 4))
+            rows.append({
+                "obligacion_id": oid, "periodo": f"{y}-{m:02d}", "fecha_vencimiento": date(y, m, 10),
+                "monto_original": round(amount, 2), "monto_actualizado": round(amount, 2),
+                "moneda": Moneda.ARS, "estado": EstadoVencimiento.PAGADO, "is_deleted": 0,
+            })
+    session.bulk_insert_mappings(Vencimiento, rows)
+    session.commit()
+    return len(rows)
+
+
+def legacy_detect_price_creep(session) -> list:
+    """Previous implementation: first 50 obligations, 1 query each + lazy loads."""
+    alerts = []
+    result = session.query(Vencimiento.obligacion_id).group_by(Vencimiento.obligacion_id).limit(50).all()
+    for (oid,) in result:
+        recs = session.query(Vencimiento).filter(
+            Vencimiento.obligacion_id == oid,
+            Vencimiento.is_deleted == 0
+        ).order_by(Vencimiento.fecha_vencimiento.desc()).limit(3).all()
+        if len(recs) < 3: continue
+        v0, v1, v2 = recs[0].monto_original, recs[1].monto_original, recs[2].monto_original
+        if v0 > v1 * 1.01 and v1 > v2 * 1.01:
+            total_inc_pct = int(((v0 - v2) / v2) * 100)
+            if recs[0].obligacion and recs[0].obligacion.proveedor:
+                alerts.append(f"⚠️ {recs[0].obligacion.proveedor.nombre_entidad} aumentó un {total_inc_pct}% en 3 meses.")
+    return alerts
+
+
+def timed(label, fn):
+    statements = [0]
+    def count(*args):
+        statements[0] += 1
+    event.listen(database._engine, "before_cursor_execute", count)
+    session = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        alerts = fn(session)
+        elapsed = time.perf_counter() - t0
+    finally:
+        session.close()
+        event.remove(database._engine, "before_cursor_execute", count)
+    print(f"{label:<34} {elapsed * 1000:9.1f} ms  | {statements[0]:4d} statements, {len(alerts)} alerts")
+    return alerts
+
+
+def main():
+    random.seed(11)
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        obligaciones = seed_catalogs(session, N_INMUEBLES, N_PROVEEDORES)
+        n = seed_monthly_history(session, obligaciones)
+    finally:
+        session.close()
+    print(f"Seeded {len(obligaciones)} obligaciones x {YEARS} years = {n} vencimientos in {path}\n")
+
+    legacy = timed("Per-obligation (legacy, first 50)", legacy_detect_price_creep)
+    current = timed("ROW_NUMBER window (all)", CognitiveService.detect_price_creep)
+    # The legacy scan is a subset (first 50 ids): every alert it raised must still be raised
+    missing = set(legacy) - set(current)
+    print(f"\nLegacy alerts covered: {'OK' if not missing else f'MISSING {len(missing)}'}")
+
+
+if __name__ == "__main__":
+    main()
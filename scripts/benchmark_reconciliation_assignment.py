@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.reconciliation_service import ReconciliationService
+
+SIZES = [(2000, 5000), (20000, 50000)] # (statement lines, system payments)
+RECURRING_SHARE = 0.4 # Payments with a fixed monthly amount (same amount many times: where greedy goes wrong)
+MISSING_SHARE = 0.15  # Statement lines with no system payment
+ZERO_BLOCK = (300, 50000) # analyze_bank: every pago without a vencimiento has monto 0.0
+
+
+def synthetic(n_lines, n_pagos):
+    """System payments + bank lines generated from them (ground truth = source payment id)."""
+    start = date(2024, 1, 1)
+    fixed = [round(random.uniform(5000, 90000), 2) for _ in range(n_pagos // 200)]
+    pagos = []
+    for i in range(n_pagos):
+        amount = random.choice(fixed) if random.random() < RECURRING_SHARE else round(random.uniform(1000, 250000), 2)
+        pagos.append({'id': i, 'date': start + timedelta(days=random.randint(0, 729)), 'amount': amount,
+                      'description': f"Proveedor {i % 25}"})
+
+    lines = []
+    for pago in random.sample(pagos, int(n_lines * (1 - MISSING_SHARE))):
+        slip = random.choice([0, 0, 0, 0, 1, 1, 2, 3, 5, 9])
+        lines.append({'date': pago['date'] + timedelta(days=slip), 'amount': -pago['amount'],
+                      'description': "Debito", 'truth': pago['id']})
+    while len(lines) < n_lines:
+        lines.append({'date': start + timedelta(days=random.randint(0, 729)), 'amount': -round(random.uniform(10, 999), 2),
+                      'description': "Comision", 'truth': None})
+    lines.sort(key=lambda x: x['date']) # Statements are in date order
+    return lines, pagos
+
+
+def zero_amount_block(n_lines, n_pagos):
+    """One huge same-amount block: too big for the assignment, matched greedily."""
+    start = date(2024, 1, 1)
+    pagos = [{'id': i, 'date': start + timedelta(days=random.randint(0, 729)), 'amount': 0.0, 'description': ""}
+             for i in range(n_pagos)]
+    lines = sorted(({'date': start + timedelta(days=random.randint(0, 729)), 'amount': 0.0,
+                     'description': "Ajuste", 'truth': None} for _ in range(n_lines)), key=lambda x: x['date'])
+    return lines, pagos
+
+
+def run(label, lines, pagos, optimal):
+    t0 = time.perf_counter()
+    results = ReconciliationService().match_transactions(lines, pagos, optimal=optimal)
+    elapsed = (time.perf_counter() - t0) * 1000
+
+    status = Counter(r['status'] for r in results)
+    days = sum(abs((r['original_row']['date'] - pagos[r['id']]['date']).days) for r in results if r['id'] is not None)
+    correct = sum(1 for r in results if r['id'] is not None and r['id'] == r['original_row']['truth'])
+    expected = sum(1 for l in lines if l['truth'] is not None)
+    print(f"  {label:<8} {elapsed:8.1f} ms | matched {len(results) - status['NO_EN_SISTEMA']:6d} "
+          f"(MATCH {status['MATCH']:6d}, DIF_FECHA {status['DIFERENCIA_FECHA']:5d}, LEJANO {status['MATCH_LEJANO']:5d}) "
+          f"| total days {days:7d} | right payment " + (f"{correct / expected:6.1%}" if expected else "   n/a"))
+
+
+def main():
+    random.seed(22)
+    for n_lines, n_pagos in SIZES:
+        lines, pagos = synthetic(n_lines, n_pagos)
+        print(f"{n_lines} lines vs {n_pagos} payments:")
+        run("greedy", lines, pagos, optimal=False)
+        run("optimal", lines, pagos, optimal=True)
+        print()
+
+    lines, pagos = zero_amount_block(*ZERO_BLOCK)
+    print(f"{ZERO_BLOCK[0]} zero-amount lines vs {ZERO_BLOCK[1]} zero-amount payments:")
+    run("greedy", lines, pagos, optimal=False)
+    run("optimal", lines, pagos, optimal=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+import random
+from datetime import date
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import or_
+from scripts.benchmark_helpers import setup_sqlite_db, seed_catalogs, seed_mixed_vencimientos
+from database import SessionLocal, run_migrations
+from models.entities import Vencimiento, Obligacion, ProveedorServicio, Inmueble
+from services.search_service import SearchService
+from controllers.vencimientos_controller import VencimientosController
+
+N_VENCIMIENTOS = 100000
+PERIODO = "2025-06"
+QUERIES = ["proveedor 1", "inmueble 7", "calle", "credito", "zzz"]
+RUNS = 20
+
+
+def legacy_ilike(term):
+    """Previous reconciliation/API style: substring ILIKE over the joined catalogs."""
+    session = SessionLocal()
+    try:
+        like = f"%{term}%"
+        return session.query(Vencimiento.id).join(Vencimiento.obligacion).join(Obligacion.proveedor)\
+            .join(Obligacion.inmueble).filter(
+                Vencimiento.is_deleted == 0,
+                or_(ProveedorServicio.nombre_entidad.ilike(like), Inmueble.alias.ilike(like),
+                    Inmueble.direccion.ilike(like), Obligacion.numero_cliente_referencia.ilike(like))
+            ).order_by(Vencimiento.fecha_vencimiento.desc()).limit(50).all()
+    finally:
+        session.close()
+
+
+def best_ms(fn):
+    best = None
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - t0) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    random.seed(20)
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        obligaciones = seed_catalogs(session, 20, 25)
+        seed_mixed_vencimientos(session, obligaciones, N_VENCIMIENTOS, date(2018, 1, 1), date(2026, 12, 31))
+        session.query(ProveedorServicio).filter(ProveedorServicio.id == 1).first().nombre_entidad = "Banco Crédito"
+        session.commit()
+    finally:
+        session.close()
+    run_migrations() # Search index + indexes
+    print(f"Seeded {N_VENCIMIENTOS} vencimientos ({path}), best of {RUNS}\n")
+
+    controller = VencimientosController()
+    print(f"{'query':<14}{'index match':>12}{'grid period':>13}{'grid all':>10}{'legacy ILIKE':>14}")
+    for q in QUERIES:
+        session = SessionLocal()
+        try:
+            match = best_ms(lambda: SearchService.search(session, q))
+        finally:
+            session.close()
+        # count is cached per filter set after the first call: this times the page query
+        period = best_ms(lambda: controller.get_grid_rows(period_id=PERIODO, limit=50, search=q))
+        everything = best_ms(lambda: controller.get_grid_rows(limit=50, search=q))
+        legacy = best_ms(lambda: legacy_ilike(q))
+        print(f"{q:<14}{match:10.2f}ms{period:11.2f}ms{everything:8.2f}ms{legacy:12.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
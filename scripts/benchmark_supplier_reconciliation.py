@@ -0,0 +1,119 @@
+import sys
+import os
+import csv
+import time
+import random
+import tempfile
+from datetime import date, timedelta
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from scripts.benchmark_helpers import setup_sqlite_db, seed_catalogs, seed_mixed_vencimientos
+import database
+from database import SessionLocal, run_migrations
+from models.entities import Vencimiento
+from utils.import_helper import load_data_file
+from utils.format_helper import parse_fuzzy_date, parse_localized_float
+from controllers.reconciliation_controller import ReconciliationController
+
+N_VENCIMIENTOS = 100000
+N_LINES = 10000
+MATCHED_SHARE = 0.6 # Statement lines that are system vencimientos (same date and amount)
+
+
+def legacy_supplier(file_path):
+    """Previous analyze_supplier loop: one (fecha, monto) query per statement line."""
+    db = SessionLocal()
+    try:
+        df = load_data_file(file_path)
+        report = []
+        col_date = next((c for c in df.columns if 'fecha' in c.lower()), df.columns[0])
+        col_amount = next((c for c in df.columns if 'total' in c.lower() or 'impor' in c.lower() or 'monto' in c.lower()), df.columns[1])
+        col_ref = next((c for c in df.columns if 'fact' in c.lower() or 'ref' in c.lower()), None)
+        for _, row in df.iterrows():
+            try:
+                date_val = parse_fuzzy_date(row[col_date])
+                if not date_val: continue
+                amt_val = parse_localized_float(row[col_amount])
+                existing = db.query(Vencimiento).filter(
+                    Vencimiento.fecha_vencimiento == date_val,
+                    Vencimiento.monto_original == amt_val
+                ).first()
+                report.append({
+                    "fecha": date_val,
+                    "concepto": f"Factura {row[col_ref]}" if col_ref else "Obligacion Detectada",
+                    "valor_csv": amt_val,
+                    "valor_db": existing.monto_original if existing else 0.0,
+                    "status": "MATCH" if existing else "NEW",
+                    "moneda": "ARS"
+                })
+            except: pass
+        return True, report
+    finally:
+        db.close()
+
+
+def write_statement(vencs, path):
+    """Supplier statement (es-AR number format): invoices in the system plus new ones."""
+    lines = []
+    for i in range(N_LINES):
+        if random.random() < MATCHED_SHARE:
+            fecha, monto = random.choice(vencs)
+        else:
+            fecha = date(2025, 1, 1) + timedelta(days=random.randint(0, 364))
+            monto = round(random.uniform(1000, 250000), 2)
+        texto = f"{monto:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        lines.append([fecha.strftime("%d/%m/%Y"), f"A-0001-{i:08d}", texto])
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Fecha", "Factura", "Importe"])
+        writer.writerows(lines)
+
+
+def timed(label, fn, path):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(database._engine, "before_cursor_execute", count)
+    try:
+        t0 = time.perf_counter()
+        ok, report = fn(path)
+        elapsed = (time.perf_counter() - t0) * 1000
+    finally:
+        event.remove(database._engine, "before_cursor_execute", count)
+    matched = sum(1 for r in report if r['status'] == "MATCH") if ok else 0
+    print(f"  {label:<10} {elapsed:9.1f} ms | {len(statements):6d} queries | {matched} of {len(report) if ok else 0} lines MATCH")
+    return report
+
+
+def main():
+    random.seed(23)
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        obligaciones = seed_catalogs(session)
+        seed_mixed_vencimientos(session, obligaciones, N_VENCIMIENTOS, date(2024, 1, 1), date(2025, 12, 31))
+        vencs = session.query(Vencimiento.fecha_vencimiento, Vencimiento.monto_original).filter(
+            Vencimiento.is_deleted == 0, Vencimiento.fecha_vencimiento >= date(2025, 1, 1),
+            Vencimiento.fecha_vencimiento <= date(2025, 12, 31)
+        ).all()
+    finally:
+        session.close()
+    run_migrations() # Indexes
+
+    statement = os.path.join(tempfile.mkdtemp(prefix="bench_"), "proveedor.csv")
+    write_statement(vencs, statement)
+    print(f"Seeded {N_VENCIMIENTOS} vencimientos ({path}), statement of {N_LINES} lines\n")
+
+    old = timed("per line", legacy_supplier, statement)
+    new = timed("hash join", ReconciliationController().analyze_supplier, statement)
+    diff = [(a, b) for a, b in zip(old, new) if a != b]
+    print(f"\nSame report: {len(old) == len(new) and not diff} ({len(diff)} lines differ)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+import random
+import numpy as np
+from datetime import date, timedelta
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.benchmark_helpers import setup_sqlite_db, seed_cotizaciones, seed_catalogs, seed_paid_vencimientos
+from database import SessionLocal, engine
+from models.entities import Cotizacion, Moneda
+from services.forex_service import ForexService, RateIndex
+from services.treasury_service import TreasuryService
+
+N_PAYMENTS = 2000
+N_BATCH = 50000
+START = date(2021, 1, 1)
+END = date(2025, 12, 31)
+
+
+def legacy_get_rate(self, target_date, session, max_lookback_days=60):
+    """Pre-index behaviour: one ORDER BY fecha DESC LIMIT 1 query per call."""
+    cot = session.query(Cotizacion).filter(
+        Cotizacion.fecha <= target_date,
+        Cotizacion.moneda == Moneda.USD
+    ).order_by(Cotizacion.fecha.desc()).first()
+    if cot:
+        return float(cot.venta)
+    latest = session.query(Cotizacion).filter(Cotizacion.moneda == Moneda.USD).order_by(Cotizacion.fecha.desc()).first()
+    return float(latest.venta) if latest else 1.0
+
+
+def legacy_get_rates(self, target_dates, session):
+    return np.array([legacy_get_rate(self, d, session) for d in target_dates])
+
+
+def time_summary(label):
+    t0 = time.perf_counter()
+    summary = TreasuryService.get_summary(START, END)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  | {summary['count']} pagos, USD eq. {summary['total_usd_equivalent']:,.2f}")
+    return elapsed, summary
+
+
+def main():
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        n_rates = seed_cotizaciones(session, START, END)
+        obligaciones = seed_catalogs(session)
+        seed_paid_vencimientos(session, obligaciones, N_PAYMENTS, START, END)
+    finally:
+        session.close()
+    print(f"Seeded {n_rates} cotizaciones and {N_PAYMENTS} pagos in {path}\n")
+
+    indexed = ForexService.get_rate, ForexService.get_rates
+    ForexService.get_rate, ForexService.get_rates = legacy_get_rate, legacy_get_rates
+    try:
+        before, s_before = time_summary("Before (query per rate)")
+    finally:
+        ForexService.get_rate, ForexService.get_rates = indexed
+
+    RateIndex.invalidate()
+    cold, _ = time_summary("After (cold index)")
+    warm, s_after = time_summary("After (warm index)")
+
+    same = abs(s_before["total_usd_equivalent"] - s_after["total_usd_equivalent"]) < 0.01
+    print(f"\nSpeedup: x{before / cold:.1f} cold, x{before / warm:.1f} warm. Totals match: {same}")
+
+    # --- Batch API: convert_many vs convert() per value ---
+    forex = ForexService()
+    span = (END - START).days
+    amounts = [random.uniform(1000, 250000) for _ in range(N_BATCH)]
+    dates = [START + timedelta(days=random.randint(0, span)) for _ in range(N_BATCH)]
+    session = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        single = [forex.convert(a, Moneda.ARS, Moneda.USD, d, session) for a, d in zip(amounts, dates)]
+        t_single = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = forex.convert_many(amounts, Moneda.ARS, dates, Moneda.USD, session)
+        t_batch = time.perf_counter() - t0
+    finally:
+        session.close()
+    same = max(abs(a - b) for a, b in zip(single, batch)) < 1e-6
+    print(f"\n{N_BATCH} conversions: convert() loop {t_single * 1000:.1f} ms, convert_many {t_batch * 1000:.1f} ms. Match: {same}")
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Runs EXPLAIN (PostgreSQL) / EXPLAIN QUERY PLAN (SQLite) on every statement issued by the
+hot dashboard, grid, treasury and reconciliation queries and fails (exit code 1) if any of
+them does a full scan of a large table.
+
+    python scripts/explain_hot_queries.py            # seeds a temporary SQLite file
+    python scripts/explain_hot_queries.py <db_url>   # existing, already seeded database (e.g. Postgres staging)
+"""
+import sys
+import os
+import json
+import random
+from datetime import date, datetime, timedelta
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+import database
+from database import SessionLocal, run_migrations, init_db_engine
+from models.entities import (
+    Base, Vencimiento, Pago, Cotizacion, AuditLog, IndiceEconomico, EstadoVencimiento, Moneda
+)
+from repositories.vencimiento_repository import VencimientoRepository
+from repositories.dashboard_repository import DashboardRepository
+from services.vencimiento_service import VencimientoService
+from services.treasury_service import TreasuryService
+from services.audit_service import AuditService
+from services.economic_service import EconomicService
+from services.cognitive_service import CognitiveService
+
+N_VENCIMIENTOS = 50000
+N_AUDIT_LOGS = 20000
+N_INDICES = 1200          # Monthly rows since 1926
+MIN_ROWS = 1000           # Smaller tables may be scanned (catalogs)
+
+TODAY = date.today()
+PERIODO = (TODAY - timedelta(days=60)).strftime("%Y-%m")
+
+# Whole-book aggregates: reading every active row is the point of the query
+EXPECTED_SCANS = {
+    "Dashboard KPIs (kpi_pass)": {"vencimientos"},
+}
+
+
+def hot_queries():
+    """(label, fn(session)) — the real code paths where they take a session, else the same predicates inline."""
+    repo = lambda s: VencimientoRepository(s, Vencimiento)
+    dash = lambda s: DashboardRepository(s, Vencimiento)
+    return [
+        ("Grid page (periodo)", lambda s: repo(s).get_grid_rows(period_id=PERIODO, limit=50)),
+        ("Grid count (periodo)", lambda s: repo(s).count_details(period_id=PERIODO)),
+        ("Grid page (periodo + estado)", lambda s: repo(s).get_grid_rows(period_id=PERIODO, estado=EstadoVencimiento.VENCIDO, limit=50)),
+        ("Grid page (periodo + inmueble, by monto)", lambda s: repo(s).get_grid_rows(
+            period_id=PERIODO, inmueble_id=3, sort_col="monto_original", sort_desc=True, limit=50)),
+        ("Grid page (all periods)", lambda s: repo(s).get_grid_rows(limit=50)),
+        ("Grid page (text search, all periods)", lambda s: repo(s).get_grid_rows(search="proveedor 3", limit=50)),
+        ("Duplicate check (obligacion + periodo)", lambda s: CognitiveService.check_duplicate(3, PERIODO, session=s)),
+        ("Alerts (get_upcoming)", lambda s: VencimientoService().get_upcoming(days=7, session=s)),
+        ("Dashboard upcoming_pending", lambda s: dash(s).upcoming_pending(TODAY, TODAY + timedelta(days=30))),
+        ("Dashboard chart (chart_pass)", lambda s: dash(s).chart_pass(TODAY - timedelta(days=180), TODAY)),
+        ("Dashboard KPIs (kpi_pass)", lambda s: dash(s).kpi_pass(TODAY, TODAY + timedelta(days=30), TODAY + timedelta(days=2), TODAY.month)),
+        ("Treasury movements (date range)", lambda s: TreasuryService.get_movements(
+            TODAY - timedelta(days=30), TODAY, session=s)),
+        ("Treasury movements (periodo)", lambda s: TreasuryService.get_movements(
+            TODAY - timedelta(days=30), TODAY, periodo_id=PERIODO, session=s)),
+        # ReconciliationController.analyze_bank: system payments around the statement dates
+        ("Reconciliation bank (pagos window)", lambda s: s.query(Pago).filter(
+            Pago.fecha_pago >= TODAY - timedelta(days=45), Pago.fecha_pago <= TODAY).all()),
+        # ReconciliationController.analyze_supplier: active vencimientos in the statement's date range
+        ("Reconciliation supplier (fecha range)", lambda s: s.query(Vencimiento.fecha_vencimiento, Vencimiento.monto_original).filter(
+            Vencimiento.fecha_vencimiento >= TODAY - timedelta(days=30), Vencimiento.fecha_vencimiento <= TODAY,
+            Vencimiento.is_deleted == 0).order_by(Vencimiento.id).all()),
+        # CurrencyService.rebuild: seed quote + quotes since a date for one currency
+        ("Rates (moneda + fecha)", lambda s: s.query(Cotizacion.fecha, Cotizacion.venta).filter(
+            Cotizacion.moneda == Moneda.USD, Cotizacion.venta.isnot(None), Cotizacion.fecha >= TODAY - timedelta(days=30)
+        ).order_by(Cotizacion.fecha).all()),
+        ("Audit log (entity_id)", lambda s: AuditService().get_logs(entity_id="vencimiento:42")),
+        ("Inflation factor (periodo range)", lambda s: EconomicService.calculate_inflation_factor(date(2024, 1, 1), date(2025, 1, 1), session=s)),
+    ]
+
+
+def seed():
+    from scripts.benchmark_helpers import setup_sqlite_db, seed_catalogs, seed_mixed_vencimientos, seed_cotizaciones
+    path = setup_sqlite_db()
+    session = SessionLocal()
+    try:
+        obligaciones = seed_catalogs(session, 20, 25)
+        seed_mixed_vencimientos(session, obligaciones, N_VENCIMIENTOS, date(2018, 1, 1), TODAY + timedelta(days=180))
+        seed_cotizaciones(session, date(2018, 1, 1), TODAY)
+        session.bulk_insert_mappings(AuditLog, [
+            {"timestamp": datetime(2024, 1, 1) + timedelta(minutes=i), "user_id": "bench", "action": "EDIT",
+             "entity_id": f"vencimiento:{random.randint(1, N_VENCIMIENTOS)}", "details": "[Vencimientos] edit"}
+            for i in range(N_AUDIT_LOGS)
+        ])
+        session.bulk_insert_mappings(IndiceEconomico, [
+            {"periodo": f"{1926 + i // 12}-{i % 12 + 1:02d}", "valor": round(random.uniform(0.5, 8.0), 2)}
+            for i in range(N_INDICES)
+        ])
+        session.commit()
+    finally:
+        session.close()
+    return path
+
+
+def table_sizes(conn):
+    sizes = {}
+    for table in Base.metadata.tables:
+        try:
+            sizes[table] = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+        except Exception:
+            conn.rollback()
+    return sizes
+
+
+def full_scans(conn, statement, params, sizes):
+    """Large tables read without an index by this statement."""
+    def large(name):
+        base = name.rsplit("_", 1)[0] if name not in sizes and name.rsplit("_", 1)[-1].isdigit() else name # vencimientos_1
+        return base if sizes.get(base, 0) >= MIN_ROWS else None
+
+    scanned = set()
+    if conn.dialect.name == "sqlite":
+        for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, params):
+            detail = row[-1]
+            # 'SCAN t' = table scan; 'SCAN t USING [COVERING] INDEX ix' walks an index (ordered / covering)
+            if detail.startswith("SCAN ") and " USING " not in detail:
+                table = large(detail.split()[1])
+                if table: scanned.add(table)
+        return scanned
+
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, params).scalar()
+    plan = plan if isinstance(plan, list) else json.loads(plan)
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node.get("Node Type") == "Seq Scan":
+            table = large(node.get("Relation Name", ""))
+            if table: scanned.add(table)
+        nodes.extend(node.get("Plans", []))
+    return scanned
+
+
+def main():
+    if len(sys.argv) > 1:
+        init_db_engine(sys.argv[1])
+        print(f"Checking {sys.argv[1].split('@')[-1]}")
+    else:
+        random.seed(19)
+        print(f"Seeded {seed()}")
+    run_migrations() # Index catalogue
+
+    engine = database._engine
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+        sizes = table_sizes(conn)
+    print("Rows: " + ", ".join(f"{t}={n}" for t, n in sorted(sizes.items()) if n >= MIN_ROWS) + "\n")
+
+    failures = 0
+    for label, fn in hot_queries():
+        captured = []
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                captured.append((statement, parameters))
+        event.listen(engine, "before_cursor_execute", capture)
+        session = SessionLocal()
+        try:
+            fn(session)
+        finally:
+            session.close()
+            event.remove(engine, "before_cursor_execute", capture)
+
+        scanned = set()
+        with engine.connect() as conn:
+            for statement, params in captured:
+                scanned |= full_scans(conn, statement, params, sizes)
+        unexpected = scanned - EXPECTED_SCANS.get(label, set())
+
+        if unexpected:
+            failures += 1
+            status = "FULL SCAN: " + ", ".join(sorted(unexpected))
+        elif scanned:
+            status = "ok (expected scan: " + ", ".join(sorted(scanned)) + ")"
+        else:
+            status = "ok"
+        print(f"{label:<44} {len(captured):2d} stmt  {status}")
+
+    print(f"\n{failures} quer{'y' if failures == 1 else 'ies'} with unexpected full scans.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from database import init_db_engine, run_migrations, SessionLocal
+from models.entities import Documento, DocumentoBlob
+from services.document_store import DocumentStore
+from config import load_last_db_path
+
+BATCH_SIZE = 20  # Documents per commit (bounds memory: one payload at a time)
+
+
+def migrate_document_store(db_url=None):
+    """Moves legacy inline 'documentos.file_data' into the content-addressed store (deduplicated)."""
+    print("--- MIGRATE DOCUMENT STORE ---")
+
+    if not db_url:
+        db_path = load_last_db_path()
+        if not db_path:
+            print("No hay base de datos configurada.")
+            return
+        db_url = db_path if db_path.startswith("postgresql") else f"sqlite:///{db_path}"
+
+    try:
+        init_db_engine(db_url)
+        run_migrations()
+    except Exception as e:
+        print(f"Error conectando a DB: {e}")
+        return
+
+    session = SessionLocal()
+    t0 = time.perf_counter()
+    moved = 0
+    try:
+        while True:
+            ids = [i for (i,) in session.query(Documento.id).filter(Documento.content_hash.is_(None))
+                   .order_by(Documento.id).limit(BATCH_SIZE).all()]
+            if not ids:
+                break
+            for doc_id in ids:
+                DocumentStore.adopt_inline(session, session.get(Documento, doc_id))
+                moved += 1
+            session.commit()
+            session.expunge_all()
+            print(f"  {moved} documentos migrados...")
+
+        docs, original = session.query(func.count(Documento.id), func.sum(Documento.file_size)).one()
+        blobs, stored = session.query(func.count(DocumentoBlob.sha256), func.sum(DocumentoBlob.stored_size)).one()
+        print(f"OK: {moved} migrados en {time.perf_counter() - t0:.1f} s.")
+        print(f"{docs} documentos ({(original or 0) / 2**20:.1f} MB) -> {blobs} contenidos únicos ({(stored or 0) / 2**20:.1f} MB almacenados).")
+    except Exception as e:
+        session.rollback()
+        print(f"Error durante la migración: {e}")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    migrate_document_store(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,47 @@
+import sys
+import os
+import time
+
+# Setup Paths
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import init_db_engine, SessionLocal
+from models.entities import ResumenMensual
+from services.rollup_service import ResumenMensualService
+from config import load_last_db_path
+
+
+def rebuild_resumen_mensual(db_url=None):
+    """Full rebuild of 'resumen_mensual' (after raw SQL fixes, restores, etc.)."""
+    print("--- REBUILD RESUMEN MENSUAL ---")
+
+    if not db_url:
+        db_path = load_last_db_path()
+        if not db_path:
+            print("No hay base de datos configurada.")
+            return
+        db_url = db_path if db_path.startswith("postgresql") else f"sqlite:///{db_path}"
+
+    try:
+        init_db_engine(db_url)
+    except Exception as e:
+        print(f"Error conectando a DB: {e}")
+        return
+
+    session = SessionLocal()
+    try:
+        conn = session.connection()
+        ResumenMensual.__table__.create(bind=conn, checkfirst=True)
+        t0 = time.perf_counter()
+        count = ResumenMensualService.rebuild(conn)
+        session.commit()
+        print(f"OK: {count} buckets en {(time.perf_counter() - t0) * 1000:.0f} ms.")
+    except Exception as e:
+        session.rollback()
+        print(f"Error durante rebuild: {e}")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    rebuild_resumen_mensual(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,13 +1,18 @@
 import requests
 import datetime
 from decimal import Decimal
-from models.entities import Cotizacion, Moneda
+from models.entities import Cotizacion, Moneda, SyncWatermark
+from repositories.cotizacion_repository import CotizacionRepository
 from utils.logger import app_logger
 from utils.decorators import safe_transaction
+from services.forex_service import RateIndex
 
 class BnaService:
     # Using ArgentinaDatos API - Free, open, historical
     API_URL = "https://api.argentinadatos.com/v1/cotizaciones/dolares/oficial"
+    WATERMARK_KEY = "BNA_USD"
+    OVERLAP_DAYS = 7 # Re-check the last week on every sync (late corrections)
+    MIN_SYNC_INTERVAL = datetime.timedelta(hours=6)
 
     @classmethod
     def check_connectivity(cls):
@@ -52,58 +57,59 @@ class BnaService:
             app_logger.error(f"BNA API Error: {e}")
             return None
 
+    @classmethod
+    def get_watermark(cls, session) -> SyncWatermark:
+        return session.get(SyncWatermark, cls.WATERMARK_KEY)
+
+    @classmethod
+    def is_fresh(cls, session) -> bool:
+        """True if a sync already ran within MIN_SYNC_INTERVAL (no need to hit the network)."""
+        mark = cls.get_watermark(session)
+        return bool(mark and mark.ultimo_sync and datetime.datetime.now() - mark.ultimo_sync < cls.MIN_SYNC_INTERVAL)
+
     @classmethod
     @safe_transaction
-    def sync_rates(cls, session=None):
+    def sync_rates(cls, force=False, full=False, session=None):
         """
         Syncs local DB with Official BNA rates (Authoritative).
-        Updates existing records and inserts new ones.
+        Incremental by default: only records newer than the latest stored date
+        (minus OVERLAP_DAYS, to pick up corrections) are upserted.
+        force: ignore the last-sync watermark. full: process the whole history.
         """
+        if not force and not full and cls.is_fresh(session):
+            return True, 0
+
         if not cls.check_connectivity():
             return False, 0
             
         history = cls.fetch_history()
         if not history:
             return False, 0
-            
-        count_updates = 0
-        
-        # Optimization: Fetch all USD quotes to memory to avoid N queries
-        # Map: date -> Cotizacion or dict
-        existing_map = {
-            row.fecha: row 
-            for row in session.query(Cotizacion).filter(Cotizacion.moneda == Moneda.USD).all()
-        }
-        
-        for item in history:
-            target_date = item['fecha']
-            new_compra = item['compra']
-            new_venta = item['venta']
-            
-            if target_date in existing_map:
-                # Update if different
-                existing = existing_map[target_date]
-                # Compare with small tolerance for floats
-                # Convert DB Decimal to float for comparison
-                # Compare with small tolerance for floats
-                # Convert DB Decimal to float for comparison
-                # if abs(float(existing.compra) - new_compra) > 0.001 or abs(float(existing.venta) - new_venta) > 0.001:
-                if abs(float(existing.venta) - new_venta) > 0.001 or abs(float(existing.compra or 0) - new_compra) > 0.001:
-                    existing.compra = new_compra
-                    existing.venta = new_venta
-                    count_updates += 1
-            else:
-                # Insert
-                new_cot = Cotizacion(
-                    fecha=target_date,
-                    moneda=Moneda.USD,
-                    compra=new_compra,
-                    venta=new_venta
-                )
-                session.add(new_cot)
-                count_updates += 1
-        
+
+        repo = CotizacionRepository(session, Cotizacion)
+        latest = None if full else repo.get_latest_date(Moneda.USD)
+        if latest:
+            cutoff = latest - datetime.timedelta(days=cls.OVERLAP_DAYS)
+            history = [item for item in history if item['fecha'] >= cutoff]
+
+        rows = [
+            {"fecha": item['fecha'], "moneda": Moneda.USD, "compra": item['compra'], "venta": item['venta']}
+            for item in history
+        ]
+        count_updates = repo.bulk_upsert(rows)
+
+        # Watermark: newest data date seen + when we ran
+        mark = cls.get_watermark(session)
+        if mark is None:
+            mark = SyncWatermark(fuente=cls.WATERMARK_KEY)
+            session.add(mark)
+        if rows:
+            newest = max(r["fecha"] for r in rows)
+            mark.ultima_fecha = max(mark.ultima_fecha or newest, newest)
+        mark.ultimo_sync = datetime.datetime.now()
+
         if count_updates > 0:
+            RateIndex.mark_dirty(session, Moneda.USD, min(r["fecha"] for r in rows))
             app_logger.info(f"BNA Sync: {count_updates} rates synced (Official).")
             
         return True, count_updates
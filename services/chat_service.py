@@ -1,7 +1,7 @@
 import re
-from sqlalchemy import func
+from sqlalchemy import func, case
 from utils.decorators import safe_transaction
-from models.entities import Vencimiento, EstadoVencimiento, ProveedorServicio, Obligacion
+from models.entities import Vencimiento, EstadoVencimiento, ProveedorServicio, Obligacion, ResumenMensual
 
 class ChatService:
     """
@@ -22,15 +22,11 @@ class ChatService:
         
         # 1. Intent: Total Debt ("cuanto debo", "deuda", "saldo", "pasivo", "rojo", "deficit")
         if any(x in text for x in ["debo", "deuda", "pendiente", "vencido", "saldo", "pasivo", "obligaciones", "tengo que pagar", "rojo", "deficit"]):
-            total = session.query(func.sum(Vencimiento.monto_original)).filter(
-                Vencimiento.estado.in_([EstadoVencimiento.PENDIENTE, EstadoVencimiento.VENCIDO]),
-                Vencimiento.is_deleted == 0
-            ).scalar() or 0.0
-            
-            count = session.query(func.count(Vencimiento.id)).filter(
-                Vencimiento.estado.in_([EstadoVencimiento.PENDIENTE, EstadoVencimiento.VENCIDO]),
-                Vencimiento.is_deleted == 0
-            ).scalar() or 0
+            total, count = session.query(func.sum(ResumenMensual.total), func.sum(ResumenMensual.cantidad)).filter(
+                ResumenMensual.estado.in_([EstadoVencimiento.PENDIENTE.name, EstadoVencimiento.VENCIDO.name])
+            ).one()
+            total = total or 0.0
+            count = count or 0
             
             if total == 0:
                 return "🎉 **¡Estás al día!** No tienes deudas pendientes registradas."
@@ -40,20 +36,13 @@ class ChatService:
         if any(x in text for x in ["como vengo", "resumen", "situacion", "balance", "estado del mes"]):
             current_period = today.strftime("%Y-%m")
             
-            # Paid this month (by period)
-            paid_val = session.query(func.sum(Vencimiento.monto_original)).filter(
-                Vencimiento.periodo == current_period,
-                Vencimiento.estado == EstadoVencimiento.PAGADO,
-                Vencimiento.is_deleted == 0
-            ).scalar()
+            # Paid / Pending this month (by period, from the monthly rollup)
+            is_paid = ResumenMensual.estado == EstadoVencimiento.PAGADO.name
+            paid_val, pending_val = session.query(
+                func.sum(case((is_paid, ResumenMensual.total))),
+                func.sum(case((~is_paid, ResumenMensual.total)))
+            ).filter(ResumenMensual.periodo == current_period).one()
             paid = float(paid_val or 0)
-            
-            # Pending this month
-            pending_val = session.query(func.sum(Vencimiento.monto_original)).filter(
-                Vencimiento.periodo == current_period,
-                Vencimiento.estado != EstadoVencimiento.PAGADO,
-                Vencimiento.is_deleted == 0
-            ).scalar()
             pending = float(pending_val or 0)
             
             pct_paid = 0
@@ -96,10 +85,9 @@ class ChatService:
         provs = session.query(ProveedorServicio).all()
         for p in provs:
             if p.nombre_entidad.lower() in text:
-                total = session.query(func.sum(Vencimiento.monto_original)).join(Obligacion).join(ProveedorServicio).filter(
-                    ProveedorServicio.id == p.id,
-                    Vencimiento.estado == EstadoVencimiento.PAGADO,
-                    Vencimiento.is_deleted == 0
+                total = session.query(func.sum(ResumenMensual.total)).filter(
+                    ResumenMensual.proveedor_id == p.id,
+                    ResumenMensual.estado == EstadoVencimiento.PAGADO.name
                 ).scalar() or 0.0
                 return f"🏷️ El histórico total pagado a **{p.nombre_entidad}** es de **${total:,.2f}**."
 
@@ -122,8 +110,8 @@ class ChatService:
             
         # 7. Intent: Count/Stats ("cuantos servicios", "cantidad")
         if any(x in text for x in ["cuantos servicios", "cantidad de facturas", "volumen"]):
-             count = session.query(func.count(Vencimiento.id)).filter(Vencimiento.is_deleted==0).scalar()
-             active_provs = session.query(func.count(ProveedorServicio.id)).filter(ProveedorServicio.activo==1).scalar()
+             count = session.query(func.sum(ResumenMensual.cantidad)).scalar() or 0
+             active_provs = session.query(func.count(ProveedorServicio.id)).scalar() # No active column
              return f"🔢 Tienes **{active_provs}** proveedores activos y has procesado un total de **{count}** comprobantes en el sistema."
 
         # 8. Greeting/Help
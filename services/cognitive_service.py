@@ -1,8 +1,8 @@
-from statistics import mean, stdev
 from typing import Optional
-from sqlalchemy import func
+from sqlalchemy import func, case, exists
 from utils.decorators import safe_transaction
-from models.entities import Vencimiento, EstadoVencimiento
+from models.entities import Vencimiento, EstadoVencimiento, ResumenMensual
+from services.obligacion_stats import ObligacionStats
 
 class CognitiveService:
     """
@@ -42,21 +42,13 @@ class CognitiveService:
         if not obligacion_id:
             return False, ""
             
-        # 1. Fetch History (Last 6 payments)
-        history = session.query(Vencimiento).filter(
-            Vencimiento.obligacion_id == obligacion_id,
-            Vencimiento.estado == EstadoVencimiento.PAGADO,
-            Vencimiento.is_deleted == 0
-        ).order_by(Vencimiento.fecha_vencimiento.desc()).limit(6).all()
-        
-        if len(history) < 3:
+        # 1. History (Last 6 payments), from the in-memory per-obligation stats
+        stat = ObligacionStats.get(session, obligacion_id)
+        if len(stat.paid_amounts) < 3:
             return False, "Insuficiente data histórica"
 
-         # Convert to float for stat calc
-        amounts = [float(h.monto_original) for h in history]
-        
         # 2. Heuristics
-        avg = mean(amounts)
+        avg = stat.mean
         
         # Threshold: 40% deviation from Moving Average
         threshold = 0.4
@@ -80,16 +72,13 @@ class CognitiveService:
         Checks if a record already exists for this Obligation + Period.
         Returns True if duplicate found.
         """
-        count = session.query(func.count(Vencimiento.id)).filter(
+        # Always asked to the database (one indexed EXISTS): rows written by another
+        # process (web API, other desktops on the same database) count too
+        return session.query(exists().where(
             Vencimiento.obligacion_id == obligacion_id,
             Vencimiento.periodo == periodo,
             Vencimiento.is_deleted == 0
-        ).scalar()
-        
-        return count > 0
-
-
-        return count > 0
+        )).scalar()
 
     @staticmethod
     @safe_transaction
@@ -136,17 +125,18 @@ class CognitiveService:
         prev_month_str = f"{prev_year}-{prev_month:02d}"
         
         # Calc totals (All obligations, regardless of payment status, to see 'spending pressure')
-        curr_total = session.query(func.sum(Vencimiento.monto_original)).filter(
-            Vencimiento.periodo == curr_month_str,
-            Vencimiento.is_deleted == 0
-        ).scalar()
-        curr_total = float(curr_total or 0)
-
-        prev_total = session.query(func.sum(Vencimiento.monto_original)).filter(
-            Vencimiento.periodo == prev_month_str,
-            Vencimiento.is_deleted == 0
-        ).scalar()
-        prev_total = float(prev_total or 0)
+        # One pass over the monthly rollup: total and paid per period
+        paid_state = EstadoVencimiento.PAGADO.name
+        totals = {
+            periodo: (float(total or 0), float(paid or 0))
+            for periodo, total, paid in session.query(
+                ResumenMensual.periodo,
+                func.sum(ResumenMensual.total),
+                func.sum(case((ResumenMensual.estado == paid_state, ResumenMensual.total)))
+            ).filter(ResumenMensual.periodo.in_([curr_month_str, prev_month_str])).group_by(ResumenMensual.periodo).all()
+        }
+        curr_total, curr_paid_val = totals.get(curr_month_str, (0.0, 0.0))
+        prev_total = totals.get(prev_month_str, (0.0, 0.0))[0]
         
         if prev_total > 0 and curr_total > prev_total:
             # Check % increase
@@ -156,13 +146,6 @@ class CognitiveService:
                     "type": "warning",
                     "text": f"📉 Alerta Inflación: Tus gastos subieron un {int(pct_inc*100)}% vs mes anterior."
                 })
-        
-        curr_paid_val = session.query(func.sum(Vencimiento.monto_original)).filter(
-            Vencimiento.periodo == curr_month_str,
-            Vencimiento.estado == EstadoVencimiento.PAGADO,
-            Vencimiento.is_deleted == 0
-        ).scalar()
-        curr_paid_val = float(curr_paid_val or 0)
 
         # 3. Good News (Completion)
         # If > 90% of current month is PAID
@@ -177,36 +160,38 @@ class CognitiveService:
         return insights
 
     @staticmethod
-    def predict_next_month_total(session) -> tuple[float, float, str]:
-        """
-        Predicts expenses for next month using Weighted Moving Average (Last 3 months).
-        Returns: (PredictedAmount, ConfidenceScore, Reasoning)
-        """
+    def history_periods(today=None) -> list:
+        """'YYYY-MM' of the 3 months before today: [M-1, M-2, M-3]."""
         from datetime import date
-        today = date.today()
-        
-        # Get last 3 months totals
-        history = []
-        # Calculate prev month logic
-        curr_month = today.month
-        curr_year = today.year
-        
+        today = today or date.today()
+        periods = []
         for i in range(1, 4):
-            target_month = curr_month - i
-            target_year = curr_year
+            target_month = today.month - i
+            target_year = today.year
             while target_month <= 0:
                 target_month += 12
                 target_year -= 1
-            
-            period_str = f"{target_year}-{target_month:02d}"
-            
-            t = session.query(func.sum(Vencimiento.monto_original)).filter(
-                Vencimiento.periodo == period_str, 
-                Vencimiento.is_deleted == 0
-            ).scalar()
-            history.append(float(t or 0))
-            
-        # history = [M-1, M-2, M-3]
+            periods.append(f"{target_year}-{target_month:02d}")
+        return periods
+
+    @staticmethod
+    def predict_next_month_total(session) -> tuple[float, float, str]:
+        """
+        Predicts expenses for next month using Weighted Moving Average (Last 3 months).
+        Returns: (PredictedAmount, ConfidenceScore, Reasoning)
+        """
+        from repositories.dashboard_repository import DashboardRepository
+
+        # history = [M-1, M-2, M-3], monthly totals from the rollup (same figures as the dashboard forecast)
+        periods = CognitiveService.history_periods()
+        totals = {}
+        for periodo, _, amount in DashboardRepository(session, Vencimiento).period_pass(periods):
+            totals[periodo] = totals.get(periodo, 0.0) + float(amount or 0)
+        return CognitiveService.forecast_from_history([totals.get(p, 0.0) for p in periods])
+
+    @staticmethod
+    def forecast_from_history(history: list) -> tuple[float, float, str]:
+        """Weighted moving average over monthly totals [M-1, M-2, M-3]."""
         if len(history) < 3 or sum(history) == 0:
             return 0.0, 0.0, "Insuficiente data histórica."
             
@@ -222,26 +207,41 @@ class CognitiveService:
     def detect_price_creep(session) -> list:
         """
         Identifies services that increased price consecutively over last 3 periods.
+        Single query: ROW_NUMBER() per obligation (Postgres / SQLite >= 3.25), all obligations.
         """
+        from models.entities import Obligacion, ProveedorServicio
+
+        rn = func.row_number().over(
+            partition_by=Vencimiento.obligacion_id,
+            order_by=(Vencimiento.fecha_vencimiento.desc(), Vencimiento.id.desc())
+        ).label('rn')
+        ranked = session.query(
+            Vencimiento.obligacion_id.label('obligacion_id'),
+            Vencimiento.monto_original.label('monto'),
+            rn
+        ).filter(Vencimiento.is_deleted == 0).subquery()
+
+        rows = session.query(ranked.c.obligacion_id, ranked.c.rn, ranked.c.monto, ProveedorServicio.nombre_entidad).\
+            join(Obligacion, Obligacion.id == ranked.c.obligacion_id).\
+            join(ProveedorServicio, ProveedorServicio.id == Obligacion.servicio_id).\
+            filter(ranked.c.rn <= 3).\
+            order_by(ranked.c.obligacion_id, ranked.c.rn).all()
+
+        # Group the (up to) 3 latest amounts per obligation: [v0 (newest), v1, v2]
+        latest = {}
+        for oid, _, monto, prov_name in rows:
+            amounts, _ = latest.setdefault(oid, ([], prov_name))
+            amounts.append(monto)
+
         alerts = []
-        result = session.query(Vencimiento.obligacion_id).group_by(Vencimiento.obligacion_id).limit(50).all()
-        obs_ids = [r[0] for r in result]
-        
-        for oid in obs_ids:
-            recs = session.query(Vencimiento).filter(
-                Vencimiento.obligacion_id == oid,
-                Vencimiento.is_deleted == 0
-            ).order_by(Vencimiento.fecha_vencimiento.desc()).limit(3).all()
-            
-            if len(recs) < 3: continue
+        for amounts, prov_name in latest.values():
+            if len(amounts) < 3 or None in amounts: continue
             
-            v0, v1, v2 = recs[0].monto_original, recs[1].monto_original, recs[2].monto_original
+            v0, v1, v2 = amounts
             # Threshold 1%
-            if v0 > v1 * 1.01 and v1 > v2 * 1.01:
+            if v2 > 0 and v0 > v1 * 1.01 and v1 > v2 * 1.01:
                 total_inc_pct = int(((v0 - v2) / v2) * 100)
-                if recs[0].obligacion and recs[0].obligacion.proveedor:
-                    prov_name = recs[0].obligacion.proveedor.nombre_entidad
-                    alerts.append(f"⚠️ {prov_name} aumentó un {total_inc_pct}% en 3 meses.")
+                alerts.append(f"⚠️ {prov_name} aumentó un {total_inc_pct}% en 3 meses.")
 
         return alerts
 
@@ -250,14 +250,18 @@ class CognitiveService:
         """
         Returns Categoría distribution for the period.
         """
-        from models.entities import Obligacion, ProveedorServicio
+        from models.entities import ProveedorServicio
         
-        rows = session.query(ProveedorServicio.categoria, func.sum(Vencimiento.monto_original)).\
-            join(Obligacion, Obligacion.servicio_id == ProveedorServicio.id).\
-            join(Vencimiento, Vencimiento.obligacion_id == Obligacion.id).\
-            filter(Vencimiento.periodo == period_id, Vencimiento.is_deleted == 0).\
+        rows = session.query(ProveedorServicio.categoria, func.sum(ResumenMensual.total)).\
+            join(ResumenMensual, ResumenMensual.proveedor_id == ProveedorServicio.id).\
+            filter(ResumenMensual.periodo == period_id).\
             group_by(ProveedorServicio.categoria).all()
             
+        return CognitiveService.spending_dna_from_totals(rows)
+
+    @staticmethod
+    def spending_dna_from_totals(rows) -> dict:
+        """[(categoria, amount)] -> {categoria: % of total}."""
         total = sum([float(r[1] or 0) for r in rows])
         if total == 0: return {}
         
@@ -268,5 +272,3 @@ class CognitiveService:
             dna[cat_name] = pct
             
         return dna
-
-
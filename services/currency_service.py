@@ -1,19 +1,227 @@
-
-from datetime import timedelta, date
+import threading
+import numpy as np
+from datetime import date
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
+import database
 from database import SessionLocal
-from models.entities import Cotizacion, Moneda
+from models.entities import Cotizacion, CotizacionDiaria, Moneda
 from utils.logger import app_logger
 
-class CurrencyService:
-    def __init__(self):
-        self._cache = {} # Key: (date, currency), Value: rate
 
+class DailyRateCalendar:
+    """
+    Forward-filled calendar of effective selling rates, one slot per day,
+    covering the span of 'cotizaciones' for each currency.
+    Persisted in 'cotizaciones_diarias' and mirrored in memory, so a lookup
+    is a single array index: rates[date.toordinal() - first_ordinal].
+
+    Forex write paths report the earliest date they touched; only the
+    calendar from that date onward is recomputed.
+    """
+    _lock = threading.Lock()
+    _build_lock = threading.Lock()  # One refresh + load at a time (cotizaciones_diarias primary key)
+    _calendars = None  # {currency_str: (first_ordinal, rates float64, origin_ordinals int64)}
+    _bind = None
+    _verified = False  # Persisted table checked against cotizaciones in this process
+    _stale = {}        # {currency_str: earliest ordinal to rebuild from, None = full}
+
+    # --- Invalidation ---
+
+    @classmethod
+    def mark_stale(cls, changes: dict):
+        """
+        changes: {Moneda or currency_str: earliest changed date (None = unknown, full rebuild)}.
+        Called once the writing transaction has committed.
+        """
+        with cls._lock:
+            for moneda, since in changes.items():
+                code = moneda.value if isinstance(moneda, Moneda) else str(moneda)
+                since_ord = since.toordinal() if since is not None else None
+                if code in cls._stale:
+                    prev = cls._stale[code]
+                    since_ord = None if prev is None or since_ord is None else min(prev, since_ord)
+                cls._stale[code] = since_ord
+            cls._calendars = None
+
+    # --- Build ---
+
+    @staticmethod
+    def rebuild(session: Session, currency_str: str, since: date = None) -> int:
+        """
+        Recomputes the persisted calendar for one currency from 'since'
+        (or from scratch) up to the last quote. Returns rows written.
+        """
+        moneda = Moneda[currency_str]
+        base = session.query(Cotizacion.fecha, Cotizacion.venta).filter(
+            Cotizacion.moneda == moneda,
+            Cotizacion.venta.isnot(None)
+        )
+
+        seed = None
+        if since is not None:
+            # Last quote before 'since' carries into the rebuilt range
+            seed = base.filter(Cotizacion.fecha < since).order_by(Cotizacion.fecha.desc()).first()
+            quotes = base.filter(Cotizacion.fecha >= since).order_by(Cotizacion.fecha).all()
+        else:
+            quotes = base.order_by(Cotizacion.fecha).all()
+
+        delete_q = session.query(CotizacionDiaria).filter(CotizacionDiaria.moneda == currency_str)
+        if since is not None:
+            delete_q = delete_q.filter(CotizacionDiaria.fecha >= since)
+        delete_q.delete(synchronize_session=False)
+
+        if seed is not None:
+            quotes = [seed] + quotes
+        if not quotes:
+            return 0
+
+        q_ords = np.array([f.toordinal() for f, _ in quotes], dtype=np.int64)
+        q_rates = np.array([float(v) for _, v in quotes], dtype=np.float64)
+
+        start = since.toordinal() if seed is not None else int(q_ords[0])
+        end = int(q_ords[-1])
+        if end < start:
+            return 0
+
+        days = np.arange(start, end + 1, dtype=np.int64)
+        idx = np.searchsorted(q_ords, days, side="right") - 1
+
+        rows = [
+            {
+                "fecha": date.fromordinal(int(d)),
+                "moneda": currency_str,
+                "venta": float(q_rates[i]),
+                "fecha_origen": date.fromordinal(int(q_ords[i])),
+            }
+            for d, i in zip(days, idx)
+        ]
+        session.execute(insert(CotizacionDiaria), rows)
+        return len(rows)
+
+    @classmethod
+    def _out_of_sync(cls, session: Session) -> list:
+        """Currencies whose persisted calendar does not match 'cotizaciones' (e.g. app closed mid-refresh)."""
+        source = {
+            (m.value if isinstance(m, Moneda) else str(m)): (n, last, round(float(total or 0), 2))
+            for m, n, last, total in session.query(
+                Cotizacion.moneda, func.count(), func.max(Cotizacion.fecha), func.sum(Cotizacion.venta)
+            ).filter(Cotizacion.venta.isnot(None)).group_by(Cotizacion.moneda).all()
+        }
+        derived = {
+            code: (n, last, round(float(total or 0), 2))
+            for code, n, last, total in session.query(
+                CotizacionDiaria.moneda, func.count(), func.max(CotizacionDiaria.fecha), func.sum(CotizacionDiaria.venta)
+            ).filter(CotizacionDiaria.fecha == CotizacionDiaria.fecha_origen).group_by(CotizacionDiaria.moneda).all()
+        }
+        return [code for code in set(source) | set(derived) if source.get(code) != derived.get(code)]
+
+    @classmethod
+    def _refresh_table(cls, session: Session):
+        """Applies pending incremental rebuilds (and a full one for out-of-sync currencies)."""
+        with cls._lock:
+            pending = dict(cls._stale)
+            cls._stale.clear()
+        if not cls._verified:
+            for code in cls._out_of_sync(session):
+                pending[code] = None
+
+        for code, since_ord in pending.items():
+            if code not in Moneda.__members__:
+                continue
+            since = date.fromordinal(since_ord) if since_ord is not None else None
+            count = cls.rebuild(session, code, since)
+            app_logger.info(f"DailyRateCalendar: {code} rebuilt from {since or 'start'} ({count} days).")
+        if pending:
+            session.commit()
+
+    @classmethod
+    def _load(cls, session: Session) -> dict:
+        rows = session.query(CotizacionDiaria.moneda, CotizacionDiaria.fecha, CotizacionDiaria.venta, CotizacionDiaria.fecha_origen)\
+            .order_by(CotizacionDiaria.moneda, CotizacionDiaria.fecha).all()
+
+        grouped = {}
+        for code, fecha, venta, origen in rows:
+            grouped.setdefault(code, []).append((fecha.toordinal(), venta, origen.toordinal()))
+
+        calendars = {}
+        for code, items in grouped.items():
+            first = items[0][0]
+            size = items[-1][0] - first + 1
+            rates = np.full(size, np.nan)
+            origins = np.full(size, -1, dtype=np.int64)
+            for d, venta, origen in items:
+                rates[d - first] = venta
+                origins[d - first] = origen
+            calendars[code] = (first, rates, origins)
+        return calendars
+
+    @classmethod
+    def _current(cls, bind):
+        calendars = cls._calendars
+        if calendars is not None and not cls._stale and cls._bind is bind:
+            return calendars
+        return None
+
+    @classmethod
+    def calendars(cls) -> dict:
+        """
+        Returns the in-memory calendars, refreshing/loading them if needed.
+        The warm path only compares against the live engine; rebuilds open their
+        own session (committed on their own) and run one at a time.
+        """
+        calendars = cls._current(database._engine)
+        if calendars is not None:
+            return calendars
+
+        with cls._build_lock:
+            session = SessionLocal()
+            try:
+                bind = session.get_bind()
+                calendars = cls._current(bind)
+                if calendars is not None:
+                    return calendars # Rebuilt by another thread while we waited
+
+                if cls._bind is not bind:
+                    cls._verified = False
+                cls._refresh_table(session)
+                calendars = cls._load(session)
+                with cls._lock:
+                    cls._calendars = calendars
+                    cls._bind = bind
+                    cls._verified = True
+                return calendars
+            finally:
+                session.close()
+
+    @classmethod
+    def lookup(cls, target_date: date, currency_str: str = "USD", max_age_days: int = 7):
+        """
+        Effective rate for target_date: its own quote or the last one before it,
+        if that quote is at most max_age_days old. Returns None otherwise.
+        """
+        cal = cls.calendars().get(currency_str)
+        if cal is None:
+            return None
+        first, rates, origins = cal
+
+        target = target_date.toordinal()
+        pos = target - first
+        if pos < 0:
+            return None
+        pos = min(pos, len(rates) - 1) # After the last quote: carry it (age check below)
+
+        if origins[pos] < 0 or target - origins[pos] > max_age_days:
+            return None
+        return float(rates[pos])
+
+
+class CurrencyService:
     def get_historical_rate(self, target_date: date, currency_str: str = "USD", max_recursion=7):
         """
         Finds the selling rate for a given date.
-        If not found, recursively checks previous days up to max_recursion.
-        Returns None if not found after recursion.
+        If not found, uses the closest previous quote up to max_recursion days back
+        (weekends / holidays). Returns None if not found.
         """
         if isinstance(target_date, str):
             # Handle string dates just in case
@@ -22,54 +230,17 @@ class CurrencyService:
             except:
                 pass
 
-        cache_key = (target_date, currency_str)
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-
-        # Base case for recursion
-        if max_recursion < 0:
-            return None
-
-        db = SessionLocal()
         try:
-            money_enum = Moneda[currency_str]
-            rate = db.query(Cotizacion).filter(
-                Cotizacion.fecha == target_date,
-                Cotizacion.moneda == money_enum
-            ).first()
-
-            if rate:
-                val = rate.venta
-                self._cache[cache_key] = val
-                return val
-            else:
-                # Recursive Step: Try yesterday
-                # We don't cache failures for the specific date if we found a fallback, 
-                # but conceptually the "Effective Rate" for Sunday IS Friday's rate.
-                # So we COULD cache Friday's rate as Sunday's rate to save recursion next time.
-                
-                prev_day = target_date - timedelta(days=1)
-                fallback_val = self.get_historical_rate(prev_day, currency_str, max_recursion - 1)
-                
-                if fallback_val:
-                    # Cache this date as using the fallback value to speed up future lookups
-                    self._cache[cache_key] = fallback_val
-                    return fallback_val
-                return None
-
+            return DailyRateCalendar.lookup(target_date, currency_str, max_age_days=max_recursion)
         except Exception as e:
             app_logger.error(f"Error getting rate for {target_date}: {e}")
             return None
-        finally:
-            db.close()
 
     def convert_to_usd(self, amount_ars, target_date):
         """Helper to convert ARS to USD using smart historical lookup."""
         if not amount_ars: return 0.0
-        
+
         rate = self.get_historical_rate(target_date, "USD")
         if rate and rate > 0:
             return amount_ars / rate
         return 0.0 # Or raise error / return None? 0.0 is safer for UI sums
-
-
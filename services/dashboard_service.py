@@ -1,21 +1,66 @@
 from datetime import date, timedelta
+from collections import OrderedDict
 import calendar
+import copy
+import threading
 from sqlalchemy import func, and_, desc, extract, case
 
 from repositories.vencimiento_repository import VencimientoRepository
+from repositories.dashboard_repository import DashboardRepository
 from models.entities import Vencimiento, EstadoVencimiento, Obligacion, ProveedorServicio, Inmueble, Moneda, Pago
 from dtos.dashboard import DashboardDTO, KPIData, ChartData, TimelineItem, UXState
 from utils.decorators import safe_transaction
 from services.forex_service import ForexService
+from services.data_version import DataVersion
 
 class DashboardService:
+    CACHE_MAX_ENTRIES = 32
+
+    # LRU of computed dashboards: (currency, focus month, as-of day, data version) -> DashboardDTO
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
     def __init__(self):
         self.forex_service = ForexService()
 
     @safe_transaction
-    def get_dashboard_data(self, target_currency="ARS", reference_date: date = None, session=None) -> DashboardDTO:
-        # Reference Date acts as "Focus Month"
+    def get_dashboard_data(self, target_currency="ARS", reference_date: date = None, force=False, session=None) -> DashboardDTO:
+        """
+        Cached dashboard for the focus month. Entries are keyed by DataVersion
+        (local writes) and DataVersion.database_stamp (writes from other
+        processes); force=True recomputes and replaces the entry.
+        """
         current_date = reference_date if reference_date else date.today()
+        version = (DataVersion.current(), DataVersion.database_stamp(session))
+        # 'today' is part of the key: the current month's KPIs depend on it
+        key = (target_currency, current_date.year, current_date.month, date.today(), version)
+
+        cls = DashboardService
+        cached = None
+        if not force:
+            with cls._cache_lock:
+                cached = cls._cache.get(key)
+                if cached is not None:
+                    cls._cache.move_to_end(key)
+        if cached is None:
+            cached = self._compute_dashboard_data(target_currency, current_date, session=session)
+            with cls._cache_lock:
+                # Entries from older data versions can never be hit again
+                for old_key in [k for k in cls._cache if k[-1] != key[-1]]:
+                    del cls._cache[old_key]
+                cls._cache[key] = cached
+                while len(cls._cache) > cls.CACHE_MAX_ENTRIES:
+                    cls._cache.popitem(last=False)
+        return copy.deepcopy(cached) # Views sort / mutate the DTO
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    @safe_transaction
+    def _compute_dashboard_data(self, target_currency, current_date: date, session=None) -> DashboardDTO:
+        # Reference Date acts as "Focus Month"
         current_year = current_date.year
         
         # Determine View Bounds (Whole Month)
@@ -33,113 +78,88 @@ class DashboardService:
         else:
             effective_date = view_end
 
-        # Helper to convert on the fly
-        def to_target(amount, source_curr, date_ref):
-            if not amount: return 0.0
+        # Helper to convert a whole aggregation in one batch
+        # groups: iterable of (amount, source_currency, date_ref)
+        def to_target_many(groups):
+            groups = list(groups)
+            if not groups: return []
+            amounts, monedas, dates = zip(*groups)
             # Map string/enum if needed
-            sm = source_curr if isinstance(source_curr, Moneda) else Moneda.ARS 
-            return self.forex_service.convert(amount, sm, target_currency, date_ref, session)
+            monedas = [m if isinstance(m, Moneda) else Moneda.ARS for m in monedas]
+            return self.forex_service.convert_many(amounts, monedas, dates, target_currency, session).tolist()
+
+        # --- Query Plan ---
+        # Every KPI / chart is a conditional aggregate inside a few grouped passes
+        # (DashboardRepository) instead of one query per widget; results are fanned out below.
+        repo = DashboardRepository(session, Vencimiento)
+        from services.cognitive_service import CognitiveService
+
+        limit_48h = effective_date + timedelta(days=2)
+        start_date_evo = view_end.replace(day=1) - timedelta(days=30*5) # Last 6 Months ending at View End
+        current_period = current_date.strftime("%Y-%m")
+        history_periods = CognitiveService.history_periods()
+
+        kpi_rows = repo.kpi_pass(effective_date, effective_date + timedelta(days=15), limit_48h, current_date.month)
+        chart_rows = repo.chart_pass(start_date_evo, view_end)
+        period_rows = repo.period_pass([current_period] + history_periods)
 
         # --- KPIs ---
         
-        # 1. Deuda Exigible Check (Global or up to Effective Date)
-        # Logic: All VENCIDO + PENDIENTE <= effective_date
-        # Use GREATEST(monto_original, monto_actualizado) to capture surcharges
-        # SQLite doesn't support GREATEST easily in all versions, strictly Postgres/MySQL do. 
-        # But user is on Postgres (Neon).
-        # Fallback for SQLite: case((actual > orig), actual, else_=orig)
-        
-        calc_amount = case(
-            (Vencimiento.monto_actualizado > Vencimiento.monto_original, Vencimiento.monto_actualizado),
-            else_=Vencimiento.monto_original
-        )
+        # 1. Deuda Exigible (Global, up to Effective Date): All VENCIDO + PENDIENTE <= effective_date
+        # Uses MAX(monto_original, monto_actualizado) to capture surcharges
+        deuda_by_moneda = {}
+        prevision_by_moneda = {}
+        debtors = set()
+        upcoming_48h = 0
+        streak_days = 0
+        total_inmuebles = 0
+        for moneda, inmueble_id, deuda, n_deuda, prevision, n_48h, n_streak, n_inmuebles in kpi_rows:
+            deuda_by_moneda[moneda] = deuda_by_moneda.get(moneda, 0) + (deuda or 0)
+            prevision_by_moneda[moneda] = prevision_by_moneda.get(moneda, 0) + (prevision or 0)
+            if n_deuda: debtors.add(inmueble_id)
+            upcoming_48h += n_48h
+            streak_days += n_streak
+            total_inmuebles = n_inmuebles or 0
 
-        deuda_groups = session.query(Vencimiento.moneda, func.sum(calc_amount)).filter(
-             (Vencimiento.estado == EstadoVencimiento.VENCIDO) | 
-             and_(Vencimiento.estado == EstadoVencimiento.PENDIENTE, Vencimiento.fecha_vencimiento <= effective_date)
-        ).filter(Vencimiento.is_deleted == 0).group_by(Vencimiento.moneda).all()
-        
-        deuda_exigible = sum(to_target(amount, moneda, effective_date) for moneda, amount in deuda_groups)
+        deuda_exigible = sum(to_target_many(
+            (amount, moneda, effective_date) for moneda, amount in deuda_by_moneda.items() if amount
+        ))
 
         # Previsión Caja (Next 15 days from Effective Date)
         if effective_date < date.today():
              prevision_caja = 0.0
         else:
-            limit_date = effective_date + timedelta(days=15)
-            # Same calc_amount logic
-            prevision_groups = session.query(Vencimiento.moneda, func.sum(calc_amount)).filter(
-                Vencimiento.estado == EstadoVencimiento.PENDIENTE,
-                Vencimiento.fecha_vencimiento > effective_date,
-                Vencimiento.fecha_vencimiento <= limit_date,
-                Vencimiento.is_deleted == 0
-            ).group_by(Vencimiento.moneda).all()
-            
-            prevision_caja = sum(to_target(amount, moneda, effective_date) for moneda, amount in prevision_groups)
-
-        # Eficiencia (SQL Count Unique)
-        count_debtors = session.query(Obligacion.inmueble_id).join(Vencimiento).filter(
-            (Vencimiento.estado == EstadoVencimiento.VENCIDO) |
-            and_(Vencimiento.estado == EstadoVencimiento.PENDIENTE, Vencimiento.fecha_vencimiento <= effective_date)
-        ).filter(Vencimiento.is_deleted == 0).distinct().count()
+            prevision_caja = sum(to_target_many(
+                (amount, moneda, effective_date) for moneda, amount in prevision_by_moneda.items() if amount
+            ))
 
-        from models.entities import EstadoInmueble
-        # Filter by state removed as column doesn't exist
-        total_inmuebles = session.query(func.count(Inmueble.id)).scalar() or 1
+        # Eficiencia (Unique properties with exigible debt)
+        count_debtors = len(debtors)
         if total_inmuebles == 0: total_inmuebles = 1
         eficiencia = ((total_inmuebles - count_debtors) / total_inmuebles) * 100
 
         # --- Charts ---
-        # Charts Logic
         # 1. If PAID -> Use Pago.monto (or sum of payments theoretically, here coalesced)
         # 2. If NOT PAID (Pending/Vencido) -> Use MAX(Original, Actualizado)
         # This ensures surcharges are visible in charts too.
-        
-        pago_logic = func.coalesce(Pago.monto, Vencimiento.monto_original)
-        pending_logic = case(
-            (Vencimiento.monto_actualizado > Vencimiento.monto_original, Vencimiento.monto_actualizado),
-            else_=Vencimiento.monto_original
-        )
-        
-        actual_amount = case(
-            (Vencimiento.estado == EstadoVencimiento.PAGADO, pago_logic),
-            else_=pending_logic
-        )
+        cat_sums, evo_sums, top_sums = {}, {}, {}
+        for y, m, alias, cat, moneda, amount in chart_rows:
+            y, m = int(y), int(m)
+            evo_sums[(y, m, moneda)] = evo_sums.get((y, m, moneda), 0) + (amount or 0)
+            if (y, m) == (view_start.year, view_start.month): # Focus Month
+                cat_sums[(cat, moneda)] = cat_sums.get((cat, moneda), 0) + (amount or 0)
+                top_sums[(alias, moneda)] = top_sums.get((alias, moneda), 0) + (amount or 0)
 
         # 1. Category (Focus Month)
-        # Filter: Within View Start/End
-        cat_groups = session.query(
-            ProveedorServicio.categoria, 
-            Vencimiento.moneda, 
-            func.sum(actual_amount)
-        ).select_from(Vencimiento).outerjoin(Pago).join(Obligacion).join(ProveedorServicio).filter(
-            Vencimiento.fecha_vencimiento >= view_start,
-            Vencimiento.fecha_vencimiento <= view_end
-        ).filter(Vencimiento.is_deleted == 0).group_by(ProveedorServicio.categoria, Vencimiento.moneda).all()
-        
         gastos_por_categoria = {}
-        for cat, moneda, amount in cat_groups:
-             val = to_target(amount, moneda, effective_date)
-             cat_name = cat
+        cat_values = to_target_many((amount, moneda, effective_date) for (_, moneda), amount in cat_sums.items())
+        for (cat_name, _), val in zip(cat_sums, cat_values):
              gastos_por_categoria[cat_name] = gastos_por_categoria.get(cat_name, 0) + val
 
         # 2. Evolution (Last 6 Months ending at View End)
-        start_date_evo = view_end.replace(day=1) - timedelta(days=30*5)
-        # SQLite extract returns distinct string '1', '2' or int depending on driver. 
-        # Safer to fetch Year, Month, Moneda, Sum
-        evo_groups = session.query(
-            extract('year', Vencimiento.fecha_vencimiento).label('y'), 
-            extract('month', Vencimiento.fecha_vencimiento).label('m'), 
-            Vencimiento.moneda, 
-            func.sum(actual_amount)
-        ).select_from(Vencimiento).outerjoin(Pago).filter(
-            Vencimiento.fecha_vencimiento >= start_date_evo,
-            Vencimiento.fecha_vencimiento <= view_end
-        ).filter(Vencimiento.is_deleted == 0).group_by('y', 'm', Vencimiento.moneda).all()
-        
         evo_map = {}
-        for y, m, moneda, amount in evo_groups:
-            y, m = int(y), int(m)
-            val = to_target(amount, moneda, date(y, m, 1))
+        evo_values = to_target_many((amount, moneda, date(y, m, 1)) for (y, m, moneda), amount in evo_sums.items())
+        for (y, m, _), val in zip(evo_sums, evo_values):
             evo_map[(y, m)] = evo_map.get((y, m), 0) + val
 
         evolution_data = []
@@ -148,18 +168,9 @@ class DashboardService:
             evolution_data.append({"period": f"{month_name}-{y}", "amount": evo_map[(y, m)]})
 
         # 3. Top Properties (Focus Month)
-        top_groups = session.query(
-            Inmueble.alias, 
-            Vencimiento.moneda, 
-            func.sum(actual_amount)
-        ).select_from(Vencimiento).outerjoin(Pago).join(Obligacion).join(Inmueble).filter(
-            Vencimiento.fecha_vencimiento >= view_start, 
-            Vencimiento.fecha_vencimiento <= view_end
-        ).filter(Vencimiento.is_deleted == 0).group_by(Inmueble.alias, Vencimiento.moneda).all()
-        
         top_map = {}
-        for alias, moneda, amount in top_groups:
-             val = to_target(amount, moneda, effective_date)
+        top_values = to_target_many((amount, moneda, effective_date) for (_, moneda), amount in top_sums.items())
+        for (alias, _), val in zip(top_sums, top_values):
              top_map[alias] = top_map.get(alias, 0) + val
             
         sorted_top = sorted(top_map.items(), key=lambda x: x[1], reverse=True)[:5]
@@ -168,32 +179,18 @@ class DashboardService:
         # --- Timeline (Strictly Focus Month) ---
         # Logic: Show PENDING items that belong strictly to this month.
         # This acts as "What is left to pay for this specific month?"
-        proximos_vencimientos = session.query(Vencimiento).filter(
-            Vencimiento.estado == EstadoVencimiento.PENDIENTE,
-            Vencimiento.fecha_vencimiento >= view_start,
-            Vencimiento.fecha_vencimiento <= view_end,
-            Vencimiento.is_deleted == 0
-        ).order_by(Vencimiento.fecha_vencimiento).limit(5).all()
+        proximos_vencimientos = repo.upcoming_pending(view_start, view_end, limit=5)
         
         timeline_data = []
-        for v in proximos_vencimientos:
-            converted_amount = to_target(v.monto_original, v.moneda, v.fecha_vencimiento)
+        timeline_values = to_target_many((monto, moneda, fecha) for fecha, monto, moneda, _, _ in proximos_vencimientos)
+        for (fecha, _, _, alias, proveedor), converted_amount in zip(proximos_vencimientos, timeline_values):
             timeline_data.append(TimelineItem(
-                fecha=v.fecha_vencimiento.strftime("%d/%m"),
-                detalle=f"{v.obligacion.inmueble.alias} - {v.obligacion.proveedor.nombre_entidad}",
+                fecha=fecha.strftime("%d/%m"),
+                detalle=f"{alias} - {proveedor}",
                 monto=converted_amount
             ))
 
         # --- UX State ---
-        emotional_state = "ZEN"
-        limit_48h = effective_date + timedelta(days=2)
-        upcoming_48h = session.query(func.count(Vencimiento.id)).filter(
-            Vencimiento.estado == EstadoVencimiento.PENDIENTE,
-            Vencimiento.fecha_vencimiento > effective_date,
-            Vencimiento.fecha_vencimiento <= limit_48h,
-            Vencimiento.is_deleted == 0
-        ).scalar() or 0
-
         if deuda_exigible > 0:
             emotional_state = "CRITICAL"
         elif upcoming_48h > 0:
@@ -201,17 +198,10 @@ class DashboardService:
         else:
             emotional_state = "ZEN"
 
-        streak_days = session.query(func.count(Vencimiento.id)).filter(
-            Vencimiento.estado == EstadoVencimiento.PAGADO,
-            extract('month', Vencimiento.fecha_vencimiento) == current_date.month,
-            Vencimiento.is_deleted == 0
-        ).scalar() or 0
-        
         if emotional_state == "CRITICAL":
             streak_days = 0
             
         # --- Savings Stats (Current Month) ---
-        current_period = current_date.strftime("%Y-%m")
         # Now automatically converted to target_currency
         savings = self.get_savings_stats(current_period, target_currency=target_currency, session=session)
         total_saved = savings.get("total_saved", 0.0)
@@ -220,44 +210,23 @@ class DashboardService:
         total_orig = savings.get("total_original", 0.0)
         ahorro_pct = (total_saved / total_orig * 100) if total_orig > 0 else 0.0
 
-        # --- AI Insights (New) ---
-        from services.cognitive_service import CognitiveService
+        # --- AI Insights ---
         from dtos.dashboard import AIInsights
-        
-        # 1. Forecast
-        # Use simple session injection if method signature allows, else default.
-        # CognitiveService methods use @safe_transaction decorator? 
-        # Wait, if we are inside a transaction, calling decorated method might open nested session if not careful?
-        # CognitiveService methods take 'session' arg? Let's check signature.
-        # Yes: predict_next_month_total(session)
-        # But decorators might wrap it. 
-        # Actually safe_transaction decorator handles "session=None" by creating one. 
-        # If we pass session, it uses it.
-        
-        f_amount, f_conf, f_reason = CognitiveService.predict_next_month_total(session=session)
-        
-        # Convert forecast amount too? Yes, usually forecast is in base currency (ARS?) or original inputs.
-        # Assumption: Forecasting logic sums "monto_original". This is mixed currency.
-        # Better: Convert amounts inside prediction logic? Or just treat as "Value Unit".
-        # For MVP, assume mixed-currency sum is roughly OK or mostly ARS. Upgrade later. 
-        # Actually, let's convert the result to target currency?
-        # If forecast is sum of raw values, it's messy.
-        # But `predict_next_month_total` does `sum(monto_original)`.
-        # Correct approach: `predict` should normalize to a base currency internally.
-        # Given constraint, let's assume result is in "Global Unit" mixed.
-        # Ideally we convert distinct currencies in history then forecast.
-        # For now, let's treat the result as "Value" and convert if needed or display as is?
-        # Let's assume it returns a raw sum. We will format it as is or try to convert if "ARS"?
-        # Actually, if we are in USD view, showing ARS forecast is confusing.
-        # Let's convert the output using today's rate if we assume it's mostly ARS?
-        # Simpler: Pass target currency to CognitiveService?
-        # No, for now, let's just display what comes back and polish later.
-        
+
+        period_totals = {}
+        for periodo, cat, amount in period_rows:
+            period_totals.setdefault(periodo, []).append((cat, amount))
+
+        # 1. Forecast (raw sum of monto_original of the last 3 months, mixed currency)
+        f_amount, f_conf, f_reason = CognitiveService.forecast_from_history(
+            [sum(float(a or 0) for _, a in period_totals.get(p, [])) for p in history_periods]
+        )
+
         # 2. Alerts
         alerts = CognitiveService.detect_price_creep(session=session)
         
-        # 3. DNA
-        dna = CognitiveService.get_spending_dna(session, period_id=current_period) # Focus on current month
+        # 3. DNA (Focus on current month)
+        dna = CognitiveService.spending_dna_from_totals(period_totals.get(current_period, []))
         
         ai_data = AIInsights(
             forecast_amount=f_amount,
@@ -291,20 +260,18 @@ class DashboardService:
         total_original = 0.0
         total_paid = 0.0
         
-        for orig, paid, moneda, fecha in rows:
+        if rows:
             # Handle None
-            o = float(orig or 0)
-            p = float(paid or o)
+            originals = [float(orig or 0) for orig, _, _, _ in rows]
+            paids = [float(paid or o) for (_, paid, _, _), o in zip(rows, originals)]
             
-            # Normalize to Target Currency
+            # Normalize to Target Currency (whole column per call)
             # We use the fecha_vencimiento (or pago date?) as reference. Venc date is stable.
-            m_enum = moneda if isinstance(moneda, Moneda) else Moneda.ARS
-            
-            o_conv = self.forex_service.convert(o, m_enum, target_currency, fecha, session)
-            p_conv = self.forex_service.convert(p, m_enum, target_currency, fecha, session)
+            monedas = [moneda if isinstance(moneda, Moneda) else Moneda.ARS for _, _, moneda, _ in rows]
+            fechas = [fecha for _, _, _, fecha in rows]
             
-            total_original += o_conv
-            total_paid += p_conv
+            total_original = float(self.forex_service.convert_many(originals, monedas, fechas, target_currency, session).sum())
+            total_paid = float(self.forex_service.convert_many(paids, monedas, fechas, target_currency, session).sum())
             
         saved = total_original - total_paid
             
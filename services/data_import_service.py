@@ -4,7 +4,8 @@ import os
 from datetime import datetime
 from utils.logger import app_logger
 
-from utils.format_helper import parse_localized_float, parse_fuzzy_date
+from utils.format_helper import parse_localized_float_series, parse_fuzzy_date_series
+from utils.import_helper import open_source
 
 class DataImportService:
     """
@@ -24,49 +25,53 @@ class DataImportService:
             if df is None or df.empty:
                 return False, [], "El archivo está vacío o no se pudo leer."
 
-            # 2. Normalize Columns
+            # 2. Normalize Columns (column-wise: one parse per column, convention detected per column)
             transactions = []
             errors = []
-            
-            # Normalize Loop
-            for index, row in df.iterrows():
-                try:
-                    # Date
-                    raw_date = row.get(mapping_config.get('fecha'))
-                    date_val = parse_fuzzy_date(raw_date)
-                    
-                    if not date_val: continue # Skip invalid dates
+            blank = pd.Series("", index=df.index)
+
+            def column(key):
+                col = mapping_config.get(key)
+                return df[col] if col and col in df.columns else None
 
-                    # Amount
-                    final_amount = 0.0
-                    col_imp = mapping_config.get('importe')
-                    col_deb = mapping_config.get('debito')
-                    col_cred = mapping_config.get('credito')
+            raw_dates = column('fecha')
+            if raw_dates is None:
+                return False, [], "No se encontraron transacciones válidas. Verifique el mapeo de columnas."
+            dates = parse_fuzzy_date_series(raw_dates)
 
-                    if col_deb and col_cred and col_deb in row and col_cred in row:
-                        v_deb = parse_localized_float(row.get(col_deb))
-                        v_cred = parse_localized_float(row.get(col_cred))
-                        if v_deb > 0: final_amount = -abs(v_deb)
-                        elif v_cred > 0: final_amount = abs(v_cred)
-                    elif col_imp and col_imp in row:
-                        raw_imp = row.get(col_imp)
-                        final_amount = parse_localized_float(raw_imp)
-                        # Check specific negative sign indicators if string
-                        if isinstance(raw_imp, str) and '-' in raw_imp:
-                             final_amount = -abs(final_amount)
+            # Amount
+            amounts = pd.Series(0.0, index=df.index)
+            invalid = pd.Series(False, index=df.index)
+            col_deb, col_cred, col_imp = column('debito'), column('credito'), column('importe')
+            if col_deb is not None and col_cred is not None:
+                v_deb, bad_deb = parse_localized_float_series(col_deb, with_invalid=True)
+                v_cred, bad_cred = parse_localized_float_series(col_cred, with_invalid=True)
+                amounts = amounts.mask(v_cred > 0, v_cred.abs()).mask(v_deb > 0, -v_deb.abs())
+                invalid = bad_deb | bad_cred
+            elif col_imp is not None:
+                amounts, invalid = parse_localized_float_series(col_imp, with_invalid=True)
+                # Check specific negative sign indicators if string
+                negative = col_imp.map(lambda v: isinstance(v, str) and '-' in v)
+                amounts = amounts.mask(negative, -amounts.abs())
 
-                    # Description
-                    desc = str(row.get(mapping_config.get('descripcion'), ""))
+            # Description
+            col_desc = column('descripcion')
+            descs = col_desc.astype(str) if col_desc is not None else blank
 
-                    transactions.append({
-                        "date": date_val,
-                        "description": desc,
-                        "amount": final_amount,
-                        "raw_row_index": index
-                    })
+            valid = dates.notna().tolist()
+            columns = (df.index.tolist(), dates.dt.date.tolist(), amounts.tolist(), invalid.tolist(), descs.tolist())
+            for ok, index, date_val, amount, bad, desc in zip(valid, *columns):
+                if not ok: continue # Skip invalid dates
+                if bad: errors.append(f"Row {index}: importe no numérico (tomado como 0)")
+                transactions.append({
+                    "date": date_val,
+                    "description": desc,
+                    "amount": amount,
+                    "raw_row_index": index
+                })
 
-                except Exception as e_row:
-                    errors.append(f"Row {index}: {str(e_row)}")
+            if errors:
+                app_logger.warning(f"Import: {len(errors)} rows with errors ({'; '.join(errors[:3])})")
 
             if not transactions:
                 return False, [], "No se encontraron transacciones válidas. Verifique el mapeo de columnas."
@@ -78,37 +83,8 @@ class DataImportService:
             return False, [], str(e)
 
     def _load_file_robust(self, file_path, header_row):
-        """Attempts to load file using multiple strategies."""
-        import os
-        ext = os.path.splitext(file_path)[1].lower()
-        
-        # Strategy A: Excel Native (openpyxl)
-        try:
-            # Try forcing Excel if extension matches or generally
-            return pd.read_excel(file_path, header=header_row) # Let pandas auto-engine (usually openpyxl for xlsx, xlrd for xls)
-        except Exception:
-            pass
-            
-        # Strategy B: HTML (Fake Excel)
+        """Excel, HTML (fake Excel) or CSV, told apart by content; one read, cached (utils.import_helper)."""
         try:
-            dfs = pd.read_html(file_path, header=header_row)
-            if dfs: return dfs[0]
-        except Exception:
-            pass
-            
-        # Strategy C: CSV / Text (The Fallback)
-        try:
-            # Sniff delimiter
-            delimiter = ','
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    for _ in range(header_row): f.readline()
-                    sample = f.read(1024)
-                    import csv
-                    dialect = csv.Sniffer().sniff(sample)
-                    delimiter = dialect.delimiter
-            except Exception: pass
-            
-            return pd.read_csv(file_path, sep=delimiter, header=header_row, encoding='utf-8')
-        except Exception as e_csv:
-            raise Exception(f"Failed to load file. Formats tried: Excel, HTML, CSV. Last error: {e_csv}")
+            return open_source(file_path).frame(header_row=header_row)
+        except Exception as e:
+            raise Exception(f"Failed to load file: {e}")
@@ -0,0 +1,88 @@
+import threading
+from sqlalchemy import event, select, func, case, true
+from sqlalchemy.orm import Session
+from models.entities import Vencimiento, Pago, Obligacion, Inmueble, ProveedorServicio, Cotizacion, EstadoVencimiento
+
+# Tables whose changes invalidate derived results (dashboard, stats)
+TRACKED_TABLES = frozenset(m.__tablename__ for m in (Vencimiento, Pago, Obligacion, Inmueble, ProveedorServicio, Cotizacion))
+
+
+class DataVersion:
+    """
+    Monotonic counter of committed writes to the tracked tables (this process).
+    Caches key their entries by DataVersion.current(): any committed write from
+    VencimientoService, ForexService, payments, importers, etc. makes older
+    entries unreachable.
+
+    Writes are detected at the Session level (ORM flushes and bulk
+    insert/update/delete statements), so new write paths need no extra calls.
+    """
+    _lock = threading.Lock()
+    _version = 0
+
+    @classmethod
+    def current(cls) -> int:
+        return cls._version
+
+    @classmethod
+    def bump(cls) -> int:
+        with cls._lock:
+            cls._version += 1
+            return cls._version
+
+    @staticmethod
+    def mark_session(session: Session):
+        session.info["data_changed"] = True
+
+    @staticmethod
+    def database_stamp(session: Session) -> tuple:
+        """
+        Cheap fingerprint of the shared database (one statement): counts, max ids
+        and amount sums of vencimientos/pagos plus the latest cotizacion. Catches
+        writes made by other processes (API server, other desktops on the same
+        database), which never bump the in-process counter.
+        """
+        venc = select(
+            func.count(Vencimiento.id), func.max(Vencimiento.id),
+            func.sum(Vencimiento.monto_original), func.sum(Vencimiento.monto_actualizado),
+            func.sum(case((Vencimiento.estado == EstadoVencimiento.PAGADO, 1), else_=0)),
+        )
+        pagos = select(func.count(Pago.id), func.max(Pago.id), func.sum(Pago.monto))
+        cotiz = select(func.count(), func.max(Cotizacion.fecha)).select_from(Cotizacion)
+        venc, pagos, cotiz = venc.subquery(), pagos.subquery(), cotiz.subquery()
+        # Single-row aggregates: cross join them into one round-trip
+        stmt = select(venc, pagos, cotiz).select_from(venc.join(pagos, true()).join(cotiz, true()))
+        row = session.execute(stmt).one()
+        return tuple(row)
+
+
+def _touches_tracked(objects) -> bool:
+    return any(getattr(obj, "__tablename__", None) in TRACKED_TABLES for obj in objects)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_flush(session, flush_context, instances):
+    modified = (obj for obj in session.dirty if session.is_modified(obj))
+    if _touches_tracked(session.new) or _touches_tracked(session.deleted) or _touches_tracked(modified):
+        DataVersion.mark_session(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statement(orm_execute_state):
+    # query.update()/delete(), session.execute(insert(...)) and upserts
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in TRACKED_TABLES:
+        DataVersion.mark_session(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop("data_changed", False):
+        DataVersion.bump()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop("data_changed", None)
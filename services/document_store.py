@@ -0,0 +1,372 @@
+import os
+import hashlib
+import tempfile
+import zlib
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+from sqlalchemy import event, func, or_, cast, bindparam, LargeBinary
+from sqlalchemy.orm import Session
+from config import DOCUMENT_STORE_DIR, get_document_store_settings
+from models.entities import Documento, DocumentoBlob, Vencimiento, Pago
+from utils.exceptions import ServiceError
+from utils.logger import app_logger
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+# Already-compressed formats: zlib only burns CPU on them
+_INCOMPRESSIBLE_MIME = ("image/jpeg", "image/png", "application/zip")
+
+_BLOBS = DocumentoBlob.__table__
+
+_MIME_BY_EXT = {".pdf": "application/pdf", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png"}
+
+
+def _read_chunks(file_path: str, start: int = 0, end: int = None) -> Iterator[bytes]:
+    """File bytes [start, end) in CHUNK_SIZE pieces."""
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+def _column_slices(session: Session, column, condition, start: int = 0, end: int = None) -> Iterator[bytes]:
+    """BLOB column bytes [start, end) fetched with SUBSTR, one CHUNK_SIZE piece per query."""
+    if end is None:
+        end = session.query(func.length(column)).filter(condition).scalar() or 0
+    pos = start
+    while pos < end:
+        size = min(CHUNK_SIZE, end - pos)
+        chunk = session.query(func.substr(column, pos + 1, size)).filter(condition).scalar()
+        if not chunk:
+            return
+        yield bytes(chunk)
+        pos += len(chunk)
+
+
+# --- Payload backends ---
+
+class BlobBackend(ABC):
+    """Where the (possibly compressed) payload of a DocumentoBlob lives."""
+    name = None
+
+    @abstractmethod
+    def put(self, session: Session, blob: DocumentoBlob, chunks: Iterator[bytes]) -> int:
+        """Stores the chunks; returns stored size."""
+
+    @abstractmethod
+    def iter_stored(self, session: Session, blob: DocumentoBlob, start: int = 0, end: int = None) -> Iterator[bytes]:
+        """Yields the stored (possibly compressed) payload, bytes [start, end)."""
+
+    @abstractmethod
+    def remove(self, sha256: str):
+        """Drops the payload. Called only after the deleting transaction committed."""
+
+
+class DatabaseBlobBackend(BlobBackend):
+    """
+    Payload in documento_blobs.data (travels with DB backups / Neon).
+    Written as an empty row plus one 'data = data || :piece' UPDATE per CHUNK_SIZE
+    piece, so the client holds one piece at a time (the server still rewrites the
+    value on each append).
+    """
+    name = "db"
+
+    # Pieces go in as parameters of one reusable statement (a literal value would stay
+    # referenced by the compiled statement)
+    _APPEND = _BLOBS.update().where(_BLOBS.c.sha256 == bindparam("key")).values(
+        data=cast(_BLOBS.c.data.concat(bindparam("piece", type_=LargeBinary)), LargeBinary)
+    )
+
+    def _append(self, session, blob, piece: bytes):
+        session.execute(self._APPEND, {"key": blob.sha256, "piece": piece})
+
+    def put(self, session, blob, chunks):
+        blob.data = b""
+        blob.stored_size = 0
+        session.add(blob)
+        session.flush()
+
+        stored = 0
+        pending = bytearray()
+        for chunk in chunks:
+            pending += chunk
+            if len(pending) >= CHUNK_SIZE:
+                self._append(session, blob, bytes(pending))
+                stored += len(pending)
+                pending.clear()
+        if pending:
+            self._append(session, blob, bytes(pending))
+            stored += len(pending)
+        session.expire(blob, ["data"])
+        return stored
+
+    def iter_stored(self, session, blob, start=0, end=None):
+        yield from _column_slices(session, DocumentoBlob.data, DocumentoBlob.sha256 == blob.sha256,
+                                  start, blob.stored_size if end is None else end)
+
+    def remove(self, sha256):
+        pass  # The row (and its data) is deleted by the transaction itself
+
+
+class FileSystemBlobBackend(BlobBackend):
+    """Payload under DOCUMENT_STORE_DIR/ab/abcdef... (streamed, never fully in memory)."""
+    name = "fs"
+
+    def __init__(self, root=DOCUMENT_STORE_DIR):
+        self.root = root
+
+    def path(self, sha256: str):
+        return self.root / sha256[:2] / sha256
+
+    def put(self, session, blob, chunks):
+        target = self.path(blob.sha256)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=".upload_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    written += len(chunk)
+            # Content-addressed: a leftover file from a rolled back upload is identical
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return written
+
+    def iter_stored(self, session, blob, start=0, end=None):
+        path = self.path(blob.sha256)
+        if not path.exists():
+            raise ServiceError(f"Documento {blob.sha256[:12]} no encontrado en {self.root}")
+        yield from _read_chunks(str(path), start, end)
+
+    def remove(self, sha256):
+        path = self.path(sha256)
+        if path.exists():
+            os.remove(path)
+
+
+BACKENDS = {b.name: b for b in (DatabaseBlobBackend(), FileSystemBlobBackend())}
+
+
+# --- Store ---
+
+class DocumentStore:
+    """
+    Content-addressed document storage keyed by SHA-256.
+
+    Uploads are streamed in CHUNK_SIZE pieces: a first pass hashes the file, and only
+    unseen content is read again to be (optionally zlib-) compressed into the backend.
+    Identical files share one DocumentoBlob; each 'documentos' row (filename / mime metadata)
+    holds one reference. Documents no longer used by any vencimiento or pago are released,
+    and the payload goes away with the last reference.
+    """
+
+    # --- Write ---
+
+    @staticmethod
+    def hash_file(file_path: str) -> tuple[str, int]:
+        """(sha256 hex, size) read in chunks."""
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in _read_chunks(file_path):
+            digest.update(chunk)
+            size += len(chunk)
+        return digest.hexdigest(), size
+
+    @staticmethod
+    def _compressed(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(6)
+        for chunk in chunks:
+            out = compressor.compress(chunk)
+            if out:
+                yield out
+        yield compressor.flush()
+
+    @staticmethod
+    def _worth_compressing(chunks: Iterator[bytes]) -> bool:
+        """Probes the first chunk: PDFs with embedded scans barely shrink (skip zlib under 5% gain)."""
+        first = next(iter(chunks), b"")
+        if hasattr(chunks, "close"):
+            chunks.close()
+        return bool(first) and len(zlib.compress(first, 1)) < len(first) * 0.95
+
+    @classmethod
+    def _reference_blob(cls, session: Session, sha256: str, size: int, mime_type: str, chunk_source) -> DocumentoBlob:
+        """Existing blob for the hash (+1 ref), or a new one filled from chunk_source()."""
+        blob = session.get(DocumentoBlob, sha256)
+        if blob is None:
+            settings = get_document_store_settings()
+            backend = BACKENDS[settings["backend"]]
+            compress = settings["compress"] and mime_type not in _INCOMPRESSIBLE_MIME and cls._worth_compressing(chunk_source())
+            blob = DocumentoBlob(
+                sha256=sha256, size=size, ref_count=0,
+                compression="zlib" if compress else "", backend=backend.name
+            )
+            chunks = chunk_source()
+            blob.stored_size = backend.put(session, blob, cls._compressed(chunks) if compress else chunks)
+            session.add(blob)
+            session.flush()  # Visible to session.get() for the next upload in this transaction
+            app_logger.info(f"DocumentStore: stored {sha256[:12]} ({size} -> {blob.stored_size} bytes, {backend.name}).")
+        else:
+            app_logger.info(f"DocumentStore: {sha256[:12]} already stored (deduplicated).")
+        blob.ref_count = (blob.ref_count or 0) + 1
+        return blob
+
+    @classmethod
+    def store_file(cls, session: Session, file_path: str, filename: str = None, mime_type: str = None) -> Documento:
+        """Adds a 'documentos' row for the file, storing its content only if not already present."""
+        if not os.path.exists(file_path):
+            raise ServiceError(f"File not found: {file_path}")
+
+        filename = filename or os.path.basename(file_path)
+        mime_type = mime_type or _MIME_BY_EXT.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
+
+        sha256, size = cls.hash_file(file_path)
+        cls._reference_blob(session, sha256, size, mime_type, lambda: _read_chunks(file_path))
+
+        doc = Documento(
+            filename=filename,
+            file_data=b"",  # Legacy NOT NULL column; payload lives in the store
+            file_size=size,
+            mime_type=mime_type,
+            content_hash=sha256
+        )
+        session.add(doc)
+        session.flush()
+        return doc
+
+    @classmethod
+    def adopt_inline(cls, session: Session, doc: Documento) -> bool:
+        """Moves a legacy row's inline file_data into the store. Returns False if nothing to move."""
+        if doc.content_hash:
+            return False
+        data = session.query(Documento.file_data).filter(Documento.id == doc.id).scalar() or b""
+        sha256 = hashlib.sha256(data).hexdigest()
+        view = memoryview(data)
+        cls._reference_blob(
+            session, sha256, len(data), doc.mime_type,
+            lambda: (bytes(view[i:i + CHUNK_SIZE]) for i in range(0, len(data), CHUNK_SIZE))
+        )
+        doc.content_hash = sha256
+        doc.file_size = len(data)
+        doc.file_data = b""
+        return True
+
+    # --- Read ---
+
+    @staticmethod
+    def etag(doc: Documento) -> str:
+        """Strong validator: the content hash (legacy inline rows are never rewritten, so their id will do)."""
+        return f'"{doc.content_hash}"' if doc.content_hash else f'"doc-{doc.id}"'
+
+    @staticmethod
+    def content_length(session: Session, doc: Documento) -> int:
+        if doc.content_hash or doc.file_size is not None:
+            return doc.file_size or 0
+        return session.query(func.length(Documento.file_data)).filter(Documento.id == doc.id).scalar() or 0
+
+    @staticmethod
+    def iter_range(session: Session, doc: Documento, start: int = 0, end: int = None) -> Iterator[bytes]:
+        """Original bytes [start, end) of a document, chunk by chunk (legacy inline rows included)."""
+        if not doc.content_hash:
+            yield from _column_slices(session, Documento.file_data, Documento.id == doc.id, start, end)
+            return
+
+        blob = session.get(DocumentoBlob, doc.content_hash)
+        if blob is None:
+            raise ServiceError(f"Contenido del documento {doc.id} no encontrado ({doc.content_hash[:12]}).")
+        backend = BACKENDS[blob.backend or "db"]
+        if blob.compression != "zlib":
+            yield from backend.iter_stored(session, blob, start, blob.size if end is None else end)
+            return
+
+        # Compressed: inflate from the beginning, emit only the requested window
+        end = blob.size if end is None else end
+        pos = 0
+        decompressor = zlib.decompressobj()
+        for chunk in backend.iter_stored(session, blob):
+            out = decompressor.decompress(chunk, CHUNK_SIZE)
+            while out:
+                if pos + len(out) > start:
+                    yield out[max(0, start - pos):end - pos]
+                pos += len(out)
+                if pos >= end:
+                    return
+                out = decompressor.decompress(decompressor.unconsumed_tail, CHUNK_SIZE) if decompressor.unconsumed_tail else b""
+        tail = decompressor.flush()
+        if tail and pos < end and pos + len(tail) > start:
+            yield tail[max(0, start - pos):end - pos]
+
+    @classmethod
+    def iter_content(cls, session: Session, doc: Documento) -> Iterator[bytes]:
+        """Original bytes of a document, chunk by chunk."""
+        yield from cls.iter_range(session, doc)
+
+    @classmethod
+    def read(cls, session: Session, doc_id: int) -> tuple[Optional[bytes], Optional[str], Optional[str]]:
+        """(bytes, filename, mime_type) or (None, None, None)."""
+        doc = session.get(Documento, doc_id)
+        if not doc:
+            return None, None, None
+        return b"".join(cls.iter_content(session, doc)), doc.filename, doc.mime_type
+
+    # --- References ---
+
+    @staticmethod
+    def is_referenced(session: Session, doc_id: int) -> bool:
+        in_vencimientos = session.query(func.count(Vencimiento.id)).filter(
+            or_(Vencimiento.documento_id == doc_id, Vencimiento.comprobante_pago_id == doc_id)
+        ).scalar()
+        in_pagos = session.query(func.count(Pago.id)).filter(Pago.documento_id == doc_id).scalar()
+        return bool(in_vencimientos or in_pagos)
+
+    @classmethod
+    def release(cls, session: Session, doc_id: int) -> bool:
+        """
+        Deletes the document if no vencimiento / pago points at it anymore (call after the
+        referencing rows were updated and flushed). Returns True if it was removed.
+        """
+        if not doc_id:
+            return False
+        session.flush()
+        doc = session.get(Documento, doc_id)
+        if doc is None or cls.is_referenced(session, doc_id):
+            return False
+
+        sha256 = doc.content_hash
+        session.delete(doc)
+        if sha256:
+            blob = session.get(DocumentoBlob, sha256)
+            if blob is not None:
+                blob.ref_count = (blob.ref_count or 0) - 1
+                if blob.ref_count <= 0:
+                    session.delete(blob)
+                    if blob.backend != "db":
+                        # Only drop the file once the deletion is committed
+                        session.info.setdefault("document_payloads_removed", []).append((blob.backend, sha256))
+        return True
+
+
+# --- Session hooks ---
+
+@event.listens_for(Session, "after_commit")
+def _remove_payloads_on_commit(session):
+    for backend, sha256 in session.info.pop("document_payloads_removed", []):
+        try:
+            BACKENDS[backend].remove(sha256)
+        except Exception as e:
+            app_logger.error(f"DocumentStore: could not remove payload {sha256[:12]}: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _keep_payloads_on_rollback(session):
+    session.info.pop("document_payloads_removed", None)
@@ -1,125 +1,331 @@
-import csv
+import threading
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, date
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from models.entities import Cotizacion, Moneda
 from utils.decorators import safe_transaction
 from utils.logger import app_logger
-from utils.format_helper import parse_fuzzy_date, parse_localized_float
+from utils.format_helper import parse_fuzzy_date_series, parse_localized_float_series
+from repositories.cotizacion_repository import CotizacionRepository
+from services.currency_service import DailyRateCalendar
+from services.indicator_service import IndicatorService
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_MAX_ORDINAL = date.max.toordinal()
+_CURRENCY_CODES = {Moneda.ARS: 0, Moneda.USD: 1, Moneda.ARS.value: 0, Moneda.USD.value: 1}
+
+
+def _to_ordinals(values) -> np.ndarray:
+    """Dates (list of date/datetime or datetime64 array) -> int64 proleptic ordinals."""
+    if hasattr(values, "dtype") and np.issubdtype(values.dtype, np.datetime64):
+        return np.asarray(values, dtype="datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+    # None -> far future, i.e. "latest rate"
+    return np.fromiter(
+        (v.toordinal() if v is not None else _MAX_ORDINAL for v in values),
+        dtype=np.int64, count=len(values)
+    )
+
+
+class RateIndex:
+    """
+    Process-wide, in-memory index of selling rates (venta) per Moneda.
+    Each currency keeps two parallel NumPy arrays sorted by date ordinal, so
+    "latest rate on or before X" is a searchsorted instead of a query,
+    for one date or for a whole array of them.
+    Loaded lazily on first use and dropped whenever cotizaciones change.
+    """
+    _lock = threading.Lock()
+    _series = None  # {Moneda: (date ordinals int64, rates float64)}
+    _bind = None    # Engine the series was loaded from (reconnects reload it)
+
+    @classmethod
+    def _load(cls, session: Session) -> dict:
+        rows = session.query(Cotizacion.moneda, Cotizacion.fecha, Cotizacion.venta)\
+            .filter(Cotizacion.venta.isnot(None))\
+            .order_by(Cotizacion.moneda, Cotizacion.fecha).all()
+
+        grouped = {}
+        for moneda, fecha, venta in rows:
+            dates, rates = grouped.setdefault(moneda, ([], []))
+            dates.append(fecha.toordinal())
+            rates.append(float(venta))
+
+        series = {
+            moneda: (np.array(dates, dtype=np.int64), np.array(rates, dtype=np.float64))
+            for moneda, (dates, rates) in grouped.items()
+        }
+        app_logger.debug(f"RateIndex loaded: {len(rows)} cotizaciones.")
+        return series
+
+    @classmethod
+    def series(cls, session: Session) -> dict:
+        """Returns {Moneda: (dates, rates)}, loading it if needed."""
+        bind = session.get_bind()
+        series = cls._series
+        if series is None or cls._bind is not bind:
+            with cls._lock:
+                if cls._series is None or cls._bind is not bind:
+                    cls._series = cls._load(session)
+                    cls._bind = bind
+                series = cls._series
+        return series
+
+    @classmethod
+    def lookup(cls, moneda: Moneda, target_date: date, session: Session):
+        """
+        Latest rate on or before target_date.
+        Falls back to the latest known rate (future dates / before history).
+        Returns None if there are no quotes for the currency.
+        """
+        dates, rates = cls.series(session).get(moneda, (None, None))
+        if rates is None:
+            return None
+        target = target_date.toordinal() if target_date is not None else _MAX_ORDINAL
+        pos = int(np.searchsorted(dates, target, side="right"))
+        return float(rates[pos - 1] if pos else rates[-1])
+
+    @classmethod
+    def lookup_many(cls, moneda: Moneda, target_dates, session: Session):
+        """
+        Vectorized lookup(): one rate per date, same fallbacks.
+        Returns None if there are no quotes for the currency.
+        """
+        dates, rates = cls.series(session).get(moneda, (None, None))
+        if rates is None:
+            return None
+        pos = np.searchsorted(dates, _to_ordinals(target_dates), side="right")
+        # pos == 0 means "before history": use the latest rate, as lookup() does.
+        return np.where(pos > 0, rates[pos - 1], rates[-1])
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._series = None
+
+    @staticmethod
+    def mark_dirty(session: Session, moneda: Moneda = None, since: date = None):
+        """
+        Flags the session so rate caches are refreshed once it commits.
+        moneda/since narrow the daily calendar rebuild (None = everything).
+        """
+        changes = session.info.setdefault("rate_changes", {})
+        if moneda is None:
+            for m in Moneda:
+                changes[m] = None
+        elif moneda not in changes:
+            changes[moneda] = since
+        elif changes[moneda] is not None:
+            changes[moneda] = None if since is None else min(changes[moneda], since)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_rate_index_on_commit(session):
+    changes = session.info.pop("rate_changes", None)
+    if changes:
+        RateIndex.invalidate()
+        DailyRateCalendar.mark_stale(changes)
+        IndicatorService.mark_stale(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_rate_index_flag_on_rollback(session):
+    session.info.pop("rate_changes", None)
+
 
 class ForexService:
 
+    IMPORT_CHUNK_ROWS = 5000
+
+    def _upsert_chunk(self, dates, ventas, moneda_enum, session) -> tuple:
+        """
+        Writes one parsed chunk: invalid dates dropped, de-duplicated on fecha
+        (last row wins), one bulk upsert. Returns (rows_written, earliest_date).
+        """
+        frame = pd.DataFrame({"fecha": dates, "venta": ventas})
+        frame = frame[frame["fecha"].notna()]
+        if frame.empty:
+            return 0, None
+        frame = frame.drop_duplicates(subset=["fecha"], keep="last")
+        frame["fecha"] = frame["fecha"].dt.date
+        frame["moneda"] = moneda_enum
+
+        CotizacionRepository(session, Cotizacion).bulk_upsert(
+            frame.to_dict("records"), update_compra=False
+        )
+        return len(frame), frame["fecha"].min()
+
+    def _write_chunk(self, dates, ventas, moneda_enum, session) -> tuple:
+        """
+        _upsert_chunk inside a SAVEPOINT: a failing chunk is rolled back on its own
+        and the caller's transaction stays usable (PostgreSQL aborts it otherwise).
+        """
+        with session.begin_nested():
+            return self._upsert_chunk(dates, ventas, moneda_enum, session)
+
+    def _write_rows(self, dates, ventas, moneda_enum, session, errors) -> tuple:
+        """Fallback for a failed chunk: one savepoint per row, so errors name the offending row."""
+        written, earliest = 0, None
+        for pos, index in enumerate(dates.index.tolist()):
+            try:
+                count, first = self._write_chunk(dates.values[pos:pos + 1], ventas.values[pos:pos + 1], moneda_enum, session)
+            except Exception as row_e:
+                errors.append(f"Row {index}: {str(row_e)}")
+                continue
+            written += count
+            if first is not None:
+                earliest = min(earliest or first, first)
+        return written, earliest
+
     @safe_transaction
-    def import_from_dataframe(self, df, mapping_dict, session=None):
+    def import_from_dataframe(self, df, mapping_dict, progress_callback=None, session=None):
         """
         Imports data from a DataFrame based on mapping.
+        Works in chunks of IMPORT_CHUNK_ROWS: columns are parsed vectorized and each
+        chunk is written with one bulk upsert (its own savepoint; a chunk that fails
+        is retried row by row). Rows with an unparseable venta are skipped and reported.
+        progress_callback(done_rows, total_rows).
         Returns: (success_count, list_of_errors)
         """
         success_count = 0
         errors = []
-        # from sqlalchemy.dialects.sqlite import insert as sqlite_insert
-        from models.entities import Cotizacion, Moneda
-        # We need to ensure we have access to these. Assuming imports at file top or local.
-        # But wait, imports are stripped in the view tool. 
-        # I must ensure they are available. `Moneda` and `Cotizacion` are in `models.entities`.
-        
-        for index, row in df.iterrows():
+        earliest = None
+
+        col_fecha = mapping_dict.get('fecha')
+        col_venta = mapping_dict.get('venta')
+        currency_str = mapping_dict.get('moneda_fixed', 'USD')
+        try:
+            moneda_enum = Moneda[currency_str]
+        except KeyError:
+            return 0, [f"Moneda desconocida: {currency_str}"]
+        if col_fecha not in df.columns:
+            return 0, [f"Columna de fecha '{col_fecha}' no encontrada."]
+
+        total = len(df)
+        for start in range(0, total, self.IMPORT_CHUNK_ROWS):
+            chunk = df.iloc[start:start + self.IMPORT_CHUNK_ROWS]
+            dates = parse_fuzzy_date_series(chunk[col_fecha])
+            if col_venta in chunk.columns:
+                ventas, bad = parse_localized_float_series(chunk[col_venta], with_invalid=True)
+                bad = (bad & dates.notna()).to_numpy() # Rows without a date are skipped anyway
+                for index, raw in zip(chunk.index[bad].tolist(), chunk[col_venta].to_numpy()[bad].tolist()):
+                    errors.append(f"Fila {index}: Venta inválida '{raw}'")
+                # Don't overwrite an existing rate with 0.0
+                dates, ventas = dates[~bad], ventas[~bad]
+            else:
+                ventas = pd.Series(0.0, index=dates.index)
+
             try:
-                # 1. Parse Date
-                col_fecha = mapping_dict.get('fecha')
-                raw_date = row[col_fecha]
-                date_val = parse_fuzzy_date(raw_date)
-                
-                if not date_val: continue
-
-                # 2. Parse Values
-                col_compra = mapping_dict.get('compra')
-                col_venta = mapping_dict.get('venta')
-                
-                # Use robust helper
-                val_compra = parse_localized_float(row[col_compra]) if col_compra in row else 0.0
-                val_venta = parse_localized_float(row[col_venta]) if col_venta in row else 0.0
-                
-                # 3. Currency
-                currency_str = mapping_dict.get('moneda_fixed', 'USD')
-                moneda_enum = Moneda[currency_str]
-
-                # 4. Upsert (Generic)
-                existing = session.query(Cotizacion).filter_by(fecha=date_val, moneda=moneda_enum).first()
-                if existing:
-                     existing.venta = val_venta
-                else:
-                     new_cot = Cotizacion(fecha=date_val, moneda=moneda_enum, venta=val_venta)
-                     session.add(new_cot)
-                
-                # session.execute(stmt) # Removed
-                success_count += 1
-            except Exception as row_e:
-                 errors.append(f"Row {index}: {str(row_e)}")
+                written, first = self._write_chunk(dates.values, ventas.values, moneda_enum, session)
+            except Exception as chunk_e:
+                app_logger.warning(f"Forex import: chunk at row {start} failed ({chunk_e}), retrying row by row.")
+                written, first = self._write_rows(dates, ventas, moneda_enum, session, errors)
+            success_count += written
+            if first is not None:
+                earliest = min(earliest or first, first)
+            if progress_callback:
+                progress_callback(min(start + len(chunk), total), total)
         
+        if earliest:
+            RateIndex.mark_dirty(session, moneda_enum, earliest)
         return success_count, errors
 
 
     @safe_transaction
-    def import_bna_csv(self, filepath: str, session: Session = None):
+    def import_bna_csv(self, filepath: str, progress_callback=None, session: Session = None):
+        """
+        Streams a BNA CSV (Fecha;Moneda;Compra;Venta, e.g. 15/01/2024;USD;800,50;820,00)
+        in chunks; USD rows only. progress_callback(done_bytes, total_bytes).
+        """
+        import os
         count = 0
+        earliest = None
+        total_bytes = os.path.getsize(filepath)
+
         with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=';')
-            # Expected format: Fecha;Moneda;Compra;Venta
-            # Example: 15/01/2024;USD;800,50;820,00
-            for row in reader:
+            reader = pd.read_csv(
+                f, sep=';', header=None, names=["fecha", "moneda", "compra", "venta"], usecols=range(4),
+                dtype=str, chunksize=self.IMPORT_CHUNK_ROWS, on_bad_lines='skip'
+            )
+            for chunk in reader:
                 try:
-                    if len(row) < 4: continue
-                    date_str, currency_str, buy_str, sell_str = row
-                    
-                    # Parse Date
-                    fecha = parse_fuzzy_date(date_str)
-                    if not fecha: continue
-
-                    # Parse Currency
-                    moneda = Moneda.USD if "USD" in currency_str.upper() else None
-                    if not moneda: continue # Only USD for now
-
+                    # Only USD for now (header / other currencies dropped)
+                    chunk = chunk[chunk["moneda"].fillna("").str.upper().str.contains("USD", regex=False) & chunk["venta"].notna()]
+                    if chunk.empty:
+                        continue
                     # Parse Floats (European format 1.000,00 support)
-                    compra = parse_localized_float(buy_str)
-                    venta = parse_localized_float(sell_str)
-
-                    # Upsert
-                    cot = session.query(Cotizacion).filter_by(fecha=fecha, moneda=moneda).first()
-                    if not cot:
-                        cot = Cotizacion(fecha=fecha, moneda=moneda, venta=venta)
-                        session.add(cot)
-                    else:
-                        # cot.compra = compra
-                        cot.venta = venta
-                    count += 1
+                    ventas, bad = parse_localized_float_series(chunk["venta"], with_invalid=True)
+                    if bad.any():
+                        app_logger.warning(f"BNA import: {int(bad.sum())} rows with an unparseable venta skipped.")
+                    written, first = self._write_chunk(
+                        parse_fuzzy_date_series(chunk["fecha"])[~bad].values,
+                        ventas[~bad].values,
+                        Moneda.USD, session
+                    )
+                    count += written
+                    if first is not None:
+                        earliest = min(earliest or first, first)
                 except Exception as e:
-                    app_logger.error(f"Error importing row {row}: {e}")
+                    app_logger.error(f"Error importing BNA chunk: {e}")
+                finally:
+                    if progress_callback:
+                        progress_callback(min(f.tell(), total_bytes), total_bytes)
+        if count:
+            RateIndex.mark_dirty(session, Moneda.USD, earliest)
         return count
 
     def get_rate(self, target_date: date, session: Session, max_lookback_days: int = 60) -> float:
         """Returns SELL rate (Venta) closest to target_date (past or present)."""
-        # Improved logic: Query Last <= target_date
-        # We search specifically for the most recent quote available on or before the target.
-        cot = session.query(Cotizacion).filter(
-            Cotizacion.fecha <= target_date,
-            Cotizacion.moneda == Moneda.USD
-        ).order_by(Cotizacion.fecha.desc()).first()
-        
-        if cot:
-             return float(cot.venta)
-        
-        # Fallback: Try to find ANY rate? Or return 1.0
-        # If no rate exists in simple past, maybe it's a future date and we have no history?
-        # Try finding the latest available rate overall if the above failed (e.g. target date is way before first load)
-        # But logically for 'conversion' of future debts, we want the LATEST loaded rate.
-        
-        latest = session.query(Cotizacion).filter(Cotizacion.moneda == Moneda.USD).order_by(Cotizacion.fecha.desc()).first()
-        if latest:
-            return float(latest.venta)
+        # Most recent quote on or before the target, served from the in-memory index.
+        # If the target is before the first load (or the future), the LATEST loaded rate is used.
+        rate = RateIndex.lookup(Moneda.USD, target_date, session)
+        if rate is not None:
+            return rate
 
         return 1.0 # True Fallback if table empty
 
+    def get_rates(self, target_dates, session: Session) -> np.ndarray:
+        """Vectorized get_rate(): SELL rate for each date in target_dates."""
+        rates = RateIndex.lookup_many(Moneda.USD, target_dates, session)
+        if rates is None:
+            return np.ones(len(target_dates)) # True Fallback if table empty
+        return rates
+
+    def convert_many(self, amounts, currencies, dates, target, session: Session) -> np.ndarray:
+        """
+        Batch counterpart of convert().
+        amounts / currencies / dates are parallel sequences (currencies may also be
+        a single Moneda or code for all rows). None amounts count as 0.
+        Returns a float ndarray in the target currency.
+        """
+        n = len(amounts)
+        values = np.fromiter((a if a is not None else 0.0 for a in amounts), dtype=np.float64, count=n)
+        if not n:
+            return values
+
+        target_code = _CURRENCY_CODES.get(target, -1)
+        if isinstance(currencies, (Moneda, str)):
+            codes = np.full(n, _CURRENCY_CODES.get(currencies, -1), dtype=np.int8)
+        else:
+            # Unknown currencies (-1) are returned unchanged, as convert() does.
+            codes = np.fromiter((_CURRENCY_CODES.get(c, -1) for c in currencies), dtype=np.int8, count=n)
+
+        usd_to_ars = (codes == 1) & (target_code == 0)
+        ars_to_usd = (codes == 0) & (target_code == 1)
+        if not (usd_to_ars.any() or ars_to_usd.any()):
+            return values
+
+        rates = self.get_rates(dates, session)
+        usable = rates != 0 # Avoid div zero
+        usd_to_ars &= usable
+        ars_to_usd &= usable
+
+        values[usd_to_ars] *= rates[usd_to_ars]
+        values[ars_to_usd] /= rates[ars_to_usd]
+        return values
+
     def convert(self, amount: float, from_curr: Moneda, to_curr: str, rate_date: date, session: Session):
         if from_curr.value == to_curr:
             return amount
@@ -175,6 +381,7 @@ class ForexService:
                     module="Forex", action="CREATE", entity_id=f"{date_obj}|{currency_str}",
                     new_value=f"V:{sell}", details="Creación Manual"
                 )
+        RateIndex.mark_dirty(session, moneda_enum, date_obj)
         return True
 
     @safe_transaction
@@ -189,6 +396,7 @@ class ForexService:
         if row:
             old_val = f"V:{row.venta}"
             session.delete(row)
+            RateIndex.mark_dirty(session, moneda_enum, date_obj)
             if audit_service:
                 audit_service.log(
                     module="Forex", action="DELETE", entity_id=f"{date_obj}|{currency_str}",
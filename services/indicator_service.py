@@ -0,0 +1,196 @@
+import threading
+import numpy as np
+import pandas as pd
+from datetime import date
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.entities import Cotizacion, IndicadorTecnico, Moneda
+from utils.logger import app_logger
+
+COLOR_UP = '#2ECC71'
+COLOR_DOWN = '#E74C3C'
+
+
+def _ema(values: pd.Series, span: int, prev: float = None) -> pd.Series:
+    """EMA (adjust=False) continued from the previous EMA value, if any."""
+    if prev is None:
+        return values.ewm(span=span, adjust=False).mean()
+    # Seeding the recursion with the last EMA yields exactly the continued series
+    seeded = pd.concat([pd.Series([prev]), values], ignore_index=True)
+    return seeded.ewm(span=span, adjust=False).mean().iloc[1:].reset_index(drop=True)
+
+
+class IndicatorService:
+    """
+    Technical indicators (EMA 12/26, SMA 20, MACD, Signal) per currency, persisted in
+    'indicadores_tecnicos' and extended only for dates after the last computed row.
+    Rate edits / imports report the earliest date they touched; the series is
+    recomputed from that date using the state right before it.
+
+    'version' is bumped every time the in-memory series change, so callers can
+    memoize derived results against it.
+    """
+    SMA_WINDOW = 20
+
+    _lock = threading.Lock()
+    _frames = {}       # {currency_str: DataFrame with candles / indicators / signals}
+    _bind = None
+    _verified = set()  # Currencies checked against cotizaciones in this process
+    _stale = {}        # {currency_str: earliest date to recompute from, None = full}
+    version = 0
+
+    # --- Invalidation ---
+
+    @classmethod
+    def mark_stale(cls, changes: dict):
+        """
+        changes: {Moneda or currency_str: earliest changed date (None = full rebuild)}.
+        Called once the writing transaction has committed.
+        """
+        with cls._lock:
+            for moneda, since in changes.items():
+                code = moneda.value if isinstance(moneda, Moneda) else str(moneda)
+                if code in cls._stale:
+                    prev = cls._stale[code]
+                    since = None if prev is None or since is None else min(prev, since)
+                cls._stale[code] = since
+                cls._frames.pop(code, None)
+            cls.version += 1
+
+    # --- Build ---
+
+    @classmethod
+    def extend(cls, session: Session, currency_str: str, since: date = None, full: bool = False) -> int:
+        """
+        Computes indicator rows for quotes newer than the last persisted one.
+        since: drop (and recompute) rows from this date. full: recompute everything.
+        Returns rows written.
+        """
+        moneda = Moneda[currency_str]
+        persisted = session.query(IndicadorTecnico).filter(IndicadorTecnico.moneda == currency_str)
+        if full:
+            persisted.delete(synchronize_session=False)
+        elif since is not None:
+            persisted.filter(IndicadorTecnico.fecha >= since).delete(synchronize_session=False)
+
+        last = persisted.order_by(IndicadorTecnico.fecha.desc()).first() if not full else None
+
+        quotes = session.query(Cotizacion.fecha, Cotizacion.venta).filter(
+            Cotizacion.moneda == moneda,
+            Cotizacion.venta.isnot(None)
+        )
+        new = quotes.filter(Cotizacion.fecha > last.fecha) if last else quotes
+        new = new.order_by(Cotizacion.fecha).all()
+        if not new:
+            return 0
+
+        # SMA needs the previous (window - 1) closes
+        tail = []
+        if last:
+            tail = quotes.filter(Cotizacion.fecha <= last.fecha)\
+                .order_by(Cotizacion.fecha.desc()).limit(cls.SMA_WINDOW - 1).all()
+            tail.reverse()
+
+        venta = pd.Series([float(v) for _, v in new])
+        ema_12 = _ema(venta, 12, last.ema_12 if last else None)
+        ema_26 = _ema(venta, 26, last.ema_26 if last else None)
+        macd = ema_12 - ema_26
+        signal = _ema(macd, 9, last.signal if last else None)
+
+        window = pd.Series([float(v) for _, v in tail] + venta.tolist())
+        sma_20 = window.rolling(window=cls.SMA_WINDOW).mean().iloc[len(tail):].reset_index(drop=True)
+
+        rows = [
+            {
+                "fecha": f, "moneda": currency_str, "venta": v,
+                "ema_12": e12, "ema_26": e26,
+                "sma_20": None if np.isnan(sma) else sma,
+                "macd": m, "signal": s,
+            }
+            for (f, _), v, e12, e26, sma, m, s in zip(
+                new, venta.tolist(), ema_12.tolist(), ema_26.tolist(), sma_20.tolist(), macd.tolist(), signal.tolist()
+            )
+        ]
+        session.execute(insert(IndicadorTecnico), rows)
+        return len(rows)
+
+    @staticmethod
+    def _out_of_sync(session: Session, currency_str: str) -> bool:
+        """Persisted series does not cover 'cotizaciones' (e.g. rates edited by another process)."""
+        source = session.query(func.count(), func.max(Cotizacion.fecha), func.sum(Cotizacion.venta)).filter(
+            Cotizacion.moneda == Moneda[currency_str],
+            Cotizacion.venta.isnot(None)
+        ).one()
+        derived = session.query(func.count(), func.max(IndicadorTecnico.fecha), func.sum(IndicadorTecnico.venta)).filter(
+            IndicadorTecnico.moneda == currency_str
+        ).one()
+        norm = lambda r: (r[0], r[1], round(float(r[2] or 0), 2))
+        return norm(source) != norm(derived)
+
+    @staticmethod
+    def _load(session: Session, currency_str: str) -> pd.DataFrame:
+        rows = session.query(
+            IndicadorTecnico.fecha, IndicadorTecnico.venta,
+            IndicadorTecnico.ema_12, IndicadorTecnico.ema_26, IndicadorTecnico.sma_20,
+            IndicadorTecnico.macd, IndicadorTecnico.signal
+        ).filter(IndicadorTecnico.moneda == currency_str).order_by(IndicadorTecnico.fecha).all()
+
+        df = pd.DataFrame(rows, columns=["fecha", "venta", "EMA_12", "EMA_26", "SMA_20", "MACD", "Signal"])
+        df['fecha'] = pd.to_datetime(df['fecha'])
+        df['SMA_20'] = df['SMA_20'].astype(float)
+
+        # Pseudo-OHLC: Open = previous close (first candle flat)
+        df['prev_close'] = df['venta'].shift(1).fillna(df['venta'])
+        df['Open'] = df['prev_close']
+        df['Close'] = df['venta']
+        df['High'] = np.maximum(df['Open'], df['Close'])
+        df['Low'] = np.minimum(df['Open'], df['Close'])
+        df['color'] = np.where(df['Close'] >= df['Open'], COLOR_UP, COLOR_DOWN)
+
+        df['Hist'] = df['MACD'] - df['Signal']
+
+        # Crossovers
+        df['prev_MACD'] = df['MACD'].shift(1)
+        df['prev_Signal'] = df['Signal'].shift(1)
+        buy = (df['prev_MACD'] < df['prev_Signal']) & (df['MACD'] > df['Signal'])
+        sell = (df['prev_MACD'] > df['prev_Signal']) & (df['MACD'] < df['Signal'])
+        df['Trade_Signal'] = pd.Series(None, index=df.index, dtype=object)
+        df.loc[buy, 'Trade_Signal'] = "BUY"
+        df.loc[sell, 'Trade_Signal'] = "SELL"
+        return df
+
+    @classmethod
+    def get_series(cls, currency_str: str = Moneda.USD.value) -> pd.DataFrame:
+        """
+        Full indicator series for a currency (shared, do not mutate).
+        Uses its own session: extensions are committed on their own.
+        """
+        session = SessionLocal()
+        try:
+            bind = session.get_bind()
+            with cls._lock:
+                if cls._bind is not bind:
+                    cls._frames.clear()
+                    cls._verified.clear()
+                    cls._bind = bind
+                    cls.version += 1
+                df = cls._frames.get(currency_str)
+                stale = currency_str in cls._stale
+                since = cls._stale.pop(currency_str, None)
+            if df is not None and not stale:
+                return df
+
+            full = currency_str not in cls._verified and cls._out_of_sync(session, currency_str)
+            count = cls.extend(session, currency_str, since=since, full=full or (stale and since is None))
+            session.commit()
+            if count:
+                app_logger.info(f"IndicatorService: {currency_str} extended by {count} rows (from {since or ('start' if full else 'last row')}).")
+
+            df = cls._load(session, currency_str)
+            with cls._lock:
+                cls._frames[currency_str] = df
+                cls._verified.add(currency_str)
+            return df
+        finally:
+            session.close()
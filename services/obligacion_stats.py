@@ -0,0 +1,194 @@
+import threading
+from dataclasses import dataclass
+from statistics import mean
+from typing import Optional
+from sqlalchemy import event, func
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session
+from models.entities import Vencimiento, EstadoVencimiento
+from utils.logger import app_logger
+
+# Vencimiento attributes feeding the per-obligation stats
+_STATS_ATTRS = ("estado", "monto_original", "fecha_vencimiento", "is_deleted", "obligacion_id", "obligacion")
+
+
+@dataclass
+class ObligacionStat:
+    """Snapshot for one obligation (active vencimientos only)."""
+    paid_amounts: tuple = ()          # Last N PAGADO amounts, newest first
+    mean: Optional[float] = None
+
+
+class ObligacionStats:
+    """
+    In-memory 'obligacion_stats': last N paid amounts and their mean per
+    obligation (anomaly checks while typing).
+
+    Loaded once (one windowed query) and refreshed per obligation when a commit
+    touches its vencimientos: the touched obligations are re-read right before the
+    commit and swapped in after it, so lookups never hit the database.
+    Bulk UPDATE/DELETE statements on vencimientos drop the cache (full reload on next use).
+    """
+    HISTORY_SIZE = 6
+
+    _lock = threading.Lock()
+    _stats = {}           # {obligacion_id: ObligacionStat}
+    _loaded = False
+    _bind = None
+    _epoch = 0            # Bumped on every applied refresh / invalidation
+
+    # --- Queries ---
+
+    @classmethod
+    def _query(cls, session: Session, obligacion_ids=None) -> dict:
+        """{obligacion_id: ObligacionStat} for the given obligations (None = all)."""
+        rn = func.row_number().over(
+            partition_by=Vencimiento.obligacion_id,
+            order_by=(Vencimiento.fecha_vencimiento.desc(), Vencimiento.id.desc())
+        ).label('rn')
+        ranked = session.query(
+            Vencimiento.obligacion_id.label('obligacion_id'),
+            Vencimiento.monto_original.label('monto'),
+            rn
+        ).filter(Vencimiento.estado == EstadoVencimiento.PAGADO, Vencimiento.is_deleted == 0)
+
+        if obligacion_ids is not None:
+            ranked = ranked.filter(Vencimiento.obligacion_id.in_(list(obligacion_ids)))
+
+        stats = {oid: ObligacionStat() for oid in (obligacion_ids or ())}
+        ranked = ranked.subquery()
+        paid = {}
+        for oid, monto in session.query(ranked.c.obligacion_id, ranked.c.monto).\
+                filter(ranked.c.rn <= cls.HISTORY_SIZE).\
+                order_by(ranked.c.obligacion_id, ranked.c.rn).all():
+            paid.setdefault(oid, []).append(float(monto or 0))
+
+        for oid, amounts in paid.items():
+            stat = stats.setdefault(oid, ObligacionStat())
+            stat.paid_amounts = tuple(amounts)
+            stat.mean = mean(amounts)
+        return stats
+
+    # --- Cache lifecycle ---
+
+    @classmethod
+    def _ensure_loaded(cls, session: Session):
+        bind = session.get_bind()
+        with cls._lock:
+            if cls._loaded and cls._bind is bind:
+                return
+            epoch = cls._epoch
+
+        stats = cls._query(session)
+
+        with cls._lock:
+            # A commit landed while loading: serve this result, reload next time
+            cls._stats = stats
+            cls._bind = bind
+            cls._loaded = cls._epoch == epoch
+        app_logger.info(f"ObligacionStats: loaded {len(stats)} obligations.")
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._loaded = False
+            cls._epoch += 1
+
+    @classmethod
+    def apply(cls, refreshed: dict):
+        """Swaps in re-read stats for some obligations."""
+        with cls._lock:
+            cls._epoch += 1
+            if not cls._loaded:
+                return
+            for oid, stat in refreshed.items():
+                if stat.paid_amounts:
+                    cls._stats[oid] = stat
+                else:
+                    cls._stats.pop(oid, None)
+
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._loaded
+
+    # --- Lookups ---
+
+    @classmethod
+    def get(cls, session: Session, obligacion_id: int) -> ObligacionStat:
+        cls._ensure_loaded(session)
+        return cls._stats.get(obligacion_id) or ObligacionStat()
+
+
+# --- Session hooks ---
+
+def _previous_obligaciones(session: Session) -> set:
+    """Obligation ids (pre-flush values) of deleted / edited vencimientos whose stats inputs change."""
+    ids = {obj.obligacion_id for obj in session.deleted if isinstance(obj, Vencimiento)}
+    for obj in session.dirty:
+        if not isinstance(obj, Vencimiento):
+            continue
+        state = sa_inspect(obj)
+        if not any(state.attrs[a].history.has_changes() for a in _STATS_ATTRS):
+            continue
+        # Moved to another obligation: the old one changes too
+        ids.update(state.attrs.obligacion_id.history.deleted or ())
+        ids.update(o.id for o in (state.attrs.obligacion.history.deleted or ()) if o is not None)
+        ids.add(obj.obligacion_id)
+    return ids
+
+
+@event.listens_for(Session, "before_flush")
+def _stats_before_flush(session, flush_context, instances):
+    if not ObligacionStats.is_loaded():
+        return
+    ids = _previous_obligaciones(session)
+    if ids:
+        session.info.setdefault("stats_touched", set()).update(ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _stats_after_flush(session, flush_context):
+    if not ObligacionStats.is_loaded():
+        return
+    # new / dirty still list the flushed objects; FKs are populated now
+    ids = {obj.obligacion_id for obj in list(session.new) + list(session.dirty) if isinstance(obj, Vencimiento)}
+    ids.discard(None)
+    if ids:
+        session.info.setdefault("stats_touched", set()).update(ids)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _stats_bulk_statement(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) == Vencimiento.__tablename__:
+        orm_execute_state.session.info["stats_reload"] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _stats_before_commit(session):
+    if session.info.get("stats_reload") or not ObligacionStats.is_loaded():
+        return
+    session.flush()  # commit() flushes after this hook; pending rows must be counted now
+    ids = session.info.get("stats_touched")
+    if ids:
+        # Re-read inside the transaction (sees its own writes); applied once committed
+        session.info["stats_refreshed"] = ObligacionStats._query(session, ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _stats_after_commit(session):
+    session.info.pop("stats_touched", None)
+    refreshed = session.info.pop("stats_refreshed", None)
+    if session.info.pop("stats_reload", False):
+        ObligacionStats.invalidate()
+    elif refreshed:
+        ObligacionStats.apply(refreshed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _stats_clear_on_rollback(session):
+    session.info.pop("stats_touched", None)
+    session.info.pop("stats_refreshed", None)
+    session.info.pop("stats_reload", None)
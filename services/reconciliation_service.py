@@ -1,71 +1,306 @@
+from bisect import bisect_left
+
+# Amounts closer than this are the same payment (abs(a - b) < AMOUNT_TOLERANCE)
+AMOUNT_TOLERANCE = 0.05
+_BUCKET_SPAN = 5 # Neighbouring cent buckets that can hold an amount within the tolerance
+
+# Optimal mode: blocks whose assignment would cost more than this are matched greedily.
+# n = smaller side, m = larger side: the solver takes O(n^2 m) steps (300 x 300 x 300 is
+# ~1 s in pure Python) over a dense n x m cost matrix.
+MAX_ASSIGNMENT_WORK = 300 ** 3
+MAX_ASSIGNMENT_CELLS = 1_000_000
+
+
+def min_cost_assignment(cost) -> list:
+    """
+    Hungarian algorithm (potentials, O(n^2 m)) for an n x m cost matrix with n <= m.
+    Returns, for every row, the column assigned to it (all rows get a distinct column).
+    """
+    n, m = len(cost), len(cost[0]) if cost else 0
+    INF = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1) # column -> row (1-based, 0 = free)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = [INF] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            row = cost[i0 - 1]
+            delta, j1 = INF, 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+
+    result = [0] * n
+    for j in range(1, m + 1):
+        if owner[j]:
+            result[owner[j] - 1] = j - 1
+    return result
+
+
+def match_status(days_diff: int) -> str:
+    """
+    0 days = Perfect
+    <= 5 days = Date Slip
+    > 5 days = Remote Match (but amount is exact, so likely valid)
+    """
+    if days_diff == 0: return "MATCH"
+    elif days_diff <= 5: return "DIFERENCIA_FECHA"
+    return "MATCH_LEJANO"
+
+
+class PaymentMatcher:
+    """
+    Pool of unmatched system payments indexed for 'same amount, nearest date' lookups.
+
+    Payments are bucketed by amount in cents; each bucket keeps (date ordinal, pool order)
+    sorted, so a lookup bisects the few buckets within the tolerance instead of scanning
+    the pool. Ties resolve like the linear scan did: nearest date, then pool order.
+    Matched payments are removed, so each one is used at most once.
+    """
+
+    def __init__(self, items, amount=lambda x: x['amount'], date=lambda x: x['date']):
+        self.items = list(items)
+        self._amounts = [float(amount(x) or 0.0) for x in self.items]
+        self._ordinals = [date(x).toordinal() for x in self.items]
+        self._buckets = {} # cents -> sorted [(date ordinal, pool index)]
+        for idx in range(len(self.items)):
+            key = (self._ordinals[idx], idx)
+            self._buckets.setdefault(self._cents(self._amounts[idx]), []).append(key)
+        for keys in self._buckets.values():
+            keys.sort()
+
+    def __len__(self):
+        return sum(len(keys) for keys in self._buckets.values())
+
+    @staticmethod
+    def _cents(value: float) -> int:
+        return int(round(value * 100))
+
+    def _nearest(self, keys, ordinal, target):
+        """
+        Best (days, pool index, position) in one bucket: walks outwards from 'ordinal' in date
+        order. Buckets at the edge of the tolerance also hold amounts that don't match, so
+        every entry is still checked against the exact amount.
+        """
+        best = None
+        hi = bisect_left(keys, (ordinal, -1)) # First entry on/after the date
+        lo = hi - 1
+        while lo >= 0 or hi < len(keys):
+            d_lo = ordinal - keys[lo][0] if lo >= 0 else None
+            d_hi = keys[hi][0] - ordinal if hi < len(keys) else None
+            if d_hi is None or (d_lo is not None and d_lo <= d_hi):
+                days, pos = d_lo, lo
+                lo -= 1
+            else:
+                days, pos = d_hi, hi
+                hi += 1
+            if best is not None and days > best[0]:
+                break
+            idx = keys[pos][1]
+            if abs(self._amounts[idx] - target) < AMOUNT_TOLERANCE and (best is None or (days, idx) < best[:2]):
+                best = (days, idx, pos)
+        return best
+
+    def take(self, amount: float, date):
+        """
+        Removes and returns (item, days_diff) for the unmatched payment of this amount
+        (within AMOUNT_TOLERANCE) with the nearest date; None if there is none.
+        """
+        target = abs(float(amount))
+        ordinal = date.toordinal()
+        center = self._cents(target)
+        best = None # (days, pool index, position, bucket)
+        for cents in range(center - _BUCKET_SPAN, center + _BUCKET_SPAN + 1):
+            keys = self._buckets.get(cents)
+            if not keys:
+                continue
+            cand = self._nearest(keys, ordinal, target)
+            if cand is not None and (best is None or cand[:2] < best[:2]):
+                best = cand + (cents,)
+        if best is None:
+            return None
+
+        days, idx, pos, cents = best
+        del self._buckets[cents][pos]
+        return self.items[idx], days
+
+    def _candidates(self, amount: float):
+        """Pool indexes of the unmatched payments within tolerance of 'amount'."""
+        target = abs(float(amount))
+        center = self._cents(target)
+        return [
+            idx
+            for cents in range(center - _BUCKET_SPAN, center + _BUCKET_SPAN + 1)
+            for _, idx in self._buckets.get(cents, ())
+            if abs(self._amounts[idx] - target) < AMOUNT_TOLERANCE
+        ]
+
+    def _remove(self, idx):
+        keys = self._buckets[self._cents(self._amounts[idx])]
+        del keys[bisect_left(keys, (self._ordinals[idx], idx))]
+
+    def assign(self, requests) -> list:
+        """
+        Globally optimal alternative to calling take() for each request in order.
+        requests: [(amount, date)]. Returns [(item, days_diff) or None] per request.
+
+        Requests and payments linked by a compatible amount form independent blocks;
+        each block is solved as a minimum-cost assignment (cost = date distance) that
+        first maximizes how many requests get a payment. An early row therefore can't
+        take the payment a later row matches exactly. Blocks above MAX_ASSIGNMENT_WORK /
+        MAX_ASSIGNMENT_CELLS (e.g. many zero-amount lines against every pago without a
+        vencimiento) fall back to take() in request order.
+        """
+        results = [None] * len(requests)
+        ordinals = [d.toordinal() for _, d in requests]
+
+        # Blocks = connected components of the request <-> payment compatibility graph.
+        # Inner cent buckets hold only compatible payments: they join as one node, so a
+        # block's size is known before listing its edges (one amount may have thousands of pagos).
+        parent = {}
+
+        def find(node):
+            while parent.setdefault(node, node) != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        def union(a, b):
+            parent[find(a)] = find(b)
+
+        linked, bucket_nodes, edge_payments = [], set(), set()
+        for r, (amount, _) in enumerate(requests):
+            target = abs(float(amount))
+            center = self._cents(target)
+            found = False
+            for cents in range(center - _BUCKET_SPAN, center + _BUCKET_SPAN + 1):
+                keys = self._buckets.get(cents)
+                if not keys:
+                    continue
+                if abs(cents - center) < _BUCKET_SPAN - 1:
+                    union(("r", r), ("b", cents))
+                    bucket_nodes.add(cents)
+                    found = True
+                    continue
+                for _, idx in keys:
+                    if abs(self._amounts[idx] - target) < AMOUNT_TOLERANCE:
+                        union(("r", r), ("p", idx))
+                        edge_payments.add(idx)
+                        found = True
+            if found:
+                linked.append(r)
+        for idx in edge_payments:
+            if self._cents(self._amounts[idx]) in bucket_nodes:
+                union(("p", idx), ("b", self._cents(self._amounts[idx])))
+
+        blocks = {} # root -> (rows, buckets, payments outside those buckets)
+        for r in linked:
+            blocks.setdefault(find(("r", r)), ([], set(), set()))[0].append(r)
+        for cents in bucket_nodes:
+            blocks[find(("b", cents))][1].add(cents)
+        for idx in edge_payments:
+            if self._cents(self._amounts[idx]) not in bucket_nodes:
+                blocks[find(("p", idx))][2].add(idx)
+
+        for rows, buckets, loose in blocks.values():
+            n, m = sorted((len(rows), sum(len(self._buckets[c]) for c in buckets) + len(loose)))
+            if n * n * m > MAX_ASSIGNMENT_WORK or n * m > MAX_ASSIGNMENT_CELLS:
+                for r in rows:
+                    results[r] = self.take(*requests[r])
+                continue
+
+            edges = {r: self._candidates(requests[r][0]) for r in rows}
+            cols = sorted({idx for r in rows for idx in edges[r]})
+
+            # Rows = the smaller side; incompatible pairs cost more than any complete assignment
+            col_pos = {idx: k for k, idx in enumerate(cols)}
+            span = max(abs(self._ordinals[idx] - ordinals[r]) for r in rows for idx in edges[r])
+            big = (span + 1) * (min(len(rows), len(cols)) + 1)
+            days = [[big] * len(cols) for _ in rows]
+            for i, r in enumerate(rows):
+                for idx in edges[r]:
+                    days[i][col_pos[idx]] = abs(self._ordinals[idx] - ordinals[r])
+
+            if len(rows) <= len(cols):
+                pairs = [(i, j) for i, j in enumerate(min_cost_assignment(days))]
+            else:
+                transposed = [list(col) for col in zip(*days)]
+                pairs = [(i, j) for j, i in enumerate(min_cost_assignment(transposed))]
+
+            for i, j in pairs:
+                if days[i][j] < big:
+                    idx = cols[j]
+                    self._remove(idx)
+                    results[rows[i]] = (self.items[idx], days[i][j])
+        return results
 
-from datetime import timedelta
 
 class ReconciliationService:
     """
     Pure Business Logic for reconciling Bank Transactions against System Records.
     """
 
-    def match_transactions(self, bank_transactions, system_transactions):
+    def match_transactions(self, bank_transactions, system_transactions, optimal=False):
         """
         bank_transactions: List of dicts {date, description, amount, ...}
-        system_transactions: List of dicts {id, date, amount, obj, matched}
-        
+        system_transactions: List of dicts {id, date, amount, description, obj}
+        optimal: min-cost assignment per amount block instead of greedy file order (PaymentMatcher.assign)
+
         Returns: List of enriched bank_transaction dicts (with 'status', 'match_data')
         """
-        
+
         results = []
-        
-        # Prepare System Pool (ensure 'matched' flag is tracked via ID or object reference)
-        # We'll use a local ID map to track consumed system payments in this session
-        matched_ids = set()
-        
-        for bank_row in bank_transactions:
-            
+
+        # Unmatched system payments, indexed by amount / date (see PaymentMatcher)
+        pool = PaymentMatcher(system_transactions)
+        assigned = pool.assign([(b['amount'], b['date']) for b in bank_transactions]) if optimal else None
+
+        for pos, bank_row in enumerate(bank_transactions):
+
             bank_date = bank_row['date']
-            target_amt = abs(bank_row['amount'])
-            
+
             # Defaults
             status = "NO_EN_SISTEMA"
             match_data = None
             display_desc = bank_row['description']
-            
+
             # --- MATCHING LOGIC ---
-            
-            # 1. Find Candidates by Amount (Unmatched only)
-            candidates = []
-            for sys_row in system_transactions:
-                if sys_row['id'] in matched_ids: continue
-                
-                # Check Amount Match (Tolerance 0.05)
-                if abs(sys_row['amount'] - target_amt) < 0.05:
-                    candidates.append(sys_row)
-            
-            if candidates:
-                # 2. Find Closest Date
-                best_match = min(candidates, key=lambda x: abs((x['date'] - bank_date).days))
-                
-                # Determine quality of match
-                days_diff = abs((best_match['date'] - bank_date).days)
-                
-                # Thresholds:
-                # 0 days = Perfect
-                # < 5 days = Date Slip
-                # > 5 days = Remote Match (but amount is exact, so likely valid)
-                
-                matched_ids.add(best_match['id']) # Mark as used
-                match_data = best_match
-                
-                if days_diff == 0: status = "MATCH"
-                elif days_diff <= 5: status = "DIFERENCIA_FECHA"
-                else: status = "MATCH_LEJANO"
-                
+            # Same amount (tolerance 0.05), closest date
+            found = assigned[pos] if optimal else pool.take(bank_row['amount'], bank_date)
+            if found:
+                match_data, days_diff = found
+                status = match_status(days_diff)
+
                 # Enrich Description with System Data
-                if best_match['obj'].vencimiento:
-                    sys_desc = best_match['obj'].vencimiento.descripcion
-                    sys_date_str = best_match['date'].strftime('%d/%m')
+                sys_desc = match_data.get('description')
+                if sys_desc:
+                    sys_date_str = match_data['date'].strftime('%d/%m')
                     display_desc = f"✅ {sys_desc} ({sys_date_str})"
-            
+
             # Build Result Row
             results.append({
                 "fecha": bank_date,
@@ -77,7 +312,7 @@ class ReconciliationService:
                 "moneda": "ARS", # Simplification
                 "original_row": bank_row,
                 "id": match_data['id'] if match_data else None,
-                "sys_obj": match_data['obj'] if match_data else None
+                "sys_obj": match_data.get('obj') if match_data else None
             })
-            
+
         return results
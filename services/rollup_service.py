@@ -0,0 +1,211 @@
+from sqlalchemy import event, select, insert, delete, func, or_, literal, cast, String
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from models.entities import Vencimiento, Obligacion, ResumenMensual
+from utils.logger import app_logger
+
+# Vencimiento attributes that move a row between rollup buckets (or change its amount)
+_ROLLUP_ATTRS = ("periodo", "moneda", "estado", "monto_original", "is_deleted", "obligacion_id", "obligacion")
+_OBLIGACION_ATTRS = ("inmueble_id", "servicio_id")
+
+_KEY_COLUMNS = ("periodo", "moneda", "estado", "inmueble_id", "proveedor_id")
+
+
+def _name(value) -> str:
+    """Enum / None -> plain string key ('' if missing)."""
+    if value is None:
+        return ""
+    return value.name if hasattr(value, "name") else str(value)
+
+
+class ResumenMensualService:
+    """
+    Keeps 'resumen_mensual' in step with 'vencimientos'.
+
+    Row-level writes (insert, edit, soft-delete, payment status changes, deletes)
+    are turned into +/- deltas inside the same transaction: the old contribution
+    of each touched row is read before the flush, the new one after it.
+    Bulk UPDATE/DELETE statements on vencimientos/obligaciones can't be diffed
+    that way, so they trigger a full rebuild before the commit instead.
+    """
+
+    # --- Contributions ---
+
+    @staticmethod
+    def _contributions(conn: Connection, venc_ids=(), obligacion_ids=()) -> list:
+        """[(key, monto)] for the active vencimientos matching the given ids."""
+        conds = []
+        if venc_ids:
+            conds.append(Vencimiento.id.in_(list(venc_ids)))
+        if obligacion_ids:
+            conds.append(Vencimiento.obligacion_id.in_(list(obligacion_ids)))
+        if not conds:
+            return []
+
+        rows = conn.execute(
+            select(
+                Vencimiento.periodo, Vencimiento.moneda, Vencimiento.estado,
+                Obligacion.inmueble_id, Obligacion.servicio_id, Vencimiento.monto_original
+            ).select_from(Vencimiento).outerjoin(Obligacion, Vencimiento.obligacion_id == Obligacion.id)
+            .where(or_(*conds), Vencimiento.is_deleted == 0)
+        ).all()
+        return [
+            ((periodo or "", _name(moneda), _name(estado), inmueble_id or 0, servicio_id or 0), float(monto or 0))
+            for periodo, moneda, estado, inmueble_id, servicio_id, monto in rows
+        ]
+
+    @staticmethod
+    def apply_deltas(conn: Connection, deltas: dict):
+        """deltas: {key: [total, cantidad]} added to the rollup (upsert), empty buckets removed."""
+        rows = [
+            dict(zip(_KEY_COLUMNS, key), total=total, cantidad=cantidad)
+            for key, (total, cantidad) in deltas.items() if cantidad or abs(total) > 1e-9
+        ]
+        if not rows:
+            return
+
+        dialect = conn.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            dialect_insert = None
+
+        table = ResumenMensual.__table__
+        if dialect_insert is not None:
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(_KEY_COLUMNS),
+                set_={"total": table.c.total + stmt.excluded.total, "cantidad": table.c.cantidad + stmt.excluded.cantidad}
+            )
+            conn.execute(stmt, rows)
+        else:
+            for row in rows:
+                key_cond = [table.c[k] == row[k] for k in _KEY_COLUMNS]
+                updated = conn.execute(
+                    table.update().where(*key_cond).values(
+                        total=table.c.total + row["total"], cantidad=table.c.cantidad + row["cantidad"]
+                    )
+                ).rowcount
+                if not updated:
+                    conn.execute(insert(table), [row])
+
+        conn.execute(delete(table).where(table.c.cantidad <= 0))
+
+    # --- Full rebuild ---
+
+    @staticmethod
+    def rebuild(conn: Connection) -> int:
+        """Recomputes the whole rollup from 'vencimientos' (server-side INSERT ... SELECT)."""
+        table = ResumenMensual.__table__
+        conn.execute(delete(table))
+
+        # Same normalization as _contributions: NULL -> '' / 0, enums stored by name
+        key_periodo = func.coalesce(Vencimiento.periodo, literal(""))
+        key_moneda = func.coalesce(cast(Vencimiento.moneda, String), literal(""))
+        key_estado = func.coalesce(cast(Vencimiento.estado, String), literal(""))
+        key_inmueble = func.coalesce(Obligacion.inmueble_id, literal(0))
+        key_proveedor = func.coalesce(Obligacion.servicio_id, literal(0))
+        keys = (key_periodo, key_moneda, key_estado, key_inmueble, key_proveedor)
+        source = select(
+            *keys, func.sum(func.coalesce(Vencimiento.monto_original, 0)), func.count(Vencimiento.id)
+        ).select_from(Vencimiento).outerjoin(Obligacion, Vencimiento.obligacion_id == Obligacion.id)\
+            .where(Vencimiento.is_deleted == 0)\
+            .group_by(*keys)
+
+        result = conn.execute(insert(table).from_select([*_KEY_COLUMNS, "total", "cantidad"], source))
+        return result.rowcount
+
+    @classmethod
+    def ensure_populated(cls, conn: Connection) -> bool:
+        """Initial fill (table just created / emptied while vencimientos exist)."""
+        if conn.execute(select(ResumenMensual.periodo).limit(1)).first() is not None:
+            return False
+        if conn.execute(select(Vencimiento.id).where(Vencimiento.is_deleted == 0).limit(1)).first() is None:
+            return False
+        count = cls.rebuild(conn)
+        app_logger.info(f"ResumenMensual: initial build ({count} buckets).")
+        return True
+
+
+# --- Session hooks ---
+
+def _touched(session: Session):
+    """(vencimiento ids, obligacion ids) of persistent rows whose rollup key/amount may change."""
+    venc_ids, oblig_ids = set(), set()
+    for obj in session.dirty:
+        if isinstance(obj, Vencimiento) and obj.id is not None:
+            state = sa_inspect(obj)
+            if any(state.attrs[a].history.has_changes() for a in _ROLLUP_ATTRS):
+                venc_ids.add(obj.id)
+        elif isinstance(obj, Obligacion) and obj.id is not None:
+            state = sa_inspect(obj)
+            if any(state.attrs[a].history.has_changes() for a in _OBLIGACION_ATTRS):
+                oblig_ids.add(obj.id)
+    return venc_ids, oblig_ids
+
+
+@event.listens_for(Session, "before_flush")
+def _rollup_before_flush(session, flush_context, instances):
+    venc_ids, oblig_ids = _touched(session)
+    deleted_ids = {obj.id for obj in session.deleted if isinstance(obj, Vencimiento) and obj.id is not None}
+    new_vencs = [obj for obj in session.new if isinstance(obj, Vencimiento)]
+    if not (venc_ids or oblig_ids or deleted_ids or new_vencs):
+        return
+
+    # Old contributions (DB still holds pre-flush values)
+    conn = session.connection()
+    old = ResumenMensualService._contributions(conn, venc_ids | deleted_ids, oblig_ids)
+    session.info["rollup_pending"] = {
+        "old": old,
+        "venc_ids": venc_ids,
+        "oblig_ids": oblig_ids,
+        "new_objs": new_vencs,
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _rollup_after_flush(session, flush_context):
+    pending = session.info.pop("rollup_pending", None)
+    if not pending:
+        return
+    conn = session.connection()
+    venc_ids = pending["venc_ids"] | {obj.id for obj in pending["new_objs"] if obj.id is not None}
+    new = ResumenMensualService._contributions(conn, venc_ids, pending["oblig_ids"])
+
+    deltas = {}
+    for key, monto in pending["old"]:
+        d = deltas.setdefault(key, [0.0, 0])
+        d[0] -= monto
+        d[1] -= 1
+    for key, monto in new:
+        d = deltas.setdefault(key, [0.0, 0])
+        d[0] += monto
+        d[1] += 1
+    ResumenMensualService.apply_deltas(conn, deltas)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _rollup_bulk_statement(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in (Vencimiento.__tablename__, Obligacion.__tablename__):
+        orm_execute_state.session.info["rollup_rebuild"] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _rollup_before_commit(session):
+    if session.info.get("rollup_rebuild"):
+        session.flush()
+        session.info.pop("rollup_rebuild", None)
+        count = ResumenMensualService.rebuild(session.connection())
+        app_logger.info(f"ResumenMensual: rebuilt after bulk statement ({count} buckets).")
+
+
+@event.listens_for(Session, "after_rollback")
+def _rollup_clear_on_rollback(session):
+    session.info.pop("rollup_pending", None)
+    session.info.pop("rollup_rebuild", None)
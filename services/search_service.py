@@ -0,0 +1,276 @@
+import re
+import weakref
+import unicodedata
+from sqlalchemy import event, select, text, or_
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from models.entities import Obligacion, ProveedorServicio, Inmueble
+from utils.logger import app_logger
+
+# Document kinds (doc_id = ref_id * 3 + kind, so every catalog row has one stable document id)
+OBLIGACION, PROVEEDOR, INMUEBLE = 0, 1, 2
+_KINDS = 3
+
+# Attributes that change the searchable text of a document
+_WATCHED = {
+    Obligacion: ("numero_cliente_referencia", "inmueble_id", "servicio_id", "inmueble", "proveedor"),
+    ProveedorServicio: ("nombre_entidad", "categoria"),
+    Inmueble: ("alias", "direccion"),
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+_ready = weakref.WeakKeyDictionary() # engine -> search_index exists
+
+
+def fold(value) -> str:
+    """Lowercase, accents removed ('Crédito' -> 'credito')."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def terms(query) -> list:
+    """Search words of a free-text query (folded, punctuation dropped)."""
+    return _WORD.findall(fold(query))
+
+
+class SearchService:
+    """
+    One full-text index ('search_index') over the searchable text of obligaciones,
+    proveedores and inmuebles: FTS5 on SQLite, a tsvector GIN index on PostgreSQL.
+
+    Every word of the query must match the start of a word in the document
+    ('edes cred' finds 'EDESUR ... Crédito'); text is accent/case folded on both sides.
+    A vencimiento has no text of its own: it is found through its obligación's
+    document (proveedor + categoría + inmueble alias/dirección + nro. de cliente),
+    so vencimiento writes never touch the index and catalog writes only re-index
+    the few obligaciones involved (session hooks below).
+    """
+
+    # --- Schema ---
+
+    @staticmethod
+    def ensure_index(conn: Connection) -> bool:
+        """Creates the index (and fills it) if missing. Returns True if it was built."""
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+            )).first() is not None
+            if not exists:
+                # rowid = doc_id; prefix indexes make 2-3 letter prefix queries index lookups
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE search_index USING fts5("
+                    "texto, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                ))
+        elif dialect == "postgresql":
+            exists = conn.execute(text("SELECT to_regclass('search_index')")).scalar() is not None
+            if not exists:
+                conn.execute(text("CREATE TABLE search_index (doc_id BIGINT PRIMARY KEY, texto TEXT NOT NULL)"))
+                conn.execute(text(
+                    "CREATE INDEX idx_search_index_tsv ON search_index USING gin (to_tsvector('simple', texto))"
+                ))
+        else:
+            return False
+
+        _ready[conn.engine] = True
+        if exists:
+            return False
+        count = SearchService.rebuild(conn)
+        app_logger.info(f"SearchIndex: initial build ({count} documents).")
+        return True
+
+    @staticmethod
+    def available(conn: Connection) -> bool:
+        """Index present on this engine (files created without run_migrations have none)."""
+        if conn.engine not in _ready:
+            if conn.dialect.name == "sqlite":
+                _ready[conn.engine] = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+                )).first() is not None
+            elif conn.dialect.name == "postgresql":
+                _ready[conn.engine] = conn.execute(text("SELECT to_regclass('search_index')")).scalar() is not None
+            else:
+                _ready[conn.engine] = False
+        return _ready[conn.engine]
+
+    # --- Documents ---
+
+    @staticmethod
+    def _documents(conn: Connection, obligacion_ids=None, proveedor_ids=None, inmueble_ids=None) -> dict:
+        """{doc_id: folded text} for the given ids (None = all rows of that kind)."""
+        docs = {}
+
+        def wanted(ids):
+            return ids is None or len(ids) > 0
+
+        if wanted(obligacion_ids):
+            query = select(
+                Obligacion.id, ProveedorServicio.nombre_entidad, ProveedorServicio.categoria,
+                Inmueble.alias, Inmueble.direccion, Obligacion.numero_cliente_referencia
+            ).select_from(Obligacion)\
+                .outerjoin(ProveedorServicio, Obligacion.servicio_id == ProveedorServicio.id)\
+                .outerjoin(Inmueble, Obligacion.inmueble_id == Inmueble.id)
+            if obligacion_ids is not None:
+                query = query.where(Obligacion.id.in_(list(obligacion_ids)))
+            for ob_id, *fields in conn.execute(query):
+                docs[ob_id * _KINDS + OBLIGACION] = fold(" ".join(f for f in fields if f))
+
+        if wanted(proveedor_ids):
+            query = select(ProveedorServicio.id, ProveedorServicio.nombre_entidad, ProveedorServicio.categoria)
+            if proveedor_ids is not None:
+                query = query.where(ProveedorServicio.id.in_(list(proveedor_ids)))
+            for prov_id, *fields in conn.execute(query):
+                docs[prov_id * _KINDS + PROVEEDOR] = fold(" ".join(f for f in fields if f))
+
+        if wanted(inmueble_ids):
+            query = select(Inmueble.id, Inmueble.alias, Inmueble.direccion)
+            if inmueble_ids is not None:
+                query = query.where(Inmueble.id.in_(list(inmueble_ids)))
+            for inm_id, *fields in conn.execute(query):
+                docs[inm_id * _KINDS + INMUEBLE] = fold(" ".join(f for f in fields if f))
+        return docs
+
+    @staticmethod
+    def _write(conn: Connection, doc_ids, docs: dict):
+        """Replaces documents 'doc_ids' with 'docs' (ids missing from docs are just removed)."""
+        id_col = "rowid" if conn.dialect.name == "sqlite" else "doc_id"
+        doc_ids = list(doc_ids)
+        for i in range(0, len(doc_ids), 500):
+            chunk = doc_ids[i:i + 500]
+            params = {f"d{n}": d for n, d in enumerate(chunk)}
+            conn.execute(text(f"DELETE FROM search_index WHERE {id_col} IN ({', '.join(':' + k for k in params)})"), params)
+        if docs:
+            conn.execute(
+                text(f"INSERT INTO search_index ({id_col}, texto) VALUES (:doc_id, :texto)"),
+                [{"doc_id": d, "texto": t} for d, t in docs.items()]
+            )
+
+    @classmethod
+    def reindex(cls, conn: Connection, obligacion_ids=(), proveedor_ids=(), inmueble_ids=()):
+        """Refreshes the documents of these catalog rows (and of the obligaciones that embed them)."""
+        obligacion_ids, proveedor_ids, inmueble_ids = set(obligacion_ids), set(proveedor_ids), set(inmueble_ids)
+        if proveedor_ids or inmueble_ids:
+            conds = []
+            if proveedor_ids:
+                conds.append(Obligacion.servicio_id.in_(list(proveedor_ids)))
+            if inmueble_ids:
+                conds.append(Obligacion.inmueble_id.in_(list(inmueble_ids)))
+            obligacion_ids.update(conn.execute(select(Obligacion.id).where(or_(*conds))).scalars())
+        if not (obligacion_ids or proveedor_ids or inmueble_ids):
+            return
+
+        doc_ids = [i * _KINDS + OBLIGACION for i in obligacion_ids] \
+            + [i * _KINDS + PROVEEDOR for i in proveedor_ids] \
+            + [i * _KINDS + INMUEBLE for i in inmueble_ids]
+        cls._write(conn, doc_ids, cls._documents(conn, obligacion_ids, proveedor_ids, inmueble_ids))
+
+    @classmethod
+    def rebuild(cls, conn: Connection) -> int:
+        conn.execute(text("DELETE FROM search_index"))
+        docs = cls._documents(conn)
+        cls._write(conn, [], docs)
+        return len(docs)
+
+    # --- Queries ---
+
+    @classmethod
+    def search(cls, session: Session, query: str, kind=OBLIGACION, limit=None) -> list:
+        """Ids of 'kind' rows matching 'query', best match first."""
+        words = terms(query)
+        if not words:
+            return []
+        if session.bind.dialect.name == "sqlite":
+            sql = ("SELECT rowid / :kinds FROM search_index WHERE search_index MATCH :q AND rowid % :kinds = :kind "
+                   "ORDER BY rank")
+            q = " ".join(f'"{w}"*' for w in words)
+        else:
+            sql = ("SELECT doc_id / :kinds FROM search_index "
+                   "WHERE to_tsvector('simple', texto) @@ to_tsquery('simple', :q) AND doc_id % :kinds = :kind "
+                   "ORDER BY ts_rank(to_tsvector('simple', texto), to_tsquery('simple', :q)) DESC")
+            q = " & ".join(f"{w}:*" for w in words)
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return list(session.execute(text(sql), {"q": q, "kinds": _KINDS, "kind": kind}).scalars())
+
+    @classmethod
+    def match_ids(cls, session: Session, query: str, kind=OBLIGACION):
+        """
+        Ids of 'kind' rows matching every word of 'query', for IN (...) filters;
+        None if the query has no searchable words (= no filter).
+        Resolved up front (catalog-sized list) so the planner sees how selective the
+        match is: a few obligaciones -> their index, most of them -> walk the date order.
+        """
+        return cls.search(session, query, kind) if terms(query) else None
+
+
+# --- Session hooks ---
+
+def _touched(session: Session) -> dict:
+    """{model: ids} of persistent/deleted catalog rows whose document may change."""
+    touched = {model: set() for model in _WATCHED}
+    for obj in session.dirty:
+        attrs = _WATCHED.get(type(obj))
+        if attrs and obj.id is not None:
+            state = sa_inspect(obj)
+            if any(state.attrs[a].history.has_changes() for a in attrs):
+                touched[type(obj)].add(obj.id)
+    for obj in session.deleted:
+        if type(obj) in _WATCHED and obj.id is not None:
+            touched[type(obj)].add(obj.id)
+    return touched
+
+
+@event.listens_for(Session, "before_flush")
+def _search_before_flush(session, flush_context, instances):
+    touched = _touched(session)
+    new = [obj for obj in session.new if type(obj) in _WATCHED]
+    if new or any(touched.values()):
+        pending = session.info.setdefault("search_pending", {"touched": {m: set() for m in _WATCHED}, "new": []})
+        for model, ids in touched.items():
+            pending["touched"][model] |= ids
+        pending["new"].extend(new)
+
+
+@event.listens_for(Session, "after_flush")
+def _search_after_flush(session, flush_context):
+    pending = session.info.pop("search_pending", None)
+    if not pending:
+        return
+    conn = session.connection()
+    if not SearchService.available(conn):
+        return
+    ids = pending["touched"]
+    for obj in pending["new"]:
+        if obj.id is not None:
+            ids[type(obj)].add(obj.id)
+    SearchService.reindex(conn, ids[Obligacion], ids[ProveedorServicio], ids[Inmueble])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _search_bulk_statement(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if getattr(table, "name", None) in {model.__tablename__ for model in _WATCHED}:
+        orm_execute_state.session.info["search_rebuild"] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _search_before_commit(session):
+    if session.info.get("search_rebuild"):
+        session.flush()
+        session.info.pop("search_rebuild", None)
+        conn = session.connection()
+        if SearchService.available(conn):
+            count = SearchService.rebuild(conn)
+            app_logger.info(f"SearchIndex: rebuilt after bulk statement ({count} documents).")
+
+
+@event.listens_for(Session, "after_rollback")
+def _search_clear_on_rollback(session):
+    session.info.pop("search_pending", None)
+    session.info.pop("search_rebuild", None)
@@ -69,18 +69,6 @@ class TreasuryService:
             moneda_key = "ARS"
             if venc and venc.moneda:
                 moneda_key = venc.moneda.value if hasattr(venc.moneda, "value") else str(venc.moneda)
-            
-            # Calculate USD Equivalent
-            monto_usd = 0.0
-            k = str(moneda_key).upper()
-            if "USD" in k or "DOLAR" in k:
-                monto_usd = p.monto
-            else:
-                try:
-                    # Convert
-                    monto_usd = forex.convert(p.monto, Moneda.ARS, Moneda.USD, p.fecha_pago, session)
-                except:
-                    pass
 
             item = {
                 "id": p.id,
@@ -90,13 +78,28 @@ class TreasuryService:
                 "entidad": entidad_nombre,
                 "concepto": inmueble_alias,
                 "monto": p.monto,
-                "monto_usd": monto_usd, # New Field
+                "monto_usd": 0.0, # New Field (filled below)
                 "moneda": moneda_key,
                 "medio_pago": p.medio_pago or "Otro",
                 "comprobante_id": p.documento_id or p.comprobante_path
             }
                 
             movements.append(item)
+
+        # Calculate USD Equivalent for all rows in one pass
+        # Anything that looks like USD is taken as is, the rest is treated as ARS.
+        try:
+            sources = [
+                Moneda.USD if any(tag in str(m["moneda"]).upper() for tag in ("USD", "DOLAR", "DÓLAR")) else Moneda.ARS
+                for m in movements
+            ]
+            usd_values = forex.convert_many(
+                [m["monto"] for m in movements], sources, [m["fecha"] for m in movements], Moneda.USD, session
+            )
+            for m, usd in zip(movements, usd_values):
+                m["monto_usd"] = float(usd)
+        except Exception as e:
+            app_logger.error(f"Treasury USD conversion failed: {e}")
             
         return movements
 
@@ -117,43 +120,19 @@ class TreasuryService:
             start_date, end_date, inmueble_id, proveedor_id, periodo_id, session=session
         )
         
-        from services.forex_service import ForexService
-        from models.entities import Moneda
-        
-        forex = ForexService()
-        
         count = len(movements)
         totals_by_currency = {}
         total_usd_equivalent = 0.0
         
-        # Optimization: limit repeated queries? 
-        # For now, let's just loop. Session is active.
-        
+        # USD equivalents are already batch-converted by get_movements.
         for m in movements:
             curr = m["moneda"]
-            val = m["monto"]
-            fecha = m["fecha"]
             
             # 1. Nominal Sum
-            totals_by_currency[curr] = totals_by_currency.get(curr, 0.0) + val
+            totals_by_currency[curr] = totals_by_currency.get(curr, 0.0) + m["monto"]
             
             # 2. USD Equivalent
-            # Check if it looks like USD
-            k = str(curr).upper()
-            if "USD" in k or "DOLAR" in k or "DÓLAR" in k:
-                total_usd_equivalent += val
-            else:
-                # Assume ARS or convert attempts
-                # Try conversion
-                try:
-                    # We need Moneda Enum
-                    # Assuming basic ARS input if not USD
-                    converted = forex.convert(val, Moneda.ARS, Moneda.USD, fecha, session)
-                    total_usd_equivalent += converted
-                except Exception as e:
-                    # Fallback or log?
-                    print(f"Conversion error for {val} on {fecha}: {e}")
-                    pass
+            total_usd_equivalent += m["monto_usd"]
             
         return {
             "count": count,
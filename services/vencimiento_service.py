@@ -1,5 +1,6 @@
 import shutil
 import os
+import threading
 from uuid import uuid4
 from typing import List, Optional
 from datetime import date
@@ -11,9 +12,11 @@ from utils.logger import app_logger
 from models.entities import Vencimiento, EstadoVencimiento, Obligacion, Pago
 from repositories.vencimiento_repository import VencimientoRepository
 from services.audio_service import AudioService
-from dtos.vencimiento import VencimientoCreateDTO, VencimientoUpdateDTO
+from services.data_version import DataVersion
+from services.document_store import DocumentStore
+from dtos.vencimiento import VencimientoCreateDTO, VencimientoUpdateDTO, VencimientoRow
+from utils.format_helper import parse_fuzzy_date_series, parse_localized_float_series
 import pandas as pd
-from datetime import datetime
 
 class VencimientoService:
     def __init__(self):
@@ -30,121 +33,87 @@ class VencimientoService:
         success_count = 0
         errors = []
         
-        # Pre-fetch all Obligations for matching (Alias -> ID map)
-        # Using a tuple key (alias, proveedor_id) might be safer, but let's stick to Alias or Description matching
+        # Pre-fetch all Obligations for matching (Proveedor name / Inmueble alias)
         all_obs = session.query(Obligacion).all()
-        # Build Lookup Map: Alias (LowerCase) -> Obligacion
-        # Also map: Proveedor Name -> [Obligaciones] (for fuzzy match)
-        
-        obs_map = {o.inmueble.alias.lower(): o for o in all_obs if o.inmueble and o.inmueble.alias}
-        # Also map by Obligacion unique description if we had one? 
-        # Currently Obligacion is Inmueble(Servicio) + Proveedor.
-        # Let's map "Servicio - Proveedor" string?
+        keywords = [
+            (
+                obl,
+                obl.proveedor.nombre_entidad.lower() if obl.proveedor else "",
+                obl.inmueble.alias.lower() if obl.inmueble and obl.inmueble.alias else "",
+            )
+            for obl in all_obs
+        ]
         
-        # Better: We need to find the Obligacion based on the CSV Description.
-        # Strategy:
-        # 1. Exact match on Obligacion.id (if provided? unlikely)
-        # 2. Fuzzy match Description against "Proveedor Name" or "Servicio Alias"
+        # 1. Parse columns once (convention detected per column, see utils.format_helper)
+        col_fecha = mapping_dict.get('fecha')
+        col_monto = mapping_dict.get('monto')
+        col_desc = mapping_dict.get('descripcion')
+        col_ent = mapping_dict.get('entidad')
+        missing = [c for c in (col_fecha, col_monto, col_desc, col_ent) if c and c not in df.columns]
+        if missing or not (col_fecha and col_monto and col_desc):
+            return 0, [f"Columnas no encontradas en el archivo: {missing or ['fecha/monto/descripcion']}"]
         
-        # Let's create a list of keywords for each obligation
-        # kw_map = [ (obl, ["fibertel", "internet", "claro"]) ]
+        raw_dates = df[col_fecha]
+        dates = parse_fuzzy_date_series(raw_dates)
+        montos, bad_montos = parse_localized_float_series(df[col_monto], with_invalid=True)
+        blank_montos = df[col_monto].isna() | (df[col_monto].astype(str).str.strip() == "")
+        descs = df[col_desc].astype(str).str.lower()
+        ents = df[col_ent].astype(str).str.lower() if col_ent else pd.Series("", index=df.index)
         
-        # [OPTIMIZATION] Batch Existence Check
-        # 1. Determine Date Range to fetch existing records cleanly
-        try:
-            # Create a temp copy to parse dates safely for range determination
-            col_fecha = mapping_dict.get('fecha')
-            temp_dates = []
-            
-            for val in df[col_fecha]:
-                try:
-                    d = None
-                    if isinstance(val, (datetime, date)): d = val
-                    else: d = pd.to_datetime(val, dayfirst=True).date()
-                    if d: temp_dates.append(d)
-                except: pass
+        # [OPTIMIZATION] Batch Existence Check: existing records of the file's date range in one query
+        existing_cache = set()
+        valid_dates = dates.dropna()
+        if not valid_dates.empty:
+            range_dupes = session.query(
+                Vencimiento.obligacion_id, Vencimiento.fecha_vencimiento, Vencimiento.monto_original
+            ).filter(
+                Vencimiento.fecha_vencimiento >= valid_dates.min().date(),
+                Vencimiento.fecha_vencimiento <= valid_dates.max().date(),
+                Vencimiento.is_deleted == 0
+            ).all()
             
-            existing_cache = set()
-            if temp_dates:
-                min_date = min(temp_dates)
-                max_date = max(temp_dates)
-                
-                # Fetch all potential duplicates in one query
-                range_dupes = session.query(Vencimiento).filter(
-                    Vencimiento.fecha_vencimiento >= min_date,
-                    Vencimiento.fecha_vencimiento <= max_date,
-                    Vencimiento.is_deleted == 0
-                ).all()
+            # Build Cache: (obligacion_id, date, monto)
+            # Note: Float comparison in tuple key is risky, but monto_original comes from DB
+            for obligacion_id, fecha, monto in range_dupes:
+                existing_cache.add((obligacion_id, fecha, float(monto)))
+        
+        def find_obligacion(desc, ent_name):
+            # Heuristic A: Look for Proveedor Name in Entidad or Description
+            # This is O(N*M), but N (Obligations) is small (<100 likely); memoized per (desc, entidad)
+            target_obl, best_score = None, 0
+            for obl, p_name, alias in keywords:
+                score = 0
+                if p_name and (p_name in ent_name or p_name in desc): score += 5
+                if alias and (alias in desc): score += 2
                 
-                # Build Cache: (obligacion_id, date, monto)
-                # Note: Float comparison in tuple key is risky, but monto_original comes from DB
-                for v in range_dupes:
-                    existing_cache.add((v.obligacion_id, v.fecha_vencimiento, float(v.monto_original)))
-
-        except Exception as e:
-            app_logger.warning(f"Optimization Pre-fetch failed: {e}. Falling back to row-by-row might be slow but safe.")
-            existing_cache = set()
-
-        from models.entities import Proveedor
+                if score > best_score and score >= 3:
+                    best_score = score
+                    target_obl = obl
+            return target_obl
+        
+        matches = {}
         
-        for index, row in df.iterrows():
+        # 2. Build rows (row-level errors are still reported per row)
+        columns = (
+            df.index.tolist(), raw_dates.tolist(), dates.notna().tolist(), dates.dt.date.tolist(),
+            montos.tolist(), bad_montos.tolist(), blank_montos.tolist(), descs.tolist(), ents.tolist()
+        )
+        for index, raw_date, has_date, date_val, monto, bad, blank, desc, ent_name in zip(*columns):
             try:
-                # 1. Parse Date
-                col_fecha = mapping_dict.get('fecha')
-                raw_date = row[col_fecha]
-                if pd.isna(raw_date): continue
-                
-                date_val = None
-                try: 
-                    date_val = pd.to_datetime(raw_date, dayfirst=True).date()
-                except:
-                    # Try manual parse
-                    s = str(raw_date).strip().split(" ")[0]
-                    date_val = datetime.strptime(s, "%d/%m/%Y").date()
-                
-                if not date_val: continue
-
-                # 2. Parse Amount
-                col_monto = mapping_dict.get('monto')
-                # Reuse util from somewhere or implement simple clean
-                val_str = str(row[col_monto])
-                val_str = val_str.replace("$", "").replace("USD", "").replace("ARS", "").strip()
-                # Handle 1.000,00 vs 1,000.00
-                if "," in val_str and "." in val_str:
-                    if val_str.rfind(",") > val_str.rfind("."): # 1.000,00
-                        val_str = val_str.replace(".", "").replace(",", ".")
-                    else: # 1,000.00
-                        val_str = val_str.replace(",", "")
-                elif "," in val_str: val_str = val_str.replace(",", ".")
+                if not has_date:
+                    if not pd.isna(raw_date) and str(raw_date).strip():
+                        errors.append(f"Fila {index}: Fecha inválida '{raw_date}'")
+                    continue
                 
-                monto = float(val_str)
+                if bad or blank:
+                    errors.append(f"Fila {index}: Monto inválido '{df.at[index, col_monto]}'")
+                    continue
                 
                 # 3. Find Obligacion
-                col_desc = mapping_dict.get('descripcion')
-                desc = str(row[col_desc]).lower()
-                
-                col_ent = mapping_dict.get('entidad')
-                ent_name = str(row[col_ent]).lower() if col_ent else ""
-                
-                target_obl = None
-                
-                # Heuristic A: Look for Proveedor Name in Entidad or Description
-                # This is O(N*M), but N (Obligations) is small (<100 likely)
-                best_score = 0
-                
-                for obl in all_obs:
-                    score = 0
-                    p_name = obl.proveedor.nombre_entidad.lower()
-                    if p_name in ent_name or p_name in desc: score += 5
-                    
-                    s_name = obl.servicio.nombre_servicio.lower() if obl.servicio else ""
-                    if s_name and (s_name in desc): score += 3
-                    
-                    if obl.inmueble and (obl.inmueble.alias.lower() in desc): score += 2
-                    
-                    if score > best_score and score >= 3:
-                        best_score = score
-                        target_obl = obl
+                key = (desc, ent_name)
+                if key not in matches:
+                    matches[key] = find_obligacion(desc, ent_name)
+                target_obl = matches[key]
                 
                 if not target_obl:
                     # Fallback: Look for "Varios" or Generic?
@@ -155,24 +124,10 @@ class VencimientoService:
                     
                 # 4. Create Vencimiento
                 # Check duplicate using Cache (O(1)) instead of DB Query
-                
-                # Check exact match
                 if (target_obl.id, date_val, monto) in existing_cache:
                      errors.append(f"Fila {index}: Ya existe (Omitido por Caché).")
                      continue
-
-                # Safety fall-back check if cache was empty? 
-                # No, better trust cache if populated.
-                
-                # If not in cache, we assume it doesn't exist.
-                # Adding to cache dynamically if we process duplicates within the SAME import file?
-                # Yes, good point.
-                
-                if (target_obl.id, date_val, monto) in existing_cache:
-                    continue
-                else:
-                    existing_cache.add((target_obl.id, date_val, monto)) # Prevent duplicates within CSV itself
-
+                existing_cache.add((target_obl.id, date_val, monto)) # Prevent duplicates within CSV itself
                     
                 new_venc = Vencimiento(
                     obligacion_id=target_obl.id,
@@ -193,10 +148,35 @@ class VencimientoService:
     def _get_repo(self, session):
         return VencimientoRepository(session, Vencimiento)
 
+    # Grid totals per filter set, valid for one DataVersion
+    _count_cache = {}
+    _count_cache_version = None
+    _count_lock = threading.Lock()
+
+    def _count_cached(self, repo, inmueble_id, estado, period_id, session, proveedor_id=None, search=None) -> int:
+        """Filtered total for the grid label; recounted only after a committed write."""
+        version = DataVersion.current()
+        key = (id(session.get_bind()), inmueble_id, estado, period_id, proveedor_id, search)
+        with self._count_lock:
+            if VencimientoService._count_cache_version != version:
+                VencimientoService._count_cache = {}
+                VencimientoService._count_cache_version = version
+            count = VencimientoService._count_cache.get(key)
+        if count is None:
+            count = repo.count_details(inmueble_id, estado, period_id, proveedor_id, search)
+            with self._count_lock:
+                if VencimientoService._count_cache_version == version:
+                    VencimientoService._count_cache[key] = count
+        return count
+
     @safe_transaction
-    def get_all(self, inmueble_id=None, estado=None, period_id=None, limit=None, offset=None, session=None) -> tuple[List[Vencimiento], int]:
+    def get_all(self, inmueble_id=None, estado=None, period_id=None, limit=None, offset=None,
+                after=None, before=None, session=None) -> tuple[List[Vencimiento], int]:
+        """Page of vencimientos (keyset cursor via after/before, see VencimientoRepository.get_details_all) + total."""
         repo = self._get_repo(session)
-        items, count = repo.get_details_all(inmueble_id, estado, period_id, limit, offset)
+        items, _ = repo.get_details_all(inmueble_id, estado, period_id, limit, offset,
+                                        after=after, before=before, with_count=False)
+        count = self._count_cached(repo, inmueble_id, estado, period_id, session)
         
         # Critical: Expunge to survive session close
         for i in items:
@@ -204,6 +184,16 @@ class VencimientoService:
             
         return items, count
 
+    @safe_transaction
+    def get_grid_rows(self, inmueble_id=None, estado=None, period_id=None, limit=None, offset=None,
+                      after=None, before=None, proveedor_id=None, sort_col="fecha_vencimiento", sort_desc=True,
+                      search=None, session=None) -> tuple[List[VencimientoRow], int]:
+        """Like get_all, but returns VencimientoRow projections (nothing to expunge), sorted and filtered in SQL."""
+        repo = self._get_repo(session)
+        rows = repo.get_grid_rows(inmueble_id, estado, period_id, limit, offset, after=after, before=before,
+                                  proveedor_id=proveedor_id, sort_col=sort_col, sort_desc=sort_desc, search=search)
+        return rows, self._count_cached(repo, inmueble_id, estado, period_id, session, proveedor_id, search)
+
     @safe_transaction
     def get_by_id(self, id: int, session=None) -> Optional[Vencimiento]:
         repo = self._get_repo(session)
@@ -237,8 +227,9 @@ class VencimientoService:
     def create(self, dto: VencimientoCreateDTO, session=None) -> Vencimiento:
         repo = self._get_repo(session)
         
+        # Documents already uploaded to the store are not copied again to DOCS_DIR
         final_path = None
-        if dto.ruta_archivo_pdf:
+        if dto.ruta_archivo_pdf and not dto.documento_id:
              # Query Obligacion for naming
              obl = session.query(Obligacion).get(dto.obligacion_id)
              if obl:
@@ -247,7 +238,7 @@ class VencimientoService:
                  )
         
         final_path_payment = None
-        if dto.ruta_comprobante_pago:
+        if dto.ruta_comprobante_pago and not dto.comprobante_pago_id:
              obl = session.query(Obligacion).get(dto.obligacion_id) # Optimization: query only if not already queried
              if obl:
                  final_path_payment = self._save_pdf_structured(
@@ -269,44 +260,13 @@ class VencimientoService:
 
     @safe_transaction
     def upload_document(self, file_path: str, session=None) -> int:
-        """Reads file and saves to Documento table. Returns ID."""
-        import os
-        from models.entities import Documento
-        
-        if not os.path.exists(file_path):
-            raise ServiceError(f"File not found: {file_path}")
-            
-        filename = os.path.basename(file_path)
-        size = os.path.getsize(file_path)
-        
-        # Determine Mime Type
-        ext = os.path.splitext(filename)[1].lower()
-        mime = "application/octet-stream"
-        if ext == ".pdf": mime = "application/pdf"
-        elif ext in [".jpg", ".jpeg"]: mime = "image/jpeg"
-        elif ext == ".png": mime = "image/png"
-        
-        with open(file_path, "rb") as f:
-            file_bytes = f.read()
-            
-        doc = Documento(
-            filename=filename,
-            file_data=file_bytes,
-            file_size=size,
-            mime_type=mime
-        )
-        session.add(doc)
-        session.flush()
-        return doc.id
+        """Saves the file in the document store (deduplicated by content). Returns Documento ID."""
+        return DocumentStore.store_file(session, file_path).id
 
     @safe_transaction
     def get_document(self, doc_id: int, session=None):
         """Returns tuple (file_data, filename, mime_type)"""
-        from models.entities import Documento
-        doc = session.query(Documento).get(doc_id)
-        if doc:
-            return doc.file_data, doc.filename, doc.mime_type
-        return None, None, None
+        return DocumentStore.read(session, doc_id)
 
     @safe_transaction
     def update(self, id: int, dto: VencimientoUpdateDTO, session=None) -> Vencimiento:
@@ -346,10 +306,15 @@ class VencimientoService:
                         self._ensure_payment_record(venc, session, dto.monto_pagado, dto.fecha_pago)
                     break
 
+        replaced_docs = []
         if dto.documento_id is not None:
+             if venc.documento_id and venc.documento_id != dto.documento_id:
+                 replaced_docs.append(venc.documento_id)
              venc.documento_id = dto.documento_id
 
         if dto.comprobante_pago_id is not None:
+             if venc.comprobante_pago_id and venc.comprobante_pago_id != dto.comprobante_pago_id:
+                 replaced_docs.append(venc.comprobante_pago_id)
              venc.comprobante_pago_id = dto.comprobante_pago_id
 
         # Handle File Upload (Start with Legacy, then optional Cloud sync if needed)
@@ -381,6 +346,10 @@ class VencimientoService:
         # Since venc is attached and modified, we just need to ensure it's in session (it is)
         # and let commit() handle it. merge() on attached objects can be problematic if state is mixed.
         repo.update(venc)
+
+        # Drop the store references of the documents this one replaced (if unused elsewhere)
+        for doc_id in replaced_docs:
+            DocumentStore.release(session, doc_id)
         return venc
 
     @safe_transaction
@@ -426,9 +395,16 @@ class VencimientoService:
 
     @safe_transaction
     def delete(self, id: int, session=None) -> bool:
-        """Hard delete of Vencimiento."""
+        """Hard delete of Vencimiento (and its stored documents, if unused elsewhere)."""
         repo = self._get_repo(session)
-        return repo.delete(id)
+        venc = repo.get_by_id(id)
+        if not venc:
+            return False
+        doc_ids = [venc.documento_id, venc.comprobante_pago_id] + [p.documento_id for p in venc.pagos]
+        repo.delete(id)
+        for doc_id in set(filter(None, doc_ids)):
+            DocumentStore.release(session, doc_id)
+        return True
 
     def _save_pdf_structured(self, src_path, periodo_str, inmueble_alias, servicio_nombre, doc_type="FACTURA"):
         try:
@@ -1,5 +1,7 @@
 
 import re
+import itertools
+from collections import Counter
 
 def parse_localized_float(value):
     """
@@ -122,3 +124,187 @@ def parse_fuzzy_date(value, dayfirst=True):
     except: pass
     
     return None
+
+
+# --- Column-wise (pandas Series) counterparts ---
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+_NUMBER_JUNK = re.compile(r'[^\d.,-]')
+_NUMBER_JUNK_LINES = re.compile(r'[^\d.,\-\n]') # Same, over '\n'-joined cells
+_VOTE_SAMPLE = 5000 # Distinct values that vote on a column's decimal separator
+_COMMA_DECIMAL = str.maketrans({'.': None, ',': '.'}) # '1.200,50' -> '1200.50'
+_DOT_DECIMAL = str.maketrans({',': None})             # '1,200.50' -> '1200.50'
+
+def _text_mask(series):
+    import pandas as pd
+    if pd.api.types.infer_dtype(series, skipna=True) == "string":
+        return series.notna() # All text (CSV columns): no per-cell type check
+    return series.map(lambda v: isinstance(v, str))
+
+def _decimal_vote(c):
+    """',' / '.' if the cleaned number text shows which one is its decimal separator, else None."""
+    dots, commas = c.count('.'), c.count(',')
+    if dots and commas:
+        return ',' if c.rfind(',') > c.rfind('.') else '.'
+    if dots > 1: return ','
+    if commas > 1: return '.'
+    if dots == 1 and len(c) - c.rfind('.') != 4: return '.'
+    if commas == 1 and len(c) - c.rfind(',') != 4: return ','
+    return None
+
+def _decimal_of(texts):
+    votes = Counter(_decimal_vote(c) for c in itertools.islice(texts, _VOTE_SAMPLE))
+    commas, dots = votes.get(',', 0), votes.get('.', 0)
+    if commas == dots:
+        return None
+    return ',' if commas > dots else '.'
+
+def _normalize_number(c, decimal):
+    """Cleaned number text -> float() syntax, resolving single-separator cells with the column's decimal."""
+    dots, commas = c.count('.'), c.count(',')
+    if dots and commas: # Self-describing: the last separator is the decimal
+        return c.translate(_COMMA_DECIMAL if c.rfind(',') > c.rfind('.') else _DOT_DECIMAL)
+    if commas:
+        return c.translate(_DOT_DECIMAL if commas > 1 or decimal == '.' else _COMMA_DECIMAL)
+    if dots and (decimal == ',' or (decimal == '.' and dots > 1)):
+        return c.translate(_COMMA_DECIMAL) # Dots are thousands
+    return c
+
+def _clean_numbers(texts):
+    """_NUMBER_JUNK removed from every text: one regex pass over the joined column."""
+    joined = "\n".join(texts)
+    if joined.count("\n") != len(texts) - 1: # Multi-line cells: one by one
+        return [_NUMBER_JUNK.sub('', t) for t in texts]
+    return _NUMBER_JUNK_LINES.sub('', joined).split("\n")
+
+def _normalize_numbers(cleaned, decimal):
+    """_normalize_number for a list: one translate over the joined list, per value only where it differs."""
+    table = _DOT_DECIMAL if decimal == '.' else _COMMA_DECIMAL
+    out = "\n".join(cleaned).translate(table).split("\n")
+    if decimal == ',': # Odd: '1,000,000' and '1,234.50' (dot after the last comma)
+        odd = [i for i, c in enumerate(cleaned) if c.count(',') > 1 or c.rfind('.') > c.rfind(',') >= 0]
+    elif decimal == '.':
+        odd = [i for i, c in enumerate(cleaned) if c.count('.') > 1 or c.rfind(',') > c.rfind('.') >= 0]
+    else:
+        odd = [i for i, c in enumerate(cleaned) if '.' in c or c.count(',') > 1]
+    for i in odd:
+        out[i] = _normalize_number(cleaned[i], decimal)
+    return out
+
+def detect_decimal_separator(series):
+    """
+    Decimal separator used by a text column: ',' or '.' (None if no value tells).
+    Distinct values (the first few thousand) vote: both separators ('1.200,50': the
+    last one is decimal), a repeated separator ('1.000.000': thousands) or one not
+    followed by exactly 3 digits ('100,5').
+    '1.234' / '1,234' alone are ambiguous and don't vote.
+    """
+    texts = series[_text_mask(series)].unique().tolist()
+    return _decimal_of(_clean_numbers(texts))
+
+def parse_localized_float_series(series, decimal="auto", with_invalid=False):
+    """
+    Column-wise parse_localized_float. Same rules (currency symbols stripped,
+    '1.200,50' / '1,200.50' / '100,50'), but each distinct text is parsed once
+    and the float conversion is a single pd.to_numeric call.
+    decimal: ',' / '.' / None (per-cell rules, like the scalar parser) or "auto":
+    detected once for the column (detect_decimal_separator), so the ambiguous
+    '1.234' of a '1.234,56' column is 1234 and not 1.23. Cells with both
+    separators always decide for themselves.
+    Returns a float Series; unparseable / empty cells become 0.0.
+    with_invalid=True: (values, mask of non-empty cells that could not be parsed).
+    """
+    import numpy as np
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.astype(float).fillna(0.0)
+        return (values, pd.Series(False, index=series.index)) if with_invalid else values
+
+    result = np.zeros(len(series))
+    invalid = np.zeros(len(series), dtype=bool)
+
+    text_mask = _text_mask(series).to_numpy()
+    # Real numbers mixed in object columns (e.g. Excel) pass through as-is
+    others = ~text_mask & series.notna().to_numpy()
+    if others.any():
+        numeric = others & series.map(_is_number).to_numpy()
+        result[numeric] = series[numeric].astype(float)
+
+    if text_mask.any():
+        # Statements repeat values (and blanks): work on the distinct texts
+        codes, uniques = pd.factorize(series[text_mask])
+        uniques = uniques.tolist()
+        cleaned = _clean_numbers(uniques)
+        if decimal == "auto":
+            decimal = _decimal_of(cleaned)
+        parsed = pd.to_numeric(np.array(_normalize_numbers(cleaned, decimal), dtype=object), errors='coerce').round(2)
+        result[text_mask] = parsed[codes]
+        if with_invalid:
+            bad = np.isnan(parsed) & np.array([bool(u.strip()) for u in uniques], dtype=bool)
+            invalid[text_mask] = bad[codes]
+
+    result = pd.Series(result, index=series.index).fillna(0.0)
+    return (result, pd.Series(invalid, index=series.index)) if with_invalid else result
+
+def _parse_date_texts(text, dayfirst):
+    """datetime64 Series for distinct stripped strings: formats in order, then the scalar parser."""
+    import pandas as pd
+
+    result = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    text = text[text != ""]
+    formats = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y"] if dayfirst else ["%Y-%m-%d", "%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y"]
+    for fmt in formats:
+        if text.empty:
+            break
+        candidate = text.str.slice(0, 10) if fmt == "%Y-%m-%d" else text
+        parsed = pd.to_datetime(candidate, format=fmt, errors='coerce')
+        ok = parsed.notna()
+        result[text.index[ok]] = parsed[ok]
+        text = text[~ok]
+
+    if not text.empty:
+        # Uncommon shapes: scalar parser
+        result[text.index] = pd.to_datetime(text.map(lambda v: parse_fuzzy_date(v, dayfirst=dayfirst)), errors='coerce')
+    return result
+
+def parse_fuzzy_date_series(series, dayfirst=True):
+    """
+    Vectorized parse_fuzzy_date for a whole column.
+    Dates/Timestamps pass through, numbers are Excel serials, strings are
+    tried against common formats column-wise, once per distinct value (a
+    statement repeats a few hundred dates); only the leftovers fall back
+    to the scalar parser.
+    Returns a datetime64 Series normalized to midnight; failures are NaT.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.tz_localize(None).dt.normalize() if series.dt.tz is not None else series.dt.normalize()
+
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.to_datetime(series, unit='D', origin='1899-12-30', errors='coerce').dt.normalize()
+
+    values = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    is_text = _text_mask(series).to_numpy()
+    others = ~is_text & series.notna().to_numpy()
+    if others.any():
+        rest = series[others]
+        numbers = rest.map(_is_number).to_numpy()
+        parsed = pd.Series(pd.NaT, index=rest.index, dtype='datetime64[ns]')
+        if numbers.any():
+            parsed[numbers] = pd.to_datetime(rest[numbers].astype(float), unit='D', origin='1899-12-30', errors='coerce')
+        if (~numbers).any():
+            parsed[~numbers] = pd.to_datetime(rest[~numbers], errors='coerce')
+        values[others] = parsed.to_numpy()
+
+    if is_text.any():
+        codes, uniques = pd.factorize(series[is_text])
+        parsed = _parse_date_texts(pd.Series(uniques.tolist(), dtype=object).str.strip(), dayfirst)
+        values[is_text] = parsed.to_numpy()[codes]
+
+    return pd.Series(values, index=series.index).dt.normalize()
@@ -1,5 +1,9 @@
-import pandas as pd
+import io
 import os
+import csv
+import threading
+from collections import Counter, OrderedDict
+import pandas as pd
 from utils.logger import app_logger
 
 def format_currency(value):
@@ -14,44 +18,183 @@ def format_currency(value):
     except Exception:
         return str(value)
 
+# --- File ingest ---
+# One buffered read per file: format from magic bytes, delimiter and header row sniffed
+# from that buffer, frames parsed from memory (C engine for text). Kept in a small cache
+# keyed by (path, mtime, size) so a wizard's previews, the structure detection and the
+# final import share one read; wizards call release_source() when they close.
+
+_MAGIC = [
+    (b"PK\x03\x04", "xlsx"),                        # OOXML (zip)
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "xls"),  # OLE2 (BIFF)
+]
+DELIMITERS = [";", ",", "\t", "|"] # Tie -> first (es-AR exports use ';')
+SNIFF_BYTES = 64 * 1024
+SNIFF_LINES = 50
+_MAX_SOURCES = 3
+
+_sources = OrderedDict() # (abs path, mtime_ns, size) -> SourceFile
+_sources_lock = threading.Lock()
+
+
+def detect_format(head: bytes) -> str:
+    """'xlsx' / 'xls' / 'html' / 'csv' from the first bytes of a file (extension is not trusted)."""
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    start = head.lstrip(b"\xef\xbb\xbf \t\r\n")[:512].lower()
+    if start.startswith(b"<") and (b"<table" in start or b"<html" in start or start.startswith(b"<!doctype")):
+        return "html" # Bank "Excel" exports that are really an HTML table
+    return "csv"
+
+
+def _decode(data: bytes) -> str:
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp1252", errors="replace") # Legacy Windows exports
+
+
+def sniff_delimiter(lines) -> str:
+    """
+    Delimiter whose field count is the same on most lines (preamble/title lines
+    disagree with every candidate, so they don't decide). Ties: more fields, then DELIMITERS order.
+    """
+    best, best_score = DELIMITERS[0], (0, 0)
+    for delim in DELIMITERS:
+        counts = Counter(len(r) for r in csv.reader(lines, delimiter=delim) if len(r) > 1)
+        if counts:
+            fields, freq = counts.most_common(1)[0]
+            if (freq, fields) > best_score:
+                best, best_score = delim, (freq, fields)
+    return best
+
+
+def find_header_row(rows, keyword_groups) -> int:
+    """
+    Index of the row that looks most like a header: +3 per keyword group with a match
+    (first best row wins). rows: lists of cell values; keyword_groups: lists of UPPERCASE words.
+    Returns 0 if no row matches anything.
+    """
+    best_idx, best_score = -1, 0
+    for idx, row in enumerate(rows):
+        row_str = " ".join(str(x).upper() for x in row)
+        score = sum(3 for words in keyword_groups if any(k in row_str for k in words))
+        if score > best_score:
+            best_idx, best_score = idx, score
+    return best_idx if best_idx >= 0 else 0
+
+
+class SourceFile:
+    """
+    A statement/import file read once. Frames are parsed from the in-memory copy and
+    cached per (sheet, header row, delimiter); callers get copies.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, "rb") as f:
+            self.data = f.read()
+        self.format = detect_format(self.data[:1024])
+        self._frames = {}
+        self._excel = None
+        self.text = None
+        self.delimiter = None
+        if self.format in ("csv", "html"):
+            self.text = _decode(self.data)
+        if self.format == "csv":
+            self.delimiter = sniff_delimiter(self.sample_lines())
+
+    @property
+    def is_excel(self) -> bool:
+        return self.format in ("xlsx", "xls")
+
+    def _workbook(self):
+        if self._excel is None:
+            self._excel = pd.ExcelFile(io.BytesIO(self.data))
+        return self._excel
+
+    @property
+    def sheet_names(self) -> list:
+        return self._workbook().sheet_names if self.is_excel else []
+
+    def sample_lines(self, n=SNIFF_LINES) -> list:
+        """First n non-blank text lines (CSV/HTML)."""
+        lines = []
+        for line in self.text[:SNIFF_BYTES].splitlines():
+            if line.strip():
+                lines.append(line)
+                if len(lines) >= n:
+                    break
+        return lines
+
+    def head_rows(self, n=20, sheet_name=0, delimiter=None) -> list:
+        """
+        First n rows as lists of cells, no header (what read_csv/read_excel header=None
+        would give, so indexes here are valid header_row values).
+        """
+        if self.format == "csv":
+            # Blank lines are skipped, like pandas' skip_blank_lines
+            return [r for r in csv.reader(self.sample_lines(n), delimiter=delimiter or self.delimiter)][:n]
+        raw = self.frame(header_row=None, sheet_name=sheet_name)
+        return raw.head(n).values.tolist()
+
+    def frame(self, header_row=0, sheet_name=0, delimiter=None) -> pd.DataFrame:
+        """
+        Whole file as a DataFrame (header_row=None: no header). CSV cells are strings;
+        Excel keeps its types (dates). Missing cells are "".
+        """
+        delimiter = delimiter or self.delimiter
+        key = (sheet_name, header_row, delimiter)
+        if key not in self._frames:
+            if self.is_excel:
+                # Do NOT force dtype=str for Excel, let it detect Dates correctly
+                df = self._workbook().parse(sheet_name, header=header_row)
+            elif self.format == "html":
+                df = pd.read_html(io.StringIO(self.text), header=header_row)[0]
+            else:
+                df = pd.read_csv(io.StringIO(self.text), sep=delimiter, header=header_row, dtype=str, engine="c")
+            self._frames[key] = df.fillna("")
+        return self._frames[key].copy()
+
+
+def open_source(file_path) -> SourceFile:
+    """Cached SourceFile (a changed file on disk is read again)."""
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    with _sources_lock:
+        if key in _sources:
+            _sources.move_to_end(key)
+            return _sources[key]
+    source = SourceFile(file_path)
+    with _sources_lock:
+        _sources[key] = source
+        while len(_sources) > _MAX_SOURCES:
+            _sources.popitem(last=False)
+    return source
+
+
+def release_source(file_path):
+    """Drops the cached copy of file_path (end of a wizard session)."""
+    if not file_path:
+        return
+    path = os.path.abspath(file_path)
+    with _sources_lock:
+        for key in [k for k in _sources if k[0] == path]:
+            del _sources[key]
+
+
 def load_data_file(file_path, file_format="CSV", header_row=0, delimiter=None):
     """
-    Unified loader for CSV and Excel files.
+    Unified loader for CSV, Excel and HTML-as-Excel files (see SourceFile).
     - Handles 'header_row' (0-indexed).
-    - Auto-detects delimiter if None for CSV.
-    - Returns DataFrame with all columns as string to avoid type inference issues.
+    - Format from the file content; delimiter sniffed if None for CSV.
+    - CSV columns are all strings to avoid type inference issues.
+    'file_format' is kept for callers; the content decides.
     """
     try:
-        ext = os.path.splitext(file_path)[1].lower()
-        app_logger.debug(f"Loading file '{file_path}' (Ext: {ext})")
-        
-        # Override format based on extension if obvious
-        if ext in ['.xlsx', '.xls']:
-            file_format = "EXCEL"
-        
-        if file_format.upper() == "EXCEL":
-            # Excel check
-            # Do NOT force dtype=str for Excel, let it detect Dates correctly
-            df = pd.read_excel(file_path, header=header_row)
-        else:
-            # CSV Default
-            # CSV Default
-            # Try robust auto-detection
-            try:
-                # First try with python engine which supports auto-detect
-                df = pd.read_csv(file_path, sep=None, engine='python', header=header_row, encoding='utf-8', dtype=str)
-            except Exception:
-                # Fallback to standard (sometimes python engine is stricter on quoting)
-                # Try common delimiters
-                try:
-                    df = pd.read_csv(file_path, sep=';', header=header_row, encoding='utf-8', dtype=str)
-                except Exception:
-                    df = pd.read_csv(file_path, sep=',', header=header_row, encoding='utf-8', dtype=str)
-            
-        return df.fillna("")
+        source = open_source(file_path)
+        app_logger.debug(f"Loading file '{file_path}' (Format: {source.format}, Delimiter: {source.delimiter!r})")
+        return source.frame(header_row=header_row, delimiter=delimiter)
     except Exception as e:
         raise Exception(f"File Load Error: {e}")
-
-
-
-
@@ -6,10 +6,13 @@ from config import COLORS, FONTS, FILTER_ALL_OPTION
 class SmartFilterView(ctk.CTkFrame):
     """
     A reusable component that inspects data and creates filters automatically.
+    server_side=True: the callback receives the selections ({field: value}) instead of
+    the locally filtered data, so the owner can re-query with them.
     """
-    def __init__(self, master, on_filter_change_callback, **kwargs):
+    def __init__(self, master, on_filter_change_callback, server_side=False, **kwargs):
         super().__init__(master, fg_color="transparent", **kwargs)
         self.callback = on_filter_change_callback
+        self.server_side = server_side
         self.original_data = [] # List of objects or dicts
         self.filters = {} # key: field_name, value: widget
         self.active_filters = {} # key: field_name, value: current_value
@@ -102,7 +105,8 @@ class SmartFilterView(ctk.CTkFrame):
                 field = col_cfg['field']
                 widget = self.filters.get(field)
                 if widget:
-                    values = self._extract_unique_values(data, field)
+                    # Explicit options win: the loaded data may be a single page
+                    values = col_cfg['options'] if 'options' in col_cfg else self._extract_unique_values(data, field)
                     unique_vals = [FILTER_ALL_OPTION] + sorted(list(values))
                     
                     if isinstance(widget, ctk.CTkComboBox):
@@ -154,6 +158,10 @@ class SmartFilterView(ctk.CTkFrame):
         self._apply_filters()
 
     def _apply_filters(self):
+        if self.server_side:
+            self.callback(dict(self.active_filters))
+            return
+
         filtered = []
         for item in self.original_data:
             match = True
@@ -175,6 +183,6 @@ class SmartFilterView(ctk.CTkFrame):
                 widget.set(FILTER_ALL_OPTION)
             # Clear text entries if implemented
             
-        self.callback(self.original_data)
+        self.callback({} if self.server_side else self.original_data)
 
 
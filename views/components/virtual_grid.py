@@ -0,0 +1,189 @@
+import sys
+import customtkinter as ctk
+
+
+class VirtualGrid(ctk.CTkFrame):
+    """
+    Scrollable list that only renders the rows visible in the viewport.
+    A pool of row widgets (sized to the viewport) is built once and rebound to the
+    items under the scroll position, so sort / filter / paging never create widgets.
+
+    build_row(parent) -> row     creates one empty row widget (once per pool slot)
+    bind_row(row, item, index)   shows 'item' in a pool row; row.item is set before the call
+    key(item)                    optional identity, enables row_of(key) for visible rows
+    """
+
+    def __init__(self, master, build_row, bind_row, key=None, row_height=32,
+                 empty_text="No se encontraron registros.", **kwargs):
+        kwargs.setdefault("fg_color", "white")
+        super().__init__(master, **kwargs)
+        self.build_row = build_row
+        self.bind_row = bind_row
+        self.key = key
+        self.row_height = row_height # Replaced by the measured height of the first row
+        self.empty_text = empty_text
+
+        self.items = []
+        self.first = 0 # Index of the item shown in the first pool row
+        self._pool = []
+        self._shown = 0 # Pool rows currently packed (always a prefix of the pool)
+        self._bound = {} # key -> pool row
+        self._measured = False
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self.body.grid(row=0, column=0, sticky="nsew")
+        self.body.pack_propagate(False) # Viewport size comes from the layout, not from the rows
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.lbl_empty = ctk.CTkLabel(self.body, text=empty_text, text_color="gray")
+
+        self.body.bind("<Configure>", self._on_resize)
+        # Wheel events go to the widget under the pointer: listen globally, filter by ancestry.
+        # The funcids are kept so destroy() removes exactly these handlers.
+        sequences = ("<Button-4>", "<Button-5>") if sys.platform.startswith("linux") else ("<MouseWheel>",)
+        self._wheel_bindings = [(seq, self.bind_all(seq, self._on_wheel, add="+")) for seq in sequences]
+
+    def destroy(self):
+        self._unbind_wheel()
+        super().destroy()
+
+    # --- Public API ---
+    def set_items(self, items, keep_position=False, empty_text=None):
+        """Replaces the dataset (list is referenced, not copied) and rebinds the visible rows."""
+        self.items = items or []
+        if empty_text is not None:
+            self.lbl_empty.configure(text=empty_text)
+        elif not self.items:
+            self.lbl_empty.configure(text=self.empty_text)
+        if not keep_position:
+            self.first = 0
+        self._render()
+
+    def refresh(self):
+        """Rebinds visible rows (e.g. display settings changed, same items)."""
+        self._render()
+
+    def row_of(self, key):
+        """Pool row currently showing the item with this key, or None if not visible."""
+        return self._bound.get(key)
+
+    def scroll_to(self, index):
+        self.first = index
+        self._render()
+
+    # --- Internals ---
+    def _capacity(self):
+        height = self.body.winfo_height()
+        return max(1, height // self.row_height) if height > 1 else 1
+
+    def _max_first(self):
+        return max(0, len(self.items) - self._capacity())
+
+    def _ensure_pool(self):
+        needed = self._capacity() + 1 # +1: partially visible row at the bottom
+        while len(self._pool) < needed:
+            row = self.build_row(self.body)
+            row.item = None
+            self._pool.append(row)
+            if not self._measured:
+                self._measured = True
+                row.pack(fill="x")
+                row.update_idletasks()
+                self.row_height = max(row.winfo_reqheight(), 1)
+                row.pack_forget()
+                needed = self._capacity() + 1
+
+    def _render(self):
+        self._ensure_pool()
+        self.first = min(max(self.first, 0), self._max_first())
+        n = len(self.items)
+
+        if n:
+            self.lbl_empty.place_forget()
+        else:
+            self.lbl_empty.place(relx=0.5, y=20, anchor="n")
+
+        visible = min(len(self._pool), n - self.first)
+        self._bound = {}
+        for i in range(visible):
+            row = self._pool[i]
+            idx = self.first + i
+            item = self.items[idx]
+            row.item = item
+            self.bind_row(row, item, idx)
+            if self.key:
+                self._bound[self.key(item)] = row
+
+        # Keep packing order == pool order: only the tail is ever hidden/shown
+        for row in self._pool[self._shown:visible]:
+            row.pack(fill="x")
+        for row in self._pool[visible:self._shown]:
+            row.pack_forget()
+            row.item = None
+        self._shown = visible
+
+        if n:
+            self.scrollbar.set(self.first / n, min(1.0, (self.first + self._capacity()) / n))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_resize(self, event):
+        self._render()
+
+    def _on_scrollbar(self, *args):
+        if not self.items: return
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.items))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.first += step * (self._capacity() if args[2] == "pages" else 1)
+        self._render()
+
+    def _owns(self, widget):
+        while widget is not None:
+            if widget is self:
+                return True
+            widget = getattr(widget, "master", None)
+        return False
+
+    def _unbind_wheel(self):
+        """Drops this grid's global wheel handlers only (unbind_all would drop every widget's)."""
+        for sequence, funcid in self._wheel_bindings:
+            # Same script surgery as Misc.unbind(seq, funcid) does on Python >= 3.13
+            script = str(self.tk.call("bind", "all", sequence))
+            kept = "\n".join(line for line in script.split("\n") if not line.startswith(f'if {{"[{funcid} '))
+            self.tk.call("bind", "all", sequence, kept if kept.strip() else "")
+            self.deletecommand(funcid)
+        self._wheel_bindings = []
+
+    def _on_wheel(self, event):
+        if not self.winfo_exists() or not self._owns(event.widget):
+            return
+        if event.num == 4: delta = -3
+        elif event.num == 5: delta = 3
+        elif sys.platform == "darwin": delta = -event.delta
+        else: delta = -3 * (event.delta // 120)
+        if delta:
+            self.first += delta
+            self._render()
+
+
+def rebind_treeview(tree, rows):
+    """
+    Shows rows [(values, tags), ...] in a ttk.Treeview reusing its existing items:
+    updates them in place, inserts only the missing ones and deletes the surplus.
+    Row order == insertion order, so tree.index(item) still maps to the source list.
+    """
+    tree.selection_remove(tree.selection())
+    existing = tree.get_children()
+    for iid, (values, tags) in zip(existing, rows):
+        tree.item(iid, values=values, tags=tags)
+    for values, tags in rows[len(existing):]:
+        tree.insert("", "end", values=values, tags=tags)
+    if len(existing) > len(rows):
+        tree.delete(*existing[len(rows):])
@@ -186,11 +186,11 @@ class DashboardView(ctk.CTkFrame):
         self.is_dirty = False
 
         self.lbl_loading.pack(side="left", padx=5)
-        threading.Thread(target=self.fetch_data, daemon=True).start()
+        threading.Thread(target=self.fetch_data, args=(force,), daemon=True).start()
 
-    def fetch_data(self):
+    def fetch_data(self, force=False):
         from controllers.dashboard_controller import DashboardController
-        data = DashboardController().get_executive_summary(currency=self.target_currency, reference_date=self.current_date)
+        data = DashboardController().get_executive_summary(currency=self.target_currency, reference_date=self.current_date, force=force)
         self.after(0, lambda: self.update_ui(data))
 
     def update_ui(self, data):
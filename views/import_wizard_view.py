@@ -1,7 +1,10 @@
 import customtkinter as ctk
 import tkinter as tk
+import threading
+import queue
 from tkinter import filedialog, messagebox, ttk
 from config import COLORS, FONTS
+from utils.import_helper import release_source
 
 class ImportWizardView(ctk.CTkToplevel):
     def __init__(self, parent_view, mode="forex"): # mode: forex | vencimientos
@@ -53,6 +56,10 @@ class ImportWizardView(ctk.CTkToplevel):
         
         self.show_step_1()
 
+    def destroy(self):
+        release_source(self.file_path) # Preview and import shared one read of the file
+        super().destroy()
+
     def clear_content(self):
         for widget in self.content_frame.winfo_children():
             widget.destroy()
@@ -146,6 +153,7 @@ class ImportWizardView(ctk.CTkToplevel):
     def browse_file(self):
         path = filedialog.askopenfilename(filetypes=[("CSV/Excel Files", "*.csv *.xlsx")])
         if path:
+            if self.file_path != path: release_source(self.file_path)
             self.file_path = path
             self.lbl_file.configure(text=path)
             
@@ -186,8 +194,58 @@ class ImportWizardView(ctk.CTkToplevel):
             if ent != "(Detectar Automáticamente)":
                 mapping['entidad'] = ent
 
+        if self.mode == "forex":
+            self._start_background_import(mapping)
+            return
+
         success, msg = self.controller.process_import(self.file_path, mapping)
-        
+        self._finish_import(success, msg)
+
+    # --- BACKGROUND IMPORT (Forex) ---
+
+    def _start_background_import(self, mapping):
+        """Runs the import in a worker thread; the UI polls progress via after()."""
+        self.btn_next.configure(state="disabled")
+        self.configure(cursor="watch")
+
+        self.clear_content()
+        self.lbl_progress = ctk.CTkLabel(self.content_frame, text="Importando...", text_color=COLORS["text_primary"])
+        self.lbl_progress.pack(pady=(60, 10))
+        self.progress_bar = ctk.CTkProgressBar(self.content_frame, width=400)
+        self.progress_bar.set(0)
+        self.progress_bar.pack(pady=10)
+
+        self.import_queue = queue.Queue()
+        threading.Thread(target=self._import_thread, args=(mapping, self.import_queue), daemon=True).start()
+        self.after(100, self._check_import_queue)
+
+    def _import_thread(self, mapping, q):
+        try:
+            def on_progress(done, total):
+                q.put({"status": "progress", "done": done, "total": total})
+            success, msg = self.controller.process_import(self.file_path, mapping, progress_callback=on_progress)
+            q.put({"status": "done", "success": success, "msg": msg})
+        except Exception as e:
+            q.put({"status": "done", "success": False, "msg": str(e)})
+
+    def _check_import_queue(self):
+        try:
+            while True:
+                msg = self.import_queue.get_nowait()
+                if msg["status"] == "progress":
+                    total = msg["total"] or 1
+                    self.progress_bar.set(msg["done"] / total)
+                    self.lbl_progress.configure(text=f"Importando... {msg['done']:,} / {msg['total']:,} filas")
+                else:
+                    self.configure(cursor="")
+                    self.btn_next.configure(state="normal")
+                    self._finish_import(msg["success"], msg["msg"])
+                    return
+        except queue.Empty:
+            # Keep waiting
+            self.after(100, self._check_import_queue)
+
+    def _finish_import(self, success, msg):
         if success:
             messagebox.showinfo("Importación Exitosa", msg)
             self.parent_view.load_data() # Refresh grid
@@ -7,6 +7,7 @@ from services.source_config_service import SourceConfigService
 from views.source_manager_view import SourceManagerView
 from views.record_editor_dialog import RecordEditorDialog
 from views.history_dialog import HistoryDialog
+from views.components.virtual_grid import rebind_treeview
 
 from services.reconciliation_history_service import ReconciliationHistoryService
 
@@ -46,6 +47,10 @@ class ReconciliationView(ctk.CTkFrame):
         
         self.btn_analyze = ctk.CTkButton(self.ctrl_frame, text="🔍 Iniciar Conciliación", command=self.run_analysis, state="disabled", fg_color=COLORS["primary_button_hover"], width=180)
         self.btn_analyze.pack(side="right", padx=20)
+
+        # Greedy (file order) by default; optimal = best overall assignment of payments to bank lines
+        self.chk_optimal = ctk.CTkCheckBox(self.ctrl_frame, text="Asignación óptima", text_color="gray")
+        self.chk_optimal.pack(side="right", padx=5)
         
         # 2. Stats Dashboard
         self.stats_frame = ctk.CTkFrame(self.content, fg_color="transparent")
@@ -396,7 +401,8 @@ class ReconciliationView(ctk.CTkFrame):
         mapping = None # Auto-detect defaults to None
         
         # Call Controller
-        success, report = self.controller.analyze(source_type, self.current_file, mapping)
+        success, report = self.controller.analyze(source_type, self.current_file, mapping,
+                                                  optimal=bool(self.chk_optimal.get()))
         msg.destroy()
         
         if not success:
@@ -408,8 +414,6 @@ class ReconciliationView(ctk.CTkFrame):
         self.btn_commit.configure(state="normal")
         
     def _populate_grid(self, report, source_type):
-        for item in self.tree.get_children(): self.tree.delete(item)
-        
         # Update Headings based on Source (Keep Sort Bindings)
         # We need to re-apply text but keep the command? Or just re-declare. 
         # Re-declaring forces logic again.
@@ -439,6 +443,7 @@ class ReconciliationView(ctk.CTkFrame):
              self.tree.heading("col2", command=lambda: self._sort_column("smart_desc", "col2"))
 
         n_match, n_new, n_conflict = 0, 0, 0
+        rows = []
         
         for r in report:
             status = r['status']
@@ -473,7 +478,10 @@ class ReconciliationView(ctk.CTkFrame):
             if "NO" in status: tag = "NEW"
             elif "DIFERENCIA" in status or "CONFLICTO" in status: tag = "CONFLICT"
             
-            self.tree.insert("", "end", values=(fecha, col2, status, col4, col5, action), tags=(tag,))
+            rows.append(((fecha, col2, status, col4, col5, action), (tag,)))
+
+        # Treeview items are recycled (updated in place) instead of deleted and re-inserted
+        rebind_treeview(self.tree, rows)
             
         # Update Cards
         # (Assuming _create_card returned the label widget inside? No, it returned the frame?)
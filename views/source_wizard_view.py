@@ -1,8 +1,7 @@
 
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-import pandas as pd
-import csv
+from utils.import_helper import open_source, release_source
 from config import COLORS, FONTS
 from services.source_config_service import SourceConfigService
 
@@ -23,6 +22,7 @@ class SourceWizardView(ctk.CTkToplevel):
 
         # State
         self.file_path = None
+        self.source = None # utils.import_helper.SourceFile of the sample
         self.raw_lines = []
         self.delimiter = ";"
         self.header_row = 0
@@ -50,6 +50,10 @@ class SourceWizardView(ctk.CTkToplevel):
         
         self.show_step_1()
 
+    def destroy(self):
+        release_source(self.file_path) # End of the wizard session: drop the cached file
+        super().destroy()
+
 # ... (skipping to go_next)
 
     def go_next(self):
@@ -72,15 +76,8 @@ class SourceWizardView(ctk.CTkToplevel):
             h = int(self.entry_header.get())
             self.header_row = h
             
-            import os
-            ext = os.path.splitext(self.file_path)[1].lower() if self.file_path else ".csv"
-            
-            if ext in ['.xlsx', '.xls']:
-                # Excel
-                self.df = pd.read_excel(self.file_path, sheet_name=self.sheet_name, header=self.header_row, nrows=10)
-            else:
-                # CSV
-                self.df = pd.read_csv(self.file_path, sep=self.delimiter, header=self.header_row, nrows=10, encoding='utf-8')
+            # Parsed from the file read in step 1 (cached per header row)
+            self.df = self.source.frame(header_row=self.header_row, sheet_name=self.sheet_name, delimiter=self.delimiter).head(10)
             
             # Clean Columns
             self.df.columns = [str(c).strip() for c in self.df.columns]
@@ -138,21 +135,21 @@ class SourceWizardView(ctk.CTkToplevel):
     def load_file(self):
         path = filedialog.askopenfilename(filetypes=[("Data Files", "*.csv;*.xlsx;*.xls"), ("CSV", "*.csv"), ("Excel", "*.xlsx;*.xls")])
         if not path: return
+        if self.file_path != path: release_source(self.file_path) # Previous sample
         self.file_path = path
         self.sheet_name = 0 # Default
         
-        # Detect Type
+        # One read: format, delimiter and sheets come from the same buffer (kept while the wizard is open)
         import os
-        ext = os.path.splitext(path)[1].lower()
         
         try:
+            self.source = open_source(path)
             preview_text = ""
             info_text = f"Archivo: {os.path.basename(path)}\n"
             
-            if ext in ['.xlsx', '.xls']:
+            if self.source.is_excel:
                 # EXCEL FLOW
-                xls = pd.ExcelFile(path)
-                sheets = xls.sheet_names
+                sheets = self.source.sheet_names
                 
                 info_text += f"Formato: Excel ({len(sheets)} Hojas)"
                 
@@ -166,7 +163,7 @@ class SourceWizardView(ctk.CTkToplevel):
                     self.sheet_name = sheets[0]
                     
                 # Preview
-                df = pd.read_excel(path, sheet_name=self.sheet_name, nrows=10, header=None)
+                df = self.source.frame(header_row=None, sheet_name=self.sheet_name).head(10)
                 preview_text = df.to_string()
                 
             else:
@@ -174,20 +171,9 @@ class SourceWizardView(ctk.CTkToplevel):
                 self.frame_sheet.pack_forget()
                 self.sheet_name = 0
                 
-                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                    sample = f.read(2048)
-                    sniffer = csv.Sniffer()
-                    try: dialect = sniffer.sniff(sample)
-                    except: dialect = None
-                    
-                    self.delimiter = dialect.delimiter if dialect else ';'
-                    if '\t' in sample and self.delimiter not in sample: self.delimiter = '\t'
-                    
-                    info_text += f"Delimitador Detectado: '{self.delimiter}'"
-                    
-                    f.seek(0)
-                    lines = [next(f) for _ in range(10)]
-                    preview_text = "".join(lines)
+                self.delimiter = self.source.delimiter or ';'
+                info_text += f"Delimitador Detectado: '{self.delimiter}'"
+                preview_text = "\n".join(self.source.sample_lines(10))
 
             self.lbl_file_info.configure(text=info_text)
             self.txt_preview.delete("1.0", "end")
@@ -202,7 +188,7 @@ class SourceWizardView(ctk.CTkToplevel):
         if not self.file_path: return
         self.sheet_name = choice
         try:
-            df = pd.read_excel(self.file_path, sheet_name=self.sheet_name, nrows=10, header=None)
+            df = self.source.frame(header_row=None, sheet_name=self.sheet_name).head(10)
             self.txt_preview.delete("1.0", "end")
             self.txt_preview.insert("1.0", df.to_string())
         except Exception as e:
@@ -238,15 +224,8 @@ class SourceWizardView(ctk.CTkToplevel):
             h = int(self.entry_header.get())
             self.header_row = h
             
-            import os
-            ext = os.path.splitext(self.file_path)[1].lower() if self.file_path else ".csv"
-            
-            if ext in ['.xlsx', '.xls']:
-                # Excel
-                self.df = pd.read_excel(self.file_path, sheet_name=self.sheet_name, header=self.header_row, nrows=10)
-            else:
-                # CSV
-                self.df = pd.read_csv(self.file_path, sep=self.delimiter, header=self.header_row, nrows=10, encoding='utf-8')
+            # Parsed from the file read in step 1 (cached per header row)
+            self.df = self.source.frame(header_row=self.header_row, sheet_name=self.sheet_name, delimiter=self.delimiter).head(10)
                 
             cols = list(self.df.columns)
             self.lbl_columns.configure(text=f"Columnas Detectadas ({len(cols)}): {', '.join(map(str, cols[:5]))}...")
@@ -326,9 +305,7 @@ class SourceWizardView(ctk.CTkToplevel):
             if val != "(Ignorar)":
                 final_mapping[k] = val
         
-        import os
-        ext = os.path.splitext(self.file_path)[1].lower() if self.file_path else ".csv"
-        fmt = "XLSX" if ext in ['.xlsx', '.xls'] else "CSV"
+        fmt = "XLSX" if self.source and self.source.is_excel else "CSV"
         
         config = {
             "name": name,
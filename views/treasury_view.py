@@ -8,6 +8,7 @@ from services.catalogs_service import CatalogService
 from services.period_service import PeriodService
 from utils.gui_helpers import create_header
 from tkcalendar import DateEntry
+from .components.virtual_grid import VirtualGrid
 
 class TreasuryView(ctk.CTkFrame):
     def __init__(self, master):
@@ -136,7 +137,7 @@ class TreasuryView(ctk.CTkFrame):
         ]
         
         for idx, (display, key, weight) in enumerate(self.cols_config):
-            self.headers_frame.grid_columnconfigure(idx, weight=weight)
+            self.headers_frame.grid_columnconfigure(idx, weight=weight, uniform="cols") # Same ratios as the rows
             # Make header clickable for sort
             # Align header right for Monto
             h_anchor = "e" if key == "monto" else "w"
@@ -148,12 +149,10 @@ class TreasuryView(ctk.CTkFrame):
             btn.grid(row=0, column=idx, sticky="ew", padx=2)
             self.header_buttons[key] = btn # Store ref
             
-        # Scrollable Content
-        self.scroll_frame = ctk.CTkScrollableFrame(self, fg_color=COLORS["content_surface"])
-        self.scroll_frame.pack(fill="both", expand=True, padx=20, pady=5)
-        
-        for idx, (_, _, weight) in enumerate(self.cols_config):
-             self.scroll_frame.grid_columnconfigure(idx, weight=weight)
+        # Scrollable Content (virtualized: pooled rows rebound on scroll/sort)
+        self.grid_view = VirtualGrid(self, build_row=self.build_row, bind_row=self.render_row,
+                                     empty_text="", fg_color=COLORS["content_surface"])
+        self.grid_view.pack(fill="both", expand=True, padx=20, pady=5)
 
         # Start Load
         self.after(100, self.load_data)
@@ -269,11 +268,7 @@ class TreasuryView(ctk.CTkFrame):
             messagebox.showerror("Error", f"Fallo al exportar PDF: {e}")
 
     def load_data(self):
-        # 1. Clear Grid
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-            
-        # 2. Get Dates & Filters
+        # 1. Get Dates & Filters
         try:
             d_start = self.date_from.get_date()
             d_end = self.date_to.get_date()
@@ -315,9 +310,8 @@ class TreasuryView(ctk.CTkFrame):
                 
         except Exception as e:
             print(f"Error loading treasury: {e}")
-            # Ensure scroll_frame exists roughly even if error, but here it failed because it didn't exist
-            if hasattr(self, 'scroll_frame'):
-                ctk.CTkLabel(self.scroll_frame, text=f"Error: {e}").pack()
+            if hasattr(self, 'grid_view'):
+                self.grid_view.set_items([], empty_text=f"Error: {e}")
 
     def on_switch_toggle(self):
         # Re-render without fetching
@@ -346,11 +340,8 @@ class TreasuryView(ctk.CTkFrame):
                 btn.configure(text=display_name, text_color="black")
 
     def apply_sort(self):
-        # Clear
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-            
         if not self.movements_cache:
+            self.grid_view.set_items([])
             return
 
         # Sort in place
@@ -364,11 +355,20 @@ class TreasuryView(ctk.CTkFrame):
             return val
             
         self.movements_cache.sort(key=get_sort_val, reverse=self.sort_desc)
-        
-        for idx, mov in enumerate(self.movements_cache):
-            self.render_row(idx, mov)
+        self.grid_view.set_items(self.movements_cache)
 
-    def render_row(self, idx, item):
+    def build_row(self, parent):
+        row = ctk.CTkFrame(parent, fg_color="transparent", corner_radius=0)
+        row.labels = []
+        for col_idx, (_, key, weight) in enumerate(self.cols_config):
+             row.grid_columnconfigure(col_idx, weight=weight, uniform="cols")
+             # Align Monto Right (Index 5)
+             label = ctk.CTkLabel(row, text="", anchor="e" if key == "monto" else "w", text_color="black")
+             label.grid(row=0, column=col_idx, sticky="ew", padx=2, pady=2)
+             row.labels.append(label)
+        return row
+
+    def render_row(self, row, item, idx):
         # Format Date
         d = item["fecha"]
         date_str = d.strftime("%d/%m/%Y") if d else ""
@@ -381,8 +381,8 @@ class TreasuryView(ctk.CTkFrame):
              amount_str = f"{item['monto']:,.2f}"
              curr_str = item["moneda"]
 
-        # Create Row widgets
-        row_widgets = [
+        # Bind Row widgets
+        row_values = [
             date_str,
             item["tipo"],
             item["categoria"],
@@ -393,13 +393,10 @@ class TreasuryView(ctk.CTkFrame):
             # Removed Medio Pago
         ]
         
-        for col_idx, text in enumerate(row_widgets):
-             # Align Monto Right (Index 5)
-             align = "e" if col_idx == 5 else "w"
-             
-             label = ctk.CTkLabel(self.scroll_frame, text=text, anchor=align, text_color="black")
-             label.grid(row=idx, column=col_idx, sticky="ew", padx=2, pady=2)
-             
+        for col_idx, text in enumerate(row_values):
+             label = row.labels[col_idx]
              if col_idx == 1: # Tipo Color
-                 if text == "EGRESO": label.configure(text_color=COLORS["status_overdue"])
-                 else: label.configure(text_color=COLORS["status_paid"])
+                 color = COLORS["status_overdue"] if text == "EGRESO" else COLORS["status_paid"]
+                 label.configure(text=text, text_color=color)
+             else:
+                 label.configure(text=text)
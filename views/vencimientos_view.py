@@ -13,6 +13,7 @@ from config import COLORS, FONTS
 from utils.exceptions import BaseAppError, PeriodLockedError
 from .components.smart_filter_view import SmartFilterView 
 from .components.time_navigator import TimeNavigatorView
+from .components.virtual_grid import VirtualGrid
 from services.period_service import PeriodService
 from utils.format_helper import parse_localized_float, parse_fuzzy_date
 from services.vencimiento_service import VencimientoService
@@ -88,9 +89,17 @@ class VencimientosView(ctk.CTkFrame):
         self.time_navigator = TimeNavigatorView(self.filter_bar, on_change_command=self.on_period_change)
         self.time_navigator.pack(side="left", padx=(0, 15))
 
-        self.smart_filter = SmartFilterView(self.filter_bar, on_filter_change_callback=self.on_filtered_data_update)
+        # Filters are applied by the server query (all pages), not on the loaded page
+        self.smart_filter = SmartFilterView(self.filter_bar, on_filter_change_callback=self.on_filter_change, server_side=True)
         self.smart_filter.pack(side="left")
 
+        # Free text over proveedor / inmueble / nro. de cliente (shared search index, server side)
+        self.entry_search = ctk.CTkEntry(self.filter_bar, placeholder_text="🔍 Buscar proveedor, inmueble o nro. cliente...", width=280)
+        self.entry_search.pack(side="left", padx=10, pady=(14, 0))
+        self.entry_search.bind("<KeyRelease>", self.on_search_change)
+        self.search_text = ""
+        self._search_job = None
+
         self.readonly_mode = False
         self.period_warning = False
         self.master_dataset = [] 
@@ -100,6 +109,9 @@ class VencimientosView(ctk.CTkFrame):
         self.is_dirty = True
         self.last_loaded_period = None 
         self.last_loaded_page = None # NEW: Track page for lazy loading 
+        self.last_loaded_query = None # (filters, sort, search) of the loaded page
+        self.filter_selection = {} # SmartFilter field -> selected value
+        self._catalog_ids = {"inmueble_alias": {}, "proveedor_nombre": {}} # Filter option -> catalog id
 
         # --- Content Area (Row 2) ---
         from tkinter import PanedWindow
@@ -115,7 +127,7 @@ class VencimientosView(ctk.CTkFrame):
 
 
         self.sort_col = "fecha_vencimiento"
-        self.sort_desc = False
+        self.sort_desc = True # Server default: latest first
 
         
         # Grid Headers
@@ -128,8 +140,8 @@ class VencimientosView(ctk.CTkFrame):
         headers = [
             ("", None, 0, "center"), # Icon 1
             ("", None, 1, "center"), # Icon 2
-            ("Inmueble", "obligacion.inmueble.alias", 2, "w"), 
-            ("Proveedor", "obligacion.proveedor.nombre_entidad", 3, "w"), 
+            ("Inmueble", "inmueble_alias", 2, "w"), 
+            ("Proveedor", "proveedor_nombre", 3, "w"), 
             ("Vencimiento", "fecha_vencimiento", 4, "center"), 
             ("Monto", "monto_original", 5, "w"), 
             ("Estado", "estado", 6, "w")
@@ -180,8 +192,10 @@ class VencimientosView(ctk.CTkFrame):
         self._update_header_arrows() # Initial update
 
         # Scroll List
-        self.scroll_frame = ctk.CTkScrollableFrame(self.left_panel, label_text="", fg_color="white") 
-        self.scroll_frame.grid(row=1, column=0, sticky="nsew")
+        # Virtualized: a pool of row widgets sized to the viewport is rebound on scroll/sort/filter
+        self.grid_view = VirtualGrid(self.left_panel, build_row=self._build_grid_row, bind_row=self._bind_grid_row,
+                                     key=lambda v: v.id, fg_color="white")
+        self.grid_view.grid(row=1, column=0, sticky="nsew")
         
         # Same column config will be applied per Row, not here.
 
@@ -222,6 +236,8 @@ class VencimientosView(ctk.CTkFrame):
         self.current_page = 1
         self.page_limit = 50
         self.total_records = 0
+        self.page_cursor = None # Keyset: None (first page), ("after" | "before", (fecha, id))
+        self.page_bounds = None # (fecha, id) of the first / last row of the loaded page
         self.current_period_id = None
 
         # Pagination UI
@@ -270,21 +286,18 @@ class VencimientosView(ctk.CTkFrame):
 
     def select_item(self, vencimiento):
         # 0. Restore Style of previous selection
-        if self.current_vencimiento and self.current_vencimiento.id in self.row_widgets:
-            old_frame = self.row_widgets[self.current_vencimiento.id]
-            # Recalculate Zebra color for old row
-            # We need the index. But storing index is messy.
-            # Simpler: Just check if it exists in current dataset and get index?
-            # Or store origin color in the frame object?
-            if hasattr(old_frame, "default_bg"):
-                old_frame.configure(fg_color=old_frame.default_bg)
+        old_frame = self.grid_view.row_of(self.current_vencimiento.id) if self.current_vencimiento else None
+        if old_frame is not None and hasattr(old_frame, "default_bg"):
+            old_frame.configure(fg_color=old_frame.default_bg)
+            old_frame.shown["bg"] = old_frame.default_bg
         
         self.current_vencimiento = vencimiento
         
         # 1. Highlight New Selection
-        if vencimiento.id in self.row_widgets:
-            new_frame = self.row_widgets[vencimiento.id]
+        new_frame = self.grid_view.row_of(vencimiento.id)
+        if new_frame is not None:
             new_frame.configure(fg_color="#D5D8DC") # Highlight Color (Light Grey)
+            new_frame.shown["bg"] = "#D5D8DC"
             
         self.render_preview(vencimiento)
 
@@ -302,9 +315,10 @@ class VencimientosView(ctk.CTkFrame):
         self.lbl_preview = ctk.CTkLabel(self.preview_card, text="Cargando...", font=FONTS["body"], text_color="gray50")
         self.lbl_preview.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
 
-        self.lbl_doc_info.configure(text=f"Doc: {vencimiento.ruta_archivo_pdf or 'No adjunto'}")
+        doc_label = vencimiento.ruta_archivo_pdf or (f"Documento #{vencimiento.documento_id}" if vencimiento.documento_id else None)
+        self.lbl_doc_info.configure(text=f"Doc: {doc_label or 'No adjunto'}")
 
-        if not vencimiento.ruta_archivo_pdf:
+        if not vencimiento.ruta_archivo_pdf and not vencimiento.documento_id:
             self.lbl_preview.configure(text="Sin comprobante adjunto.\n\nUse 'Importar' para vincular uno.")
             return
         
@@ -316,12 +330,20 @@ class VencimientosView(ctk.CTkFrame):
         from PIL import Image
 
         try:
-            full_path = os.path.join(DOCS_DIR, vencimiento.ruta_archivo_pdf)
-            if not os.path.exists(full_path):
-                self.lbl_preview.configure(text="Archivo no encontrado en disco.", text_color="red")
-                return
-
-            doc = fitz.open(full_path)
+            if vencimiento.ruta_archivo_pdf:
+                full_path = os.path.join(DOCS_DIR, vencimiento.ruta_archivo_pdf)
+                if not os.path.exists(full_path):
+                    self.lbl_preview.configure(text="Archivo no encontrado en disco.", text_color="red")
+                    return
+                doc = fitz.open(full_path)
+            else:
+                # Stored document (no local copy): render from the document store bytes
+                file_data, filename, _ = VencimientoService().get_document(vencimiento.documento_id)
+                if not file_data:
+                    self.lbl_preview.configure(text="Documento no encontrado en la base de datos.", text_color="red")
+                    return
+                ext = os.path.splitext(filename or "")[1].lstrip(".") or "pdf"
+                doc = fitz.open(stream=file_data, filetype=ext)
             page = doc.load_page(0) 
             
             # Reduce zoom slightly to avoid huge textures
@@ -343,6 +365,10 @@ class VencimientosView(ctk.CTkFrame):
     def load_data(self, period_id=None, force=True):
         # 1. Resolve Period ID on Main Thread
         if period_id:
+            if period_id != self.current_period_id:
+                # Cursor belongs to the previous period
+                self.current_page = 1
+                self.page_cursor = None
             self.current_period_id = period_id
         
         # Fallback: If current_period_id is None (startup race condition), derive from navigator
@@ -359,10 +385,11 @@ class VencimientosView(ctk.CTkFrame):
              try: self.master.mark_dashboard_dirty() 
              except: pass
         
-        # Lazy Load Check (Period AND Page)
+        # Lazy Load Check (Period, Page, Filters AND Sort)
         params_match = (
             self.current_period_id == self.last_loaded_period and 
-            self.current_page == self.last_loaded_page
+            self.current_page == self.last_loaded_page and
+            self._query_state() == self.last_loaded_query
         )
         if not force and not self.is_dirty and params_match:
             app_logger.info(f"Skipping load for {self.current_period_id} p{self.current_page} (Data fresh)")
@@ -375,9 +402,27 @@ class VencimientosView(ctk.CTkFrame):
         
         # 2. Spawn Thread
         threading.Thread(target=self._perform_load_background, 
-                         args=(self.current_period_id, self.current_page, self.page_limit), 
+                         args=(self.current_period_id, self.current_page, self.page_limit, self.page_cursor,
+                               self._query_state()), 
                          daemon=True).start()
 
+    def _query_state(self):
+        """Server-side filters + sort of the grid (hashable, compared on load)."""
+        return (tuple(sorted(self.filter_selection.items())), self.sort_col, self.sort_desc, self.search_text)
+
+    def _query_kwargs(self, query):
+        """Maps the SmartFilter selections (names) to repository filters (catalog ids / estado)."""
+        filters, sort_col, sort_desc, search = query
+        filters = dict(filters)
+        kwargs = {"sort_col": sort_col, "sort_desc": sort_desc, "search": search or None}
+        if "inmueble_alias" in filters:
+            kwargs["inmueble_id"] = self._catalog_ids["inmueble_alias"].get(filters["inmueble_alias"], -1)
+        if "proveedor_nombre" in filters:
+            kwargs["proveedor_id"] = self._catalog_ids["proveedor_nombre"].get(filters["proveedor_nombre"], -1)
+        if "estado" in filters:
+            kwargs["estado"] = filters["estado"]
+        return kwargs
+
     def mark_dirty(self):
         """Call this when data changes (Add/Edit/Delete)"""
         self.is_dirty = True
@@ -386,21 +431,26 @@ class VencimientosView(ctk.CTkFrame):
         """Explicit User Refresh"""
         self.load_data(force=True)
 
-    def _perform_load_background(self, period_id, page, limit):
+    def _perform_load_background(self, period_id, page, limit, cursor=None, query=((), "fecha_vencimiento", True, "")):
         try:
             from controllers.catalogs_controller import CatalogsController # Import here to avoid circular dep if any
             
             # DB calls (Running in background)
-            records, total = VencimientosController().get_all_vencimientos(
+            direction, key = cursor or (None, None)
+            # Flat VencimientoRow projections, filtered and sorted by the query (all pages)
+            records, total = VencimientosController().get_grid_rows(
                 period_id=period_id,
                 page=page,
-                limit=limit
+                limit=limit,
+                after=key if direction == "after" else None,
+                before=key if direction == "before" else None,
+                **self._query_kwargs(query)
             )
             
             # Fetch Catalogs
             cat_ctrl = CatalogsController()
-            inmuebles = [i.alias for i in cat_ctrl.get_inmuebles()]
-            proveedores = [p.nombre_entidad for p in cat_ctrl.get_proveedores()]
+            inmuebles = {i.alias: i.id for i in cat_ctrl.get_inmuebles()}
+            proveedores = {p.nombre_entidad: p.id for p in cat_ctrl.get_proveedores()}
             estados = [e.value for e in EstadoVencimiento]
             
             app_logger.info(f"Background Load {period_id}: Fetched {total} records.")
@@ -411,7 +461,8 @@ class VencimientosView(ctk.CTkFrame):
                 "inmuebles": inmuebles, 
                 "proveedores": proveedores,
                 "estados": estados,
-                "period_id": period_id
+                "period_id": period_id,
+                "query": query
             }
             # Schedule UI Update on Main Thread
             self.after(0, lambda: self._on_data_loaded(result))
@@ -425,7 +476,7 @@ class VencimientosView(ctk.CTkFrame):
 
     def _on_data_loaded(self, r):
         # Race Condition Guard: If view moved on, discard old data
-        if r["period_id"] != self.current_period_id:
+        if r["period_id"] != self.current_period_id or r["query"] != self._query_state():
             app_logger.info(f"Discarding stale data for {r['period_id']} (Current: {self.current_period_id})")
             return
 
@@ -433,28 +484,32 @@ class VencimientosView(ctk.CTkFrame):
         self.last_loaded_period = r["period_id"]
         # Use current page as we are on UI thread and it initiated the request (simplification)
         self.last_loaded_page = self.current_page 
+        self.last_loaded_query = r["query"]
         self.is_dirty = False
         
         # Unpack result
         records = r["records"]
         self.total_records = r["total"]
         self.master_dataset = records 
+        # Keyset cursor follows the active sort: (sort value, id)
+        self.page_bounds = (
+            (getattr(records[0], self.sort_col), records[0].id),
+            (getattr(records[-1], self.sort_col), records[-1].id)
+        ) if records else None
+        self._catalog_ids = {"inmueble_alias": r["inmuebles"], "proveedor_nombre": r["proveedores"]}
         
         # Filter Config
         filter_config = [
-            {'field': 'obligacion.inmueble.alias', 'type': 'category', 'label': 'Inmueble', 'options': r["inmuebles"]},
-            {'field': 'obligacion.proveedor.nombre_entidad', 'type': 'category', 'label': 'Proveedor', 'options': r["proveedores"]},
+            {'field': 'inmueble_alias', 'type': 'category', 'label': 'Inmueble', 'options': list(r["inmuebles"])},
+            {'field': 'proveedor_nombre', 'type': 'category', 'label': 'Proveedor', 'options': list(r["proveedores"])},
             {'field': 'estado', 'type': 'category', 'label': 'Estado', 'options': r["estados"]}
         ]
         
-        # Update Smart Filter
+        # Update Smart Filter (options only: selections are already applied by the query)
         self.smart_filter.set_data(records, filter_config)
         
-        # Re-Apply Filters Logic
-        if self.smart_filter.active_filters:
-             self.smart_filter._apply_filters()
-        else:
-             self.on_filtered_data_update(records)
+        self.current_dataset = records
+        self.render_grid(records)
         
         self.update_pagination_ui()
         
@@ -541,13 +596,19 @@ class VencimientosView(ctk.CTkFrame):
     def prev_page(self):
         if self.current_page > 1:
             self.current_page -= 1
+            # Seek back from the first row on screen (page 1 is always the plain head)
+            if self.current_page == 1 or not self.page_bounds:
+                self.page_cursor = None
+            else:
+                self.page_cursor = ("before", self.page_bounds[0])
             self.load_data()
 
     def next_page(self):
         import math
         max_page = math.ceil(self.total_records / self.page_limit)
-        if self.current_page < max_page:
+        if self.current_page < max_page and self.page_bounds:
             self.current_page += 1
+            self.page_cursor = ("after", self.page_bounds[1])
             self.load_data()
 
     def update_pagination_ui(self):
@@ -575,8 +636,10 @@ class VencimientosView(ctk.CTkFrame):
             self.sort_desc = False 
             if col_field in ["monto_original", "estado"]: self.sort_desc = True # Default desc for these
             
-        self.apply_sort()
         self._update_header_arrows() # Update visual arrows
+        # ORDER BY runs on the server over the whole period: restart from the first page
+        self._reset_paging()
+        self.load_data(force=False)
 
     def _update_header_arrows(self):
         """Updates header labels to show sort arrow"""
@@ -587,46 +650,30 @@ class VencimientosView(ctk.CTkFrame):
             else:
                 lbl.configure(text=original_text)
 
-    def apply_sort(self):
-        if self.current_dataset is None: return
-        if not self.current_dataset:
-             self.render_grid([])
-             return
-        
-        def get_val(obj, path):
-             try:
-                 parts = path.split(".")
-                 v = obj
-                 for p in parts: v = getattr(v, p)
-                 
-                 # Handle Enums
-                 if hasattr(v, 'value'): return v.value
-                 return v
-             except: return None
-
-        # Safe Sort Key Wrapper
-        # ... logic inline ...
+    def on_filter_change(self, selection):
+        """SmartFilter selections ({field: value}) -> new server query from page 1."""
+        self.filter_selection = selection
+        self._reset_paging()
+        self.load_data(force=False)
+
+    def on_search_change(self, event=None):
+        """Debounced: re-queries once typing pauses."""
+        if self._search_job:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(300, self._apply_search)
+
+    def _apply_search(self):
+        self._search_job = None
+        text = self.entry_search.get().strip()
+        if text == self.search_text:
+            return
+        self.search_text = text
+        self._reset_paging()
+        self.load_data(force=False)
 
-        try:
-             # Sort using tuple (is_none, value) to handle None types safely
-             # NOTE: value comparison must support the type (e.g. str vs str, int vs float)
-             # Vencimiento objects should have consistent types for same columns.
-             self.current_dataset.sort(
-                 key=lambda x: (get_val(x, self.sort_col) is None, get_val(x, self.sort_col)), 
-                 reverse=self.sort_desc
-             )
-             self.render_grid(self.current_dataset)
-        except Exception as e:
-             messagebox.showerror("Error Ordenamiento", f"No se pudo ordenar por {self.sort_col}:\n{e}")
-             app_logger.error(f"SORT ERROR: {e}")
-
-    def on_filtered_data_update(self, filtered_data):
-        self.current_dataset = filtered_data
-        # Apply current sort to new data
-        if self.sort_col:
-             self.apply_sort() # This calls render_grid
-        else:
-             self.render_grid(filtered_data)
+    def _reset_paging(self):
+        self.current_page = 1
+        self.page_cursor = None
 
     def on_period_change(self, target_date):
         # 1. Update internal Period ID for Server Side Fetch
@@ -635,6 +682,7 @@ class VencimientosView(ctk.CTkFrame):
         # Reset Page when changing Month
         if pid != self.current_period_id:
             self.current_page = 1
+            self.page_cursor = None
             
         self.current_period_id = pid
 
@@ -693,168 +741,126 @@ class VencimientosView(ctk.CTkFrame):
 
 
     def render_grid(self, vencimientos):
-        # try: removed to fix syntax
         total_items = len(vencimientos) if vencimientos else 0
         app_logger.info(f"Rendering Grid with {total_items} items.")
-        
-        # Limpiar
-        count_removed = 0
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-            count_removed += 1
-        
-        # app_logger.debug(f"Cleared {count_removed} old widgets.")
-        
-        self.row_widgets = {} # Reset map
-        
-        # Force UI update to prevent ghost artifacts
-        self.update_idletasks()
-
-        if not vencimientos:
-            ctk.CTkLabel(self.scroll_frame, text="No se encontraron registros.", text_color="gray").pack(pady=20)
-            self.lbl_pending_total.configure(text="Total Pendiente: $0.00")
-            return
 
         # --- Currency Logic ---
         rate = 1.0
         currency_symbol = "$"
         
-        if self.show_in_usd:
+        if self.show_in_usd and vencimientos:
             try:
                 rate = self.controller.get_usd_rate()
                 currency_symbol = "USD"
             except:
                 rate = 1.0 # Fallback
         
-        # Helper for conversion
+        # Helper for conversion (used by _bind_grid_row)
         def format_amount(val):
             if self.show_in_usd and rate > 0:
                 converted = parse_localized_float(val) / rate
                 return f"{currency_symbol} {format_currency(converted)}"
             else:
                 return f"${format_currency(val)}"
+        self._format_amount = format_amount
 
         # Calculate Pending Total
-        total_pending_ars = sum(v.monto_original for v in vencimientos if v.estado == EstadoVencimiento.PENDIENTE or str(v.estado) == "Pendiente")
+        total_pending_ars = sum(v.monto_original for v in (vencimientos or []) if v.estado == EstadoVencimiento.PENDIENTE or str(v.estado) == "Pendiente")
         
         # Update Total Label
         self.lbl_pending_total.configure(text=f"Total Pendiente: {format_amount(total_pending_ars)}")
 
-        for idx, ven in enumerate(vencimientos, start=0): # 0-indexed for modulo
-            try:
-                # Zebra Logic
-                bg_color = COLORS["content_surface"] if idx % 2 == 0 else "#F4F6F7" # Cloud White alternate
-                
-                row = ctk.CTkFrame(self.scroll_frame, fg_color=bg_color, corner_radius=0)
-                row.pack(fill="x", ipady=2)
-                row.default_bg = bg_color # Crucial for selection restoration
-            
-                # Allow click on row to select
-                row.bind("<Button-1>", lambda e, v=ven: self.select_item(v))
-                row.bind("<Button-3>", lambda e, v=ven: self.show_context_menu(e, v))
-                
-                # ... COLUMNS Rendering ...
-                # Reuse logic to keep display consistent
-                # We must recreate the columns manually or call a helper?
-                # Inline for now as we did before.
-                
-                # --- ROW CONTENT (Same as before) ---
-                # Icon 1: PDF (Factura)
-                if ven.ruta_archivo_pdf or ven.documento_id:
-                     l1 = ctk.CTkLabel(row, text="📄", width=27, cursor="hand2", text_color=COLORS["primary_button"])
-                     l1.grid(row=0, column=0, sticky="ew")
-                     l1.bind("<Button-1>", lambda e, v=ven: self.open_pdf_viewer(v))
-                     l1.bind("<Button-3>", lambda e, v=ven: self.show_context_menu(e, v))
-                else:
-                     l_empty1 = ctk.CTkLabel(row, text="", width=27)
-                     l_empty1.grid(row=0, column=0, sticky="ew")
-                     l_empty1.bind("<Button-3>", lambda e, v=ven: self.show_context_menu(e, v))
-                     l_empty1.bind("<Button-1>", lambda e, v=ven: self.select_item(v))
-                
-                # Icon 2: Pago
-                if ven.ruta_comprobante_pago or ven.comprobante_pago_id:
-                     l2 = ctk.CTkLabel(row, text="💲", width=27, cursor="hand2", text_color=COLORS["status_paid"])
-                     l2.grid(row=0, column=1, sticky="ew")
-                     l2.bind("<Button-1>", lambda e, v=ven: self._safe_open_payment(v))
-                     l2.bind("<Button-3>", lambda e, v=ven: self.show_context_menu(e, v))
-                else:
-                     l_empty2 = ctk.CTkLabel(row, text="", width=27)
-                     l_empty2.grid(row=0, column=1, sticky="ew")
-                     l_empty2.bind("<Button-3>", lambda e, v=ven: self.show_context_menu(e, v))
-                     l_empty2.bind("<Button-1>", lambda e, v=ven: self.select_item(v))
-    
-                # Inmueble
-                inm_alias = ven.obligacion.inmueble.alias if ven.obligacion.inmueble else "N/A"
-                l_inm = ctk.CTkLabel(row, text=inm_alias, anchor="w", font=("Segoe UI", 12))
-                l_inm.grid(row=0, column=2, sticky="ew", padx=(10, 2))
-                l_inm.bind("<Button-1>", lambda e, v=ven: self.select_item(v))
-                l_inm.bind("<Button-3>", lambda e, v=ven: self.show_context_menu(e, v))
-                
-                # Proveedor
-                prov_name = ven.obligacion.proveedor.nombre_entidad if ven.obligacion.proveedor else "N/A"
-                l_prov = ctk.CTkLabel(row, text=prov_name, anchor="w", font=("Segoe UI", 12))
-                l_prov.grid(row=0, column=3, sticky="ew", padx=(10, 2))
-                l_prov.bind("<Button-1>", lambda e, v=ven: self.select_item(v))
-                l_prov.bind("<Button-3>", lambda e, v=ven: self.show_context_menu(e, v))
-                
-                # Fecha
-                f_str = ven.fecha_vencimiento.strftime("%d/%m/%Y")
-                l_date = ctk.CTkLabel(row, text=f_str, anchor="center", font=("Segoe UI", 12))
-                l_date.grid(row=0, column=4, sticky="ew")
-                l_date.bind("<Button-1>", lambda e, v=ven: self.select_item(v))
-                l_date.bind("<Button-3>", lambda e, v=ven: self.show_context_menu(e, v))
-                
-                # Monto (CONVERTED)
-                # Monto (Logic: Show Updated > Original, or Total Paid if status is Paid)
-                final_monto = ven.monto_original
-                
-    
-                
-                # If strictly Paid, verify against Payments?
-                # Let's trust monto_actualizado as the "Debt Value".
-                
-                m_str = format_amount(final_monto)
-                
-                # Highlight if difference
-                m_color = COLORS["text_primary"]
-                if final_monto > ven.monto_original:
-                     m_str = f"{m_str} ⚠" # Surcharge indicator
-                     m_color = COLORS["status_overdue"]
-    
-                l_amnt = ctk.CTkLabel(row, text=m_str, anchor="e", font=("Segoe UI", 12), text_color=m_color)
-                l_amnt.grid(row=0, column=5, sticky="ew", padx=(2, 20))
-                l_amnt.bind("<Button-1>", lambda e, v=ven: self.select_item(v))
-                l_amnt.bind("<Button-3>", lambda e, v=ven: self.show_context_menu(e, v))
-                
-                # Estado
-                e_val = ven.estado.value if hasattr(ven.estado, 'value') else str(ven.estado)
-                e_col = COLORS["status_paid"] if e_val == EstadoVencimiento.PAGADO.value else COLORS["status_pending"]
-                if e_val == EstadoVencimiento.VENCIDO.value: e_col = COLORS["status_overdue"]
-                l_est = ctk.CTkLabel(row, text=e_val, text_color=e_col, anchor="w", font=("Segoe UI", 11, "bold"))
-                l_est.grid(row=0, column=6, sticky="ew", padx=(10, 0))
-                l_est.bind("<Button-1>", lambda e, v=ven: self.select_item(v))
-                l_est.bind("<Button-3>", lambda e, v=ven: self.show_context_menu(e, v))
-                
-                # Actions
-                btn_edit = ctk.CTkButton(row, text="✎", width=30, height=25, fg_color=COLORS["primary_button"], command=lambda v=ven: self.open_edit_dialog(v))
-                btn_edit.grid(row=0, column=7, padx=2)
-    
-                btn_del = ctk.CTkButton(row, text="✖", width=30, height=25, fg_color=COLORS["status_overdue"], command=lambda v=ven: self.delete_vencimiento(v))
-                btn_del.grid(row=0, column=8, padx=2)
-                
-                self.row_widgets[ven.id] = row
-    
-                # Force grid column config on row to match header
-                row.grid_columnconfigure(0, minsize=27)
-                row.grid_columnconfigure(1, minsize=27)
-                row.grid_columnconfigure(2, weight=2, uniform="cols")
-                row.grid_columnconfigure(3, weight=2, uniform="cols")
-                row.grid_columnconfigure((4,5,6), weight=1, uniform="cols")
-                row.grid_columnconfigure((7,8), minsize=35)
-            
-            except Exception as e:
-                 app_logger.error(f"Error rendering row {idx}: {e}", exc_info=True)
-                 continue
+        # Only the visible rows are (re)bound; the row widgets are pooled by the grid
+        self.grid_view.set_items(vencimientos or [])
+
+    def _build_grid_row(self, parent):
+        """One pooled grid row; handlers read row.item so the widgets can be rebound."""
+        row = ctk.CTkFrame(parent, fg_color=COLORS["content_surface"], corner_radius=0)
+        
+        def select(e, r=row): self.select_item(r.item)
+        def menu(e, r=row): self.show_context_menu(e, r.item)
+        def open_invoice(e, r=row):
+            if r.item.ruta_archivo_pdf or r.item.documento_id: self.open_pdf_viewer(r.item)
+            else: self.select_item(r.item)
+        def open_payment(e, r=row):
+            if r.item.ruta_comprobante_pago or r.item.comprobante_pago_id: self._safe_open_payment(r.item)
+            else: self.select_item(r.item)
+
+        # Icon 1: PDF (Factura) / Icon 2: Pago
+        row.l_pdf = ctk.CTkLabel(row, text="", width=27, text_color=COLORS["primary_button"])
+        row.l_pdf.grid(row=0, column=0, sticky="ew")
+        row.l_pdf.bind("<Button-1>", open_invoice)
+        row.l_pay = ctk.CTkLabel(row, text="", width=27, text_color=COLORS["status_paid"])
+        row.l_pay.grid(row=0, column=1, sticky="ew")
+        row.l_pay.bind("<Button-1>", open_payment)
+
+        row.l_inm = ctk.CTkLabel(row, text="", anchor="w", font=("Segoe UI", 12))
+        row.l_inm.grid(row=0, column=2, sticky="ew", padx=(10, 2))
+        row.l_prov = ctk.CTkLabel(row, text="", anchor="w", font=("Segoe UI", 12))
+        row.l_prov.grid(row=0, column=3, sticky="ew", padx=(10, 2))
+        row.l_date = ctk.CTkLabel(row, text="", anchor="center", font=("Segoe UI", 12))
+        row.l_date.grid(row=0, column=4, sticky="ew")
+        row.l_amnt = ctk.CTkLabel(row, text="", anchor="e", font=("Segoe UI", 12))
+        row.l_amnt.grid(row=0, column=5, sticky="ew", padx=(2, 20))
+        row.l_est = ctk.CTkLabel(row, text="", anchor="w", font=("Segoe UI", 11, "bold"))
+        row.l_est.grid(row=0, column=6, sticky="ew", padx=(10, 0))
+
+        for w in (row, row.l_inm, row.l_prov, row.l_date, row.l_amnt, row.l_est):
+            w.bind("<Button-1>", select)
+        for w in (row, row.l_pdf, row.l_pay, row.l_inm, row.l_prov, row.l_date, row.l_amnt, row.l_est):
+            w.bind("<Button-3>", menu)
+
+        # Actions
+        btn_edit = ctk.CTkButton(row, text="✎", width=30, height=25, fg_color=COLORS["primary_button"], command=lambda r=row: self.open_edit_dialog(r.item))
+        btn_edit.grid(row=0, column=7, padx=2)
+        btn_del = ctk.CTkButton(row, text="✖", width=30, height=25, fg_color=COLORS["status_overdue"], command=lambda r=row: self.delete_vencimiento(r.item))
+        btn_del.grid(row=0, column=8, padx=2)
+
+        # Force grid column config on row to match header
+        row.grid_columnconfigure(0, minsize=27)
+        row.grid_columnconfigure(1, minsize=27)
+        row.grid_columnconfigure(2, weight=2, uniform="cols")
+        row.grid_columnconfigure(3, weight=2, uniform="cols")
+        row.grid_columnconfigure((4,5,6), weight=1, uniform="cols")
+        row.grid_columnconfigure((7,8), minsize=35)
+        row.shown = {} # Last value per label: skip configure() when unchanged
+        return row
+
+    @staticmethod
+    def _set_cell(row, name, **kwargs):
+        if row.shown.get(name) != kwargs:
+            row.shown[name] = kwargs
+            getattr(row, name).configure(**kwargs)
+
+    def _bind_grid_row(self, row, ven, idx):
+        try:
+            # Zebra Logic (selection keeps its highlight while scrolling)
+            row.default_bg = COLORS["content_surface"] if idx % 2 == 0 else "#F4F6F7" # Cloud White alternate
+            selected = self.current_vencimiento is not None and self.current_vencimiento.id == ven.id
+            bg = "#D5D8DC" if selected else row.default_bg
+            if row.shown.get("bg") != bg:
+                row.shown["bg"] = bg
+                row.configure(fg_color=bg)
+
+            has_pdf = bool(ven.ruta_archivo_pdf or ven.documento_id)
+            has_pay = bool(ven.ruta_comprobante_pago or ven.comprobante_pago_id)
+            self._set_cell(row, "l_pdf", text="📄" if has_pdf else "", cursor="hand2" if has_pdf else "")
+            self._set_cell(row, "l_pay", text="💲" if has_pay else "", cursor="hand2" if has_pay else "")
+
+            self._set_cell(row, "l_inm", text=ven.inmueble_alias or "N/A")
+            self._set_cell(row, "l_prov", text=ven.proveedor_nombre or "N/A")
+            self._set_cell(row, "l_date", text=ven.fecha_vencimiento.strftime("%d/%m/%Y"))
+
+            # Monto (CONVERTED)
+            self._set_cell(row, "l_amnt", text=self._format_amount(ven.monto_original), text_color=COLORS["text_primary"])
+
+            # Estado
+            e_val = ven.estado.value if hasattr(ven.estado, 'value') else str(ven.estado)
+            e_col = COLORS["status_paid"] if e_val == EstadoVencimiento.PAGADO.value else COLORS["status_pending"]
+            if e_val == EstadoVencimiento.VENCIDO.value: e_col = COLORS["status_overdue"]
+            self._set_cell(row, "l_est", text=e_val, text_color=e_col)
+        except Exception as e:
+            app_logger.error(f"Error rendering row {idx}: {e}", exc_info=True)
 
 
     def show_context_menu(self, event, vencimiento):
@@ -1003,7 +1009,7 @@ class VencimientosView(ctk.CTkFrame):
             messagebox.showwarning("Acceso Denegado", "No tiene permisos para eliminar registros.\nContacte a su administrador.")
             return
 
-        if messagebox.askyesno("Confirmar", f"¿Eliminar vencimiento de {vencimiento.obligacion.proveedor.nombre_entidad}?"):
+        if messagebox.askyesno("Confirmar", f"¿Eliminar vencimiento de {vencimiento.proveedor_nombre}?"):
             try:
                 if VencimientosController().delete_vencimiento(vencimiento.id):
                     self.load_data()
@@ -1090,6 +1096,17 @@ class EditVencimientoDialog(ctk.CTkToplevel):
         self.parent = parent # FIX: Store parent explicitly
         self.title(f"Editar Vencimiento #{vencimiento.id}")
         self.geometry("420x700") 
+
+        # Fresh Fetch to ensure relations are loaded and attached
+        # (the grid passes a flat VencimientoRow; only its id is used here)
+        from controllers.vencimientos_controller import VencimientosController
+        self.vencimiento = VencimientosController().get_vencimiento_details(vencimiento.id)
+        if self.vencimiento is None:
+            # Deleted elsewhere (another user / the API) since the grid loaded
+            self.withdraw()
+            messagebox.showerror("Error", f"El vencimiento #{vencimiento.id} ya no existe.\nActualice la lista.", parent=parent)
+            self.after(0, self.destroy) # Deferred: callers may wait_window() on the dialog
+            return
         
         # Modal Behavior Setup
         self.transient(self.parent) # Associated with parent
@@ -1110,11 +1127,6 @@ class EditVencimientoDialog(ctk.CTkToplevel):
         
         self.parent = parent
         
-        # Fresh Fetch to ensure relations are loaded and attached
-        from controllers.vencimientos_controller import VencimientosController
-        fresh_venc = VencimientosController().get_vencimiento_details(vencimiento.id)
-        self.vencimiento = fresh_venc if fresh_venc else vencimiento
-        
         # Main Layout
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -197,20 +197,12 @@ def get_vencimientos(periodo: Optional[str] = None, search: Optional[str] = None
                 query = query.filter(Vencimiento.periodo == periodo)
             
             if search:
-                from models.entities import Obligacion, ProveedorServicio, Inmueble
-                # Use word boundaries (\m) to match start of words (e.g., 'abl' matches 'ABL' but not 'Contable')
-                # This makes the search much more intuitive for small terms.
-                search_regex = f"\\m{search}"
-                query = query.join(Obligacion, Vencimiento.obligacion_id == Obligacion.id)\
-                             .join(ProveedorServicio, Obligacion.servicio_id == ProveedorServicio.id)\
-                             .join(Inmueble, Obligacion.inmueble_id == Inmueble.id)\
-                             .filter(
-                                or_(
-                                    ProveedorServicio.nombre_entidad.op('~*')(search_regex),
-                                    Inmueble.alias.op('~*')(search_regex),
-                                    Inmueble.direccion.op('~*')(search_regex)
-                                )
-                             )
+                # Shared search index: word prefixes ('abl' matches 'ABL' but not 'Contable'), accent-insensitive,
+                # same on PostgreSQL and SQLite
+                from services.search_service import SearchService
+                matches = SearchService.match_ids(session, search)
+                if matches is not None:
+                    query = query.filter(Vencimiento.obligacion_id.in_(matches))
             
             results = query.order_by(
                 Vencimiento.fecha_vencimiento.desc()
@@ -273,13 +265,76 @@ def get_available_periods(user: str = Depends(get_current_user)):
     finally:
         session.close()
 
-from fastapi.responses import Response, FileResponse
+from fastapi import Request
+from fastapi.responses import Response, FileResponse, StreamingResponse
+
+# The URL is per vencimiento and its invoice can be replaced: always revalidate
+# (the strong ETag makes that a cheap 304 while the content is unchanged)
+DOCUMENT_CACHE_CONTROL = "private, no-cache"
+
+
+def _parse_byte_range(header: Optional[str], size: int):
+    """
+    'bytes=a-b' / 'bytes=a-' / 'bytes=-n' -> (start, end_exclusive).
+    None: no usable range, malformed ones included (serve the whole file).
+    'invalid': unsatisfiable (416). Multi-range requests are answered with the full body.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first == "":
+            length = int(last)
+            if length < 0:
+                return None
+            if length == 0:
+                return "invalid"
+            return max(0, size - length), size
+        start = int(first)
+        last_pos = int(last) if last else None
+    except ValueError:
+        return None
+    if start < 0 or (last_pos is not None and last_pos < start):
+        return None  # e.g. 'bytes=5-3': invalid syntax, ignored (RFC 9110)
+    if start >= size:
+        return "invalid"
+    return start, size if last_pos is None else min(last_pos + 1, size)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _stream_document(doc_id: int, start: int, end: int):
+    """Generator with its own session: the response body is sent after the endpoint returned."""
+    from database import SessionLocal
+    from models.entities import Documento
+    from services.document_store import DocumentStore
+
+    session = SessionLocal()
+    try:
+        doc = session.get(Documento, doc_id)
+        if doc is None:
+            # Deleted after the headers were sent: end the body here
+            print(f"DEBUG: Document {doc_id} removed while streaming")
+            return
+        yield from DocumentStore.iter_range(session, doc, start, end)
+    finally:
+        session.close()
+
 
 @app.get("/vencimientos/{id}/pdf")
-def get_vencimiento_pdf(id: int, user: str = Depends(get_current_user)):
-    print(f"DEBUG: Fetching PDF for Vencimiento {id}")
+def get_vencimiento_pdf(id: int, request: Request, user: str = Depends(get_current_user)):
+    """
+    Streams the invoice from the document store (bounded memory, chunked).
+    Strong ETag = content hash: If-None-Match -> 304; Range / If-Range -> 206 partial content.
+    """
     from database import SessionLocal
     from models.entities import Documento
+    from services.document_store import DocumentStore
     
     session = SessionLocal()
     try:
@@ -287,16 +342,40 @@ def get_vencimiento_pdf(id: int, user: str = Depends(get_current_user)):
         if not v:
             raise HTTPException(status_code=404, detail="Vencimiento no encontrado")
             
-        # 1. Try Blob Storage
-        if v.documento_id:
-            doc = session.query(Documento).filter(Documento.id == v.documento_id).first()
-            if doc and doc.file_data:
-                # Determine mime type
-                mime = doc.mime_type or "application/pdf"
-                fname = doc.filename or f"vencimiento_{id}.pdf"
-                return Response(content=doc.file_data, media_type=mime, headers={"Content-Disposition": f"inline; filename={fname}"})
+        # 1. Try Document Store (metadata only here; bytes are streamed below)
+        doc = session.get(Documento, v.documento_id) if v.documento_id else None
+        size = DocumentStore.content_length(session, doc) if doc else 0
+        if doc and size:
+            etag = DocumentStore.etag(doc)
+            mime = doc.mime_type or "application/pdf"
+            fname = doc.filename or f"vencimiento_{id}.pdf"
+            headers = {
+                "ETag": etag,
+                "Cache-Control": DOCUMENT_CACHE_CONTROL,
+                "Accept-Ranges": "bytes",
+                "Content-Disposition": f'inline; filename="{fname}"',
+            }
+
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers={k: headers[k] for k in ("ETag", "Cache-Control")})
+
+            byte_range = _parse_byte_range(request.headers.get("range"), size)
+            if_range = request.headers.get("if-range")
+            if if_range and if_range != etag:
+                byte_range = None  # Representation changed: send it whole
+
+            if byte_range == "invalid":
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{size}", "ETag": etag})
+            if byte_range:
+                start, end = byte_range
+                headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+                headers["Content-Length"] = str(end - start)
+                return StreamingResponse(_stream_document(doc.id, start, end), status_code=206, media_type=mime, headers=headers)
+
+            headers["Content-Length"] = str(size)
+            return StreamingResponse(_stream_document(doc.id, 0, size), media_type=mime, headers=headers)
         
-        # 2. Try File System
+        # 2. Try File System (FileResponse sets its own ETag / Last-Modified)
         if v.ruta_archivo_pdf:
             if os.path.exists(v.ruta_archivo_pdf):
                 return FileResponse(v.ruta_archivo_pdf)
@@ -373,8 +452,9 @@ def get_dashboard_stats(user: str = Depends(get_current_user)):
     
     session = SessionLocal()
     try:
+        # Aggregates come from the monthly rollup (resumen_mensual): cost stays flat as history grows
         # 1. Total Deuda (Pending/Vencido/Proximo)
-        deuda_q = text("SELECT SUM(monto_original) FROM vencimientos WHERE is_deleted = 0 AND estado != 'PAGADO'")
+        deuda_q = text("SELECT SUM(total) FROM resumen_mensual WHERE estado != 'PAGADO'")
         total_deuda = session.execute(deuda_q).scalar() or 0.0
         
         # 2. Total Pagado (All time)
@@ -384,7 +464,7 @@ def get_dashboard_stats(user: str = Depends(get_current_user)):
         total_pagado = raw_pagado or 0.0
         
         # 3. Counts
-        pend_q = text("SELECT COUNT(id) FROM vencimientos WHERE is_deleted = 0 AND estado IN ('PENDIENTE', 'VENCIDO')")
+        pend_q = text("SELECT SUM(cantidad) FROM resumen_mensual WHERE estado IN ('PENDIENTE', 'VENCIDO')")
         pendientes = session.execute(pend_q).scalar() or 0
         
         from datetime import date, timedelta
@@ -414,22 +494,20 @@ def get_dashboard_stats(user: str = Depends(get_current_user)):
 
         # 4. Distribution by Property (By Amount)
         prop_query = text("""
-            SELECT i.alias, SUM(v.monto_original)
-            FROM vencimientos v
-            JOIN obligaciones o ON v.obligacion_id = o.id
-            JOIN inmuebles i ON o.inmueble_id = i.id
-            WHERE v.is_deleted = 0 AND v.estado != 'PAGADO'
+            SELECT i.alias, SUM(r.total)
+            FROM resumen_mensual r
+            JOIN inmuebles i ON r.inmueble_id = i.id
+            WHERE r.estado != 'PAGADO'
             GROUP BY i.alias
-            ORDER BY SUM(v.monto_original) DESC
+            ORDER BY SUM(r.total) DESC
         """)
         prop_stats = session.execute(prop_query).fetchall()
         dist_prop = [{"name": p[0], "amount": float(p[1])} for p in prop_stats]
 
         # 5. Monthly Trend
         trend_query = text("""
-            SELECT periodo, SUM(monto_original)
-            FROM vencimientos
-            WHERE is_deleted = 0
+            SELECT periodo, SUM(total)
+            FROM resumen_mensual
             GROUP BY periodo
             ORDER BY periodo DESC
             LIMIT 6
@@ -439,13 +517,12 @@ def get_dashboard_stats(user: str = Depends(get_current_user)):
 
         # 6. Debt by Category (Amount)
         cat_query = text("""
-            SELECT COALESCE(p.categoria, 'OTRO'), SUM(v.monto_original)
-            FROM vencimientos v
-            JOIN obligaciones o ON v.obligacion_id = o.id
-            LEFT JOIN proveedores p ON o.servicio_id = p.id
-            WHERE v.is_deleted = 0 AND v.estado != 'PAGADO'
+            SELECT COALESCE(p.categoria, 'OTRO'), SUM(r.total)
+            FROM resumen_mensual r
+            LEFT JOIN proveedores p ON r.proveedor_id = p.id
+            WHERE r.estado != 'PAGADO' AND r.inmueble_id != 0
             GROUP BY COALESCE(p.categoria, 'OTRO')
-            ORDER BY SUM(v.monto_original) DESC
+            ORDER BY SUM(r.total) DESC
         """)
         
         # Robust fetch & convert